@@ -0,0 +1,136 @@
+"""
+Request pipeline benchmark: blocking service clients vs. asyncio-native ones.
+
+Sends the same admission path (rate limit, idempotency read-through, insert,
+cache the response, trace events) at a fixed open-loop arrival rate, once with
+the sync services called straight from coroutines (how process_request_internal
+used to work) and once through process_request_internal on the asyncio
+clients. Latency is measured from each request's scheduled arrival, so time a
+request spent waiting for a blocked loop to start it is counted. Event-loop
+lag (how late a 1 ms ticker wakes up) shows what every other coroutine on the
+loop pays for a blocking call.
+
+    cd system-design-backend
+    PYTHONPATH=. python benchmarks/request_pipeline.py --requests 2000 --rps 80
+
+Set REDIS_URL to include Redis in the path; without it rate limiting, the
+cache and trace writes are disabled and only SQLite is exercised.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from v1.routes.schema import PostRequestModel
+from v1.models.request import Request
+from v1.controllers.requests import process_request_internal
+from v1.services.database_service_traced import db_service_traced, async_db_service_traced
+from v1.services.idempotency_service import idempotency_service
+from v1.services.rate_limiting_service import rate_limiting_service, WindowType
+from v1.services.redis_service import redis_service
+from tracing.trace_context import TraceContext
+from models.tracing.trace_models import EventType
+
+PAYLOAD = PostRequestModel(
+    rate_of_requests=100,
+    number_of_requests=1000,
+    retries_enabled=False,
+    rate_limiting=1_000_000,
+    rate_limiting_algo="fixed_window",
+    cache_enabled=True,
+    cache_ttl=60,
+    db_latency=0
+)
+
+async def blocking_request(payload: PostRequestModel, request_id: str):
+    """The pre-async pipeline: sync clients called directly on the event loop"""
+    idempotency_key = f"load_test_{request_id}"
+    with TraceContext(request_id, {"source": "benchmark"}):
+        TraceContext.trace_event(EventType.RATE_LIMIT_CHECK, {"client_id": "benchmark"})
+        if not rate_limiting_service.is_allowed("benchmark", payload.rate_limiting, 60, WindowType.FIXED):
+            return
+        if idempotency_service.get_response_with_read_through(idempotency_key, payload.cache_enabled, payload.cache_ttl):
+            return
+        payload_hash = hashlib.sha256(json.dumps(payload.dict(), sort_keys=True).encode()).hexdigest()
+        db_service_traced.create(Request(
+            request_id=request_id,
+            received_at=datetime.utcnow(),
+            endpoint="/v1/requests/",
+            method="POST",
+            payload_hash=payload_hash,
+            idempotency_key=idempotency_key,
+            status="received"
+        ))
+        response = {"status": 200, "status_message": "received", "request_id": request_id}
+        idempotency_service.cache_response(idempotency_key, response, payload.cache_enabled, payload.cache_ttl)
+        TraceContext.trace_event(EventType.RESPONSE_SENT, {"status_code": 200})
+
+async def async_request(payload: PostRequestModel, request_id: str):
+    await process_request_internal(payload, request_id)
+
+async def run(pipeline, requests: int, rps: float) -> dict:
+    latencies = np.empty(requests)
+    lags = []
+    running = True
+
+    async def ticker():
+        # Scheduling delay of a 1 ms sleep: how long the loop was unavailable
+        while running:
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - before - 0.001)
+
+    async def send(index: int, intended: float):
+        await pipeline(PAYLOAD, f"bench_{uuid.uuid4()}")
+        latencies[index] = time.perf_counter() - intended
+
+    tick = asyncio.create_task(ticker())
+    tasks = []
+    start = time.perf_counter()
+    for index in range(requests):
+        intended = start + index / rps
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(index, intended)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    running = False
+    await tick
+
+    latencies_ms = latencies * 1000
+    lags_ms = np.array(lags or [0.0]) * 1000
+    return {
+        "throughput_rps": requests / elapsed,
+        "latency_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "latency_p99_ms": float(np.percentile(latencies_ms, 99)),
+        "latency_max_ms": float(latencies_ms.max()),
+        "loop_lag_p50_ms": float(np.percentile(lags_ms, 50)),
+        "loop_lag_p99_ms": float(np.percentile(lags_ms, 99)),
+        "loop_lag_max_ms": float(lags_ms.max())
+    }
+
+async def main(requests: int, rps: float, warmup: int):
+    results = {}
+    for name, pipeline in (("blocking", blocking_request), ("async", async_request)):
+        await run(pipeline, warmup, rps)
+        results[name] = await run(pipeline, requests, rps)
+    await async_db_service_traced.close()
+
+    print(f"{requests} requests at {rps:g} rps, redis {'on' if redis_service.connected else 'off'}")
+    print(f"{'metric':<18}{'blocking':>12}{'async':>12}")
+    for metric in results["blocking"]:
+        print(f"{metric:<18}{results['blocking'][metric]:>12.2f}{results['async'][metric]:>12.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rps", type=float, default=80)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rps, args.warmup))
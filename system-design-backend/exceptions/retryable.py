@@ -12,4 +12,8 @@ class InjectedFailureException(RetryableException):
 
 class RedisTimeoutException(RetryableException):
     """Redis operation timed out"""
-    pass
\ No newline at end of file
+    pass
+
+class DatabaseOverloadedException(RetryableException):
+    """Database executor queue is full; the operation was rejected without running"""
+    pass
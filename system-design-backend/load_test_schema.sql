@@ -4,7 +4,7 @@ CREATE TABLE IF NOT EXISTS test_runs (
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     started_at TIMESTAMPTZ,
     completed_at TIMESTAMPTZ,
-    status TEXT NOT NULL DEFAULT 'pending', -- pending, running, completed, failed
+    status TEXT NOT NULL DEFAULT 'pending', -- pending, running, completed, failed, stopped
     config JSONB NOT NULL,
     total_requests INTEGER,
     succeeded INTEGER DEFAULT 0,
@@ -15,7 +15,24 @@ CREATE TABLE IF NOT EXISTS test_runs (
     avg_latency_ms FLOAT,
     p95_latency_ms FLOAT,
     p99_latency_ms FLOAT,
-    duration_sec FLOAT
+    duration_sec FLOAT,
+    target_rps FLOAT,
+    achieved_rps FLOAT,
+    rps_timeline JSONB,
+    p50_latency_ms FLOAT,
+    p90_latency_ms FLOAT,
+    p999_latency_ms FLOAT,
+    max_latency_ms FLOAT,
+    latency_histogram JSONB,
+    stage_results JSONB,
+    latency_breakdown JSONB,
+    http_pool_stats JSONB,
+    stop_reason TEXT,
+    abandoned_requests INTEGER,
+    virtual_user_stats JSONB,
+    capacity_search JSONB,
+    saturation_rps FLOAT,
+    simulation JSONB
 );
 
 CREATE TABLE IF NOT EXISTS test_requests (
@@ -26,9 +43,33 @@ CREATE TABLE IF NOT EXISTS test_requests (
     completed_at TIMESTAMPTZ,
     status TEXT NOT NULL, -- success, failed, rate_limited, duplicate
     status_code INTEGER,
-    latency_ms FLOAT,
+    latency_ms FLOAT, -- Corrected response time: queue_delay_ms + service_time_ms
+    service_time_ms FLOAT,
+    queue_delay_ms FLOAT,
     retry_count INTEGER DEFAULT 0,
-    error_message TEXT
+    error_message TEXT,
+    stage_index INTEGER
+);
+
+-- Per-bucket throughput and latency for a run, at 1 s, 10 s and 60 s resolution
+CREATE TABLE IF NOT EXISTS test_timeseries (
+    test_id TEXT NOT NULL REFERENCES test_runs(test_id),
+    resolution_sec INTEGER NOT NULL,
+    bucket_offset_sec INTEGER NOT NULL, -- Seconds from the start of the run
+    bucket_start TIMESTAMPTZ NOT NULL,
+    total INTEGER NOT NULL,
+    succeeded INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    rate_limited INTEGER NOT NULL,
+    duplicates INTEGER NOT NULL,
+    achieved_rps FLOAT,
+    error_rate FLOAT,
+    avg_latency_ms FLOAT,
+    p50_latency_ms FLOAT,
+    p95_latency_ms FLOAT,
+    p99_latency_ms FLOAT,
+    max_latency_ms FLOAT,
+    PRIMARY KEY (test_id, resolution_sec, bucket_offset_sec)
 );
 
 CREATE TABLE IF NOT EXISTS request_events (
@@ -42,4 +83,10 @@ CREATE TABLE IF NOT EXISTS request_events (
 
 CREATE INDEX IF NOT EXISTS idx_test_requests_test_id ON test_requests(test_id);
 CREATE INDEX IF NOT EXISTS idx_request_events_test_id ON request_events(test_id);
-CREATE INDEX IF NOT EXISTS idx_request_events_request_id ON request_events(request_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_request_events_request_id ON request_events(request_id);
+
+-- Workload replay reads recorded traffic by time window
+CREATE INDEX IF NOT EXISTS idx_requests_received_at ON requests(received_at, request_id);
+
+-- Idempotency lookups on the request path (a full scan holds the read lock long enough to stall writers)
+CREATE INDEX IF NOT EXISTS idx_requests_idempotency_key ON requests(idempotency_key);
\ No newline at end of file
@@ -1,5 +1,6 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from tracing.trace_middleware import TracingMiddleware
 from v1.v1 import router as v1_router
 from v1.routes.requests import router as requests_router
@@ -8,6 +9,10 @@ from v1.routes.metrics import router as metrics_router
 from v1.routes.websocket import router as websocket_router
 from v1.routes.config import router as config_router
 from startup import initialize_system, log_system_status
+from v1.services.http_load_client import close_traffic_client
+from v1.services.redis_service import async_redis_service
+from v1.services.database_service_traced import async_db_service_traced
+from exceptions.retryable import DatabaseOverloadedException
 
 # Initialize system before creating FastAPI app
 initialize_system()
@@ -32,11 +37,23 @@ app.include_router(metrics_router)
 app.include_router(websocket_router)
 app.include_router(config_router)
 
+@app.exception_handler(DatabaseOverloadedException)
+async def database_overloaded_handler(request: Request, exc: DatabaseOverloadedException):
+    """The database executor's queue is full: shed load with a retryable 503"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 @app.on_event("startup")
 async def startup_event():
     """Log system status on FastAPI startup"""
     log_system_status()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled outbound HTTP connections and the asyncio Redis/SQLite clients"""
+    await close_traffic_client()
+    await async_redis_service.close()
+    await async_db_service_traced.close()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -39,6 +39,7 @@ class RequestTrace(BaseModel):
     end_time: Optional[datetime] = None
     total_latency_ms: Optional[float] = None
     status_code: Optional[int] = None
+    stage_latency_ms: Optional[Dict[str, float]] = None  # Hot-path stage breakdown, see v1/services/stage_timer.py
     events: List[TraceEvent] = []
     request_metadata: Dict[str, Any] = {}
     
@@ -15,7 +15,24 @@ CREATE TABLE IF NOT EXISTS test_runs (
     avg_latency_ms REAL,
     p95_latency_ms REAL,
     p99_latency_ms REAL,
-    duration_sec REAL
+    duration_sec REAL,
+    target_rps REAL,
+    achieved_rps REAL,
+    rps_timeline TEXT,
+    p50_latency_ms REAL,
+    p90_latency_ms REAL,
+    p999_latency_ms REAL,
+    max_latency_ms REAL,
+    latency_histogram TEXT,
+    stage_results TEXT,
+    latency_breakdown TEXT,
+    http_pool_stats TEXT,
+    stop_reason TEXT,
+    abandoned_requests INTEGER,
+    virtual_user_stats TEXT,
+    capacity_search TEXT,
+    saturation_rps REAL,
+    simulation TEXT
 );
 
 CREATE TABLE IF NOT EXISTS test_requests (
@@ -26,9 +43,34 @@ CREATE TABLE IF NOT EXISTS test_requests (
     completed_at DATETIME,
     status TEXT NOT NULL,
     status_code INTEGER,
-    latency_ms REAL,
+    latency_ms REAL, -- Corrected response time: queue_delay_ms + service_time_ms
+    service_time_ms REAL,
+    queue_delay_ms REAL,
     retry_count INTEGER DEFAULT 0,
     error_message TEXT,
+    stage_index INTEGER,
+    FOREIGN KEY (test_id) REFERENCES test_runs(test_id)
+);
+
+-- Per-bucket throughput and latency for a run, at 1 s, 10 s and 60 s resolution
+CREATE TABLE IF NOT EXISTS test_timeseries (
+    test_id TEXT NOT NULL,
+    resolution_sec INTEGER NOT NULL,
+    bucket_offset_sec INTEGER NOT NULL, -- Seconds from the start of the run
+    bucket_start DATETIME NOT NULL,
+    total INTEGER NOT NULL,
+    succeeded INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    rate_limited INTEGER NOT NULL,
+    duplicates INTEGER NOT NULL,
+    achieved_rps REAL,
+    error_rate REAL,
+    avg_latency_ms REAL,
+    p50_latency_ms REAL,
+    p95_latency_ms REAL,
+    p99_latency_ms REAL,
+    max_latency_ms REAL,
+    PRIMARY KEY (test_id, resolution_sec, bucket_offset_sec),
     FOREIGN KEY (test_id) REFERENCES test_runs(test_id)
 );
 
@@ -44,4 +86,10 @@ CREATE TABLE IF NOT EXISTS request_events (
 
 CREATE INDEX IF NOT EXISTS idx_test_requests_test_id ON test_requests(test_id);
 CREATE INDEX IF NOT EXISTS idx_request_events_test_id ON request_events(test_id);
-CREATE INDEX IF NOT EXISTS idx_request_events_request_id ON request_events(request_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_request_events_request_id ON request_events(request_id);
+
+-- Workload replay reads recorded traffic by time window
+CREATE INDEX IF NOT EXISTS idx_requests_received_at ON requests(received_at, request_id);
+
+-- Idempotency lookups on the request path (a full scan holds the read lock long enough to stall writers)
+CREATE INDEX IF NOT EXISTS idx_requests_idempotency_key ON requests(idempotency_key);
\ No newline at end of file
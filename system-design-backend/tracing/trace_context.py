@@ -1,9 +1,12 @@
 import contextvars
 from typing import Optional, Dict, Any
 from models.tracing.trace_models import EventType
+from v1.services.stage_timer import StageTimer, TRACE
 
 # Context variable for request tracing
 _request_context: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('request_id', default=None)
+# Innermost open TraceContext; its events are buffered and stored in one batch on exit
+_active_trace: contextvars.ContextVar[Optional["TraceContext"]] = contextvars.ContextVar('active_trace', default=None)
 
 class TraceContext:
     """Context manager for request tracing"""
@@ -25,21 +28,43 @@ class TraceContext:
         if request_id:
             # Import here to avoid circular dependency
             from tracing.trace_storage import trace_storage
-            trace_storage.append_event(request_id, event_type, metadata)
+            active = _active_trace.get()
+            if active is not None and active.request_id == request_id:
+                # list.append is atomic, so DB executor threads carrying this context can add events too
+                active.events.append(trace_storage.build_event(request_id, event_type, metadata))
+            else:
+                trace_storage.append_event(request_id, event_type, metadata)
     
-    def __init__(self, request_id: str, request_metadata: Dict[str, Any] = None):
+    @classmethod
+    def buffered_trace(cls, request_id: str):
+        """The open trace for request_id if it is the current context's, else None"""
+        active = _active_trace.get()
+        return active.trace if active is not None and active.request_id == request_id else None
+    
+    def __init__(self, request_id: str, request_metadata: Dict[str, Any] = None, stage_timer: Optional[StageTimer] = None):
         self.request_id = request_id
         self.request_metadata = request_metadata or {}
+        # Started on enter; the trace gets its breakdown and the stage histograms are recorded on exit
+        self.stage_timer = stage_timer
         self.token = None
+        self.active_token = None
+        self.trace = None
+        self.events = []
     
     def __enter__(self):
         # Import here to avoid circular dependency
         from tracing.trace_storage import trace_storage
         
-        # Set context and create trace
+        if self.stage_timer is not None:
+            self.stage_timer.start()
+        
+        # Set context and start the trace; nothing is stored until exit
         self.token = _request_context.set(self.request_id)
-        trace_storage.create_trace(self.request_id, self.request_metadata)
-        trace_storage.append_event(self.request_id, EventType.REQUEST_RECEIVED, self.request_metadata)
+        self.active_token = _active_trace.set(self)
+        self.trace = trace_storage.build_trace(self.request_id, self.request_metadata)
+        self.events.append(trace_storage.build_event(self.request_id, EventType.REQUEST_RECEIVED, self.request_metadata))
+        if self.stage_timer is not None:
+            self.stage_timer.mark(TRACE)
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -48,12 +73,25 @@ class TraceContext:
         
         # Complete trace
         if exc_type:
-            trace_storage.append_event(
-                self.request_id, 
+            self.events.append(trace_storage.build_event(
+                self.request_id,
                 EventType.REQUEST_COMPLETED,
                 {"error": str(exc_val), "error_type": exc_type.__name__}
-            )
+            ))
         
         # Reset context
+        if self.active_token:
+            _active_trace.reset(self.active_token)
         if self.token:
-            _request_context.reset(self.token)
\ No newline at end of file
+            _request_context.reset(self.token)
+        
+        # Stages up to here; storing the trace itself is charged to TRACE below
+        if self.stage_timer is not None:
+            self.trace.stage_latency_ms = self.stage_timer.breakdown_ms()
+        
+        # One pipelined write for the trace and all of its events
+        trace_storage.write_trace(self.trace, self.events)
+        
+        if self.stage_timer is not None:
+            self.stage_timer.mark(TRACE)
+            self.stage_timer.observe()
\ No newline at end of file
@@ -1,21 +1,34 @@
+import asyncio
 import json
+import os
 import time
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Awaitable
 from models.tracing.trace_models import TraceEvent, RequestTrace, EventType
 from v1.services.database_service_traced import db_service_traced as db_service
 from v1.services.observability import logger
+from prometheus_client import Counter, Gauge
 import uuid
 
+TRACE_WRITES_PENDING = Gauge('trace_writes_pending', 'Background trace writes scheduled and not yet finished')
+TRACE_WRITES_DROPPED = Counter('trace_writes_dropped_total',
+                               'Trace writes dropped because too many background writes were pending')
+
 class TraceStorage:
     def __init__(self):
         try:
-            from v1.services.redis_service import redis_service
+            from v1.services.redis_service import redis_service, async_redis_service
             self.redis = redis_service
+            self.async_redis = async_redis_service
             self.redis_enabled = redis_service.connected
         except Exception:
             self.redis = None
+            self.async_redis = None
             self.redis_enabled = False
+        # Writes issued from the event loop run as tasks; hold them until done
+        self._pending_writes = set()
+        # Past this many, new writes are dropped rather than queued behind a slow or unreachable Redis
+        self.max_pending_writes = int(os.getenv("TRACE_MAX_PENDING_WRITES", "1000"))
         
         self.db = db_service
         self.trace_ttl = 86400  # 24 hours
@@ -27,39 +40,113 @@ class TraceStorage:
     def _get_events_key(self, request_id: str) -> str:
         return f"trace_events:{request_id}"
     
-    def create_trace(self, request_id: str, request_metadata: Dict[str, Any]) -> RequestTrace:
-        """Create new request trace"""
-        trace = RequestTrace(
+    def _write_in_background(self, write: Callable[[], Awaitable]) -> bool:
+        """
+        Schedule a Redis write on the running event loop instead of blocking it.
+        Returns False outside a loop (worker threads, scripts), where the
+        caller writes synchronously. When max_pending_writes are already in
+        flight the write is dropped and counted, and True is returned so the
+        caller does not block the loop on a synchronous write instead.
+        """
+        if not self.async_redis:
+            return False
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        if len(self._pending_writes) >= self.max_pending_writes:
+            TRACE_WRITES_DROPPED.inc()
+            return True
+        task = loop.create_task(write())
+        self._pending_writes.add(task)
+        TRACE_WRITES_PENDING.inc()
+        task.add_done_callback(self._write_done)
+        return True
+
+    def _write_done(self, task: asyncio.Task):
+        self._pending_writes.discard(task)
+        TRACE_WRITES_PENDING.dec()
+        if not task.cancelled() and task.exception():
+            logger.warning("trace_write_failed", error=str(task.exception()))
+
+    async def _append_event_async(self, events_key: str, event_json: str):
+        await self.async_redis.r.lpush(events_key, event_json)
+        await self.async_redis.r.expire(events_key, self.trace_ttl)
+
+    def _write_trace_commands(self, pipe, trace: RequestTrace, events: List[TraceEvent]):
+        # Same encodings as RedisService.set and append_event, so get_trace reads either
+        pipe.setex(self.redis.hash_key(self._get_trace_key(trace.request_id)), self.trace_ttl, json.dumps(trace.json()))
+        if events:
+            events_key = self._get_events_key(trace.request_id)
+            pipe.lpush(events_key, *[event.json() for event in events])
+            pipe.expire(events_key, self.trace_ttl)
+
+    async def _write_trace_async(self, trace: RequestTrace, events: List[TraceEvent]):
+        pipe = self.async_redis.r.pipeline(transaction=False)
+        self._write_trace_commands(pipe, trace, events)
+        await pipe.execute()
+
+    def build_trace(self, request_id: str, request_metadata: Dict[str, Any]) -> RequestTrace:
+        """New trace, not yet stored"""
+        return RequestTrace(
             trace_id=str(uuid.uuid4()),
             request_id=request_id,
             start_time=datetime.utcnow(),
             request_metadata=request_metadata
         )
+
+    def build_event(self, request_id: str, event_type: EventType, metadata: Dict[str, Any] = None) -> TraceEvent:
+        """New trace event, not yet stored"""
+        return TraceEvent(
+            event_id=str(uuid.uuid4()),
+            request_id=request_id,
+            timestamp_monotonic=time.monotonic(),
+            timestamp_wall=datetime.utcnow(),
+            event_type=event_type,
+            metadata=metadata or {}
+        )
+
+    def write_trace(self, trace: RequestTrace, events: List[TraceEvent]):
+        """
+        Store a trace and its events with one pipelined round trip; used by
+        TraceContext, which buffers a request's events until it exits
+        """
+        if not self.redis_enabled or not self.redis:
+            return
+        if self._write_in_background(lambda: self._write_trace_async(trace, events)):
+            return
+        try:
+            pipe = self.redis.r.pipeline(transaction=False)
+            self._write_trace_commands(pipe, trace, events)
+            pipe.execute()
+        except Exception as e:
+            logger.error("trace_write_failed", request_id=trace.request_id, error=str(e))
+
+    def create_trace(self, request_id: str, request_metadata: Dict[str, Any]) -> RequestTrace:
+        """Create new request trace"""
+        trace = self.build_trace(request_id, request_metadata)
         
         # Store in Redis for fast access if available
         if self.redis_enabled and self.redis:
             trace_key = self._get_trace_key(request_id)
-            self.redis.set(trace_key, trace.json(), ttl=self.trace_ttl)
+            trace_json = trace.json()
+            if not self._write_in_background(lambda: self.async_redis.set(trace_key, trace_json, ttl=self.trace_ttl)):
+                self.redis.set(trace_key, trace_json, ttl=self.trace_ttl)
         
         logger.info("trace_created", request_id=request_id, trace_id=trace.trace_id)
         return trace
     
     def append_event(self, request_id: str, event_type: EventType, metadata: Dict[str, Any] = None) -> TraceEvent:
         """Append event to trace timeline"""
-        event = TraceEvent(
-            event_id=str(uuid.uuid4()),
-            request_id=request_id,
-            timestamp_monotonic=time.monotonic(),
-            timestamp_wall=datetime.utcnow(),
-            event_type=event_type,
-            metadata=metadata or {}
-        )
+        event = self.build_event(request_id, event_type, metadata)
         
         # Store event in Redis list for ordering if available
         if self.redis_enabled and self.redis:
             events_key = self._get_events_key(request_id)
-            self.redis.r.lpush(events_key, event.json())
-            self.redis.r.expire(events_key, self.trace_ttl)
+            event_json = event.json()
+            if not self._write_in_background(lambda: self._append_event_async(events_key, event_json)):
+                self.redis.r.lpush(events_key, event_json)
+                self.redis.r.expire(events_key, self.trace_ttl)
         
         logger.debug("trace_event_appended", 
                     request_id=request_id, 
@@ -70,6 +157,17 @@ class TraceStorage:
     
     def complete_trace(self, request_id: str, status_code: int, total_latency_ms: float):
         """Mark trace as completed"""
+        # Import here to avoid circular dependency
+        from tracing.trace_context import TraceContext
+        
+        buffered = TraceContext.buffered_trace(request_id)
+        if buffered is not None:
+            # Still open: written with its events when the context exits
+            buffered.end_time = datetime.utcnow()
+            buffered.status_code = status_code
+            buffered.total_latency_ms = total_latency_ms
+            return
+        
         if not self.redis_enabled or not self.redis:
             return
             
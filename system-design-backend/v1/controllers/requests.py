@@ -6,21 +6,27 @@ from datetime import datetime
 from typing import Dict, Any
 
 from v1.routes.schema import PostRequestModel
-from v1.services.database_service_traced import db_service_traced as db_service
-from v1.services.idempotency_service import idempotency_service
-from v1.services.rate_limiting_service import rate_limiting_service, WindowType
+from v1.services.database_service_traced import async_db_service_traced as db_service
+from v1.services.idempotency_service import async_idempotency_service as idempotency_service
+from v1.services.rate_limiting_service import WindowType
+from v1.services.admission_service import async_admission_service as admission_service
 from v1.models.request import Request
 from v1.services.observability import logger
+from v1.services.stage_timer import (StageTimer, VALIDATION, ADMISSION, IDEMPOTENCY_READ_THROUGH, DB_INSERT,
+                                     CACHE_RESPONSE)
 from tracing.trace_context import TraceContext
 from models.tracing.trace_models import EventType
 
-async def process_request_internal(payload: PostRequestModel, request_id: str = None) -> Dict[str, Any]:
+async def process_request_internal(payload: PostRequestModel, request_id: str = None,
+                                   stage_timer: StageTimer = None) -> Dict[str, Any]:
     """
     Internal request processing function that can be called directly
-    without HTTP overhead. Used by load testing service.
+    without HTTP overhead. Used by load testing service, which passes a
+    stage_timer to read the request's stage breakdown afterwards.
     """
     if not request_id:
         request_id = str(uuid.uuid4())
+    timer = stage_timer or StageTimer()
     
     start_time = time.time()
     
@@ -36,7 +42,7 @@ async def process_request_internal(payload: PostRequestModel, request_id: str =
     }
     
     # Start tracing context
-    with TraceContext(request_id, request_metadata):
+    with TraceContext(request_id, request_metadata, stage_timer=timer):
         try:
             TraceContext.trace_event(EventType.VALIDATION_PASSED, {"validation": "load_test_request"})
             
@@ -53,12 +59,20 @@ async def process_request_internal(payload: PostRequestModel, request_id: str =
                 }
             )
             
-            if not rate_limiting_service.is_allowed(
+            timer.mark(VALIDATION)
+            
+            # Rate limit and cached-response lookup in one Redis round trip
+            allowed, existing_response = await admission_service.admit(
                 client_id=client_id,
                 max_requests=payload.rate_limiting,
                 time_window=60,
-                window_type=window_type
-            ):
+                window_type=window_type,
+                idempotency_key=idempotency_key,
+                cache_enabled=payload.cache_enabled
+            )
+            timer.mark(ADMISSION)
+            
+            if not allowed:
                 TraceContext.trace_event(
                     EventType.RATE_LIMIT_EXCEEDED,
                     {"client_id": client_id, "limit": payload.rate_limiting}
@@ -70,11 +84,13 @@ async def process_request_internal(payload: PostRequestModel, request_id: str =
                 }
             
             # Check for existing response (idempotency)
-            existing_response = idempotency_service.get_response_with_read_through(
-                idempotency_key,
-                cache_enabled=payload.cache_enabled,
-                cache_ttl=payload.cache_ttl
-            )
+            if existing_response is None:
+                existing_response = await idempotency_service.get_response_after_cache_miss(
+                    idempotency_key,
+                    cache_enabled=payload.cache_enabled,
+                    cache_ttl=payload.cache_ttl
+                )
+                timer.mark(IDEMPOTENCY_READ_THROUGH)
             
             if existing_response:
                 TraceContext.trace_event(EventType.CACHE_HIT, {"key": idempotency_key})
@@ -97,7 +113,8 @@ async def process_request_internal(payload: PostRequestModel, request_id: str =
             )
             
             # Database operations
-            db_service.create(request_metadata_db, request_id=request_id)
+            await db_service.create(request_metadata_db, request_id=request_id)
+            timer.mark(DB_INSERT)
             
             duration = time.time() - start_time
             request_metadata_db.latency_ms = int(duration * 1000)
@@ -109,12 +126,13 @@ async def process_request_internal(payload: PostRequestModel, request_id: str =
             }
             
             # Cache response
-            idempotency_service.cache_response(
+            await idempotency_service.cache_response(
                 idempotency_key,
                 response_data,
                 cache_enabled=payload.cache_enabled,
                 cache_ttl=payload.cache_ttl
             )
+            timer.mark(CACHE_RESPONSE)
             
             TraceContext.trace_event(
                 EventType.RESPONSE_SENT,
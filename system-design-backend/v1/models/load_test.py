@@ -1,8 +1,11 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
 from enum import Enum
 
+# Simulated requests are held in memory (a few dozen bytes each) for the whole run
+SIMULATION_MAX_REQUESTS = 5_000_000
+
 class TestMode(str, Enum):
     TOTAL_REQUESTS = "total_requests"
     RPS_DURATION = "rps_duration"
@@ -10,12 +13,48 @@ class TestMode(str, Enum):
 class PayloadStrategy(str, Enum):
     FIXED = "fixed"
     RANDOMIZED = "randomized"
+    POOL = "pool"      # Precomputed pool sampled from payload_fields distributions
+    CORPUS = "corpus"  # One payload per line of a JSONL file (payload_corpus)
+
+class FieldDistributionType(str, Enum):
+    UNIFORM = "uniform"  # Between min and max inclusive (integers if both bounds are)
+    ZIPF = "zipf"        # Rank k drawn with probability proportional to k^-exponent
+    CHOICE = "choice"    # One of values, optionally weighted
+
+class ArrivalDistribution(str, Enum):
+    CONSTANT = "constant"
+    POISSON = "poisson"
+    UNIFORM = "uniform"
+
+class ExecutionMode(str, Enum):
+    IN_PROCESS = "in_process"
+    MULTI_PROCESS = "multi_process"
+
+class LoadTransport(str, Enum):
+    IN_PROCESS = "in_process"  # Call the request handler directly
+    HTTP = "http"              # Go through the real HTTP endpoint on a pooled keep-alive client
+
+class RampShape(str, Enum):
+    STEP = "step"      # Jump straight to the stage target
+    LINEAR = "linear"  # Ramp linearly from the previous stage's target
+
+class ThinkTimeDistribution(str, Enum):
+    CONSTANT = "constant"
+    EXPONENTIAL = "exponential"
+    LOGNORMAL = "lognormal"  # Right-skewed: mostly short pauses, occasional long ones
+    UNIFORM = "uniform"      # Between 0 and twice the mean
+
+class ServiceTimeDistribution(str, Enum):
+    CONSTANT = "constant"
+    EXPONENTIAL = "exponential"
+    LOGNORMAL = "lognormal"
 
 class TestStatus(str, Enum):
     PENDING = "pending"
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    STOPPED = "stopped"  # Stopped early (on request or by a stop condition); results are partial
 
 class FailureInjectionConfig(BaseModel):
     enabled: bool = False
@@ -24,19 +63,140 @@ class FailureInjectionConfig(BaseModel):
     latency_max_ms: int = Field(0, ge=0)
     timeout_seconds: float = Field(5.0, gt=0)
 
+class StopConditions(BaseModel):
+    max_error_rate: Optional[float] = Field(None, ge=0.0, le=100.0)  # Percent of completed requests that failed
+    max_p99_ms: Optional[float] = Field(None, gt=0)  # Rolling p99 over the last 5-10 seconds
+    min_requests: int = Field(100, gt=0)  # Completions needed before the thresholds are checked
+    drain_timeout_sec: float = Field(5.0, ge=0, le=300)
+
+class FieldDistribution(BaseModel):
+    distribution: FieldDistributionType
+    min: Optional[Union[int, float]] = None  # uniform
+    max: Optional[Union[int, float]] = None  # uniform; zipf: number of ranks when values is not given
+    exponent: float = Field(1.1, gt=0)  # zipf
+    values: Optional[List[Any]] = Field(None, min_length=1)  # zipf: value for each rank; choice: candidates
+    weights: Optional[List[float]] = None  # choice: relative weights, equal by default
+    
+    @model_validator(mode="after")
+    def check_parameters(self):
+        if self.distribution == FieldDistributionType.UNIFORM:
+            if self.min is None or self.max is None or self.max < self.min:
+                raise ValueError("A uniform distribution needs min <= max")
+        elif self.distribution == FieldDistributionType.ZIPF:
+            if not self.values and not (self.max and self.max >= 1):
+                raise ValueError("A zipf distribution needs values or max >= 1")
+        else:
+            if not self.values:
+                raise ValueError("A choice distribution needs values")
+            if self.weights is not None and (len(self.weights) != len(self.values) or min(self.weights) < 0 or not sum(self.weights)):
+                raise ValueError("Choice weights must be non-negative, not all zero, one per value")
+        return self
+
+class ThinkTime(BaseModel):
+    distribution: ThinkTimeDistribution = ThinkTimeDistribution.EXPONENTIAL
+    mean_ms: float = Field(..., gt=0)
+    sigma: float = Field(0.5, gt=0, le=3)  # lognormal shape
+    max_ms: Optional[float] = Field(None, gt=0)  # Cap on a single think time
+
+class LoadStage(BaseModel):
+    name: Optional[str] = None
+    rps: Optional[int] = Field(None, gt=0)  # Open-loop target rate
+    concurrency: Optional[int] = Field(None, gt=0, le=1000)  # Closed-loop worker count
+    duration: int = Field(..., gt=0)
+    ramp: RampShape = RampShape.STEP
+    
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.rps is None) == (self.concurrency is None):
+            raise ValueError("A stage needs exactly one of rps or concurrency")
+        return self
+
+class ReplaySource(BaseModel):
+    start: datetime  # Window of recorded requests (by received_at) to replay
+    end: datetime
+    speedup: float = Field(1.0, gt=0, le=1000)  # Time-compression factor: 10 replays an hour in 6 minutes
+    endpoint: Optional[str] = None  # Only replay requests recorded for this endpoint
+    include_load_tests: bool = False  # Also replay traffic generated by earlier load tests
+    # Set by the multi-process runner: a shard replays every shard_count-th record
+    shard_index: int = Field(0, ge=0)
+    shard_count: int = Field(1, ge=1)
+    
+    @model_validator(mode="after")
+    def check_window(self):
+        if self.end <= self.start:
+            raise ValueError("Replay window end must be after its start")
+        return self
+
+class CapacitySearch(BaseModel):
+    start_rps: int = Field(..., gt=0)  # First probe rate
+    max_rps: int = Field(..., gt=0)  # Never probe above this
+    step_factor: float = Field(2.0, gt=1, le=10)  # Rate multiplier after each passing probe, until one fails
+    probe_duration: int = Field(10, gt=0, le=600)  # Seconds per probe
+    cooldown_sec: float = Field(2.0, ge=0, le=300)  # Idle time between probes so a saturated probe's backlog clears
+    # A probe passes when all of these hold
+    max_p99_ms: float = Field(..., gt=0)
+    max_error_rate: float = Field(1.0, ge=0.0, le=100.0)  # Percent of completed requests that failed
+    min_achieved_ratio: float = Field(0.95, gt=0, le=1)  # Achieved / target RPS: the rate must actually be sent
+    # Stop bisecting once the gap between the passing and failing rates is within this fraction of the failing rate
+    precision: float = Field(0.05, gt=0, lt=1)
+    max_probes: int = Field(20, gt=0, le=100)
+    
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.max_rps < self.start_rps:
+            raise ValueError("Capacity search max_rps must be at least start_rps")
+        return self
+
+class ServiceTime(BaseModel):
+    distribution: ServiceTimeDistribution = ServiceTimeDistribution.LOGNORMAL
+    mean_ms: float = Field(..., gt=0)
+    sigma: float = Field(0.5, gt=0, le=3)  # lognormal shape
+
+class SimulationConfig(BaseModel):
+    # Finished run whose recorded service times (and traces, when stored) calibrate the model
+    calibrate_from: Optional[str] = None
+    db_pool_size: int = Field(5, gt=0, le=1000)  # DB connections; SQLAlchemy's default pool holds 5
+    db_service_time: Optional[ServiceTime] = None  # Overrides the calibrated DB stage
+    front_service_time: Optional[ServiceTime] = None  # Overrides the calibrated rate-limit check + cache lookup
+    cache_hit_ratio: float = Field(0.1, ge=0, le=1)  # Requests repeating an idempotency key (the generator injects 10%)
+    db_error_rate: Optional[float] = Field(None, ge=0, le=100)  # Percent of DB attempts that fail; calibrated by default
+    max_retries: int = Field(2, ge=0, le=10)  # Per request, when retries_enabled
+    retry_backoff_ms: float = Field(50.0, ge=0, le=60000)  # Before the first retry, doubling after each
+    seed: Optional[int] = None
+    
+    @model_validator(mode="after")
+    def check_calibration(self):
+        if not self.calibrate_from and not self.db_service_time:
+            raise ValueError("A simulation needs calibrate_from or db_service_time")
+        return self
+
 class LoadTestConfig(BaseModel):
     # Test parameters
     total_requests: Optional[int] = Field(None, gt=0)
     rps: Optional[int] = Field(None, gt=0)
     duration: Optional[int] = Field(None, gt=0)  # Changed from duration to match frontend
+    stages: Optional[List[LoadStage]] = Field(None, min_length=1)  # Run in order; overrides rps/duration
+    virtual_users: Optional[int] = Field(None, gt=0, le=1000)  # Closed loop for `duration`: each user waits, thinks, repeats
+    think_time: Optional[ThinkTime] = None  # Pause between a user's requests (virtual_users and concurrency stages)
+    replay: Optional[ReplaySource] = None  # Replay recorded traffic; overrides all of the above
+    capacity_search: Optional[CapacitySearch] = None  # Probe rising RPS for the highest rate within the SLOs
+    simulation: Optional[SimulationConfig] = None  # Simulate the request pipeline instead of sending real traffic
     
     # Execution settings
     burst_mode: bool = False
     concurrency_limit: int = Field(10, gt=0, le=1000)
+    arrival_distribution: ArrivalDistribution = ArrivalDistribution.CONSTANT
+    execution_mode: ExecutionMode = ExecutionMode.IN_PROCESS
+    worker_processes: Optional[int] = Field(None, gt=0, le=64)  # Defaults to CPU count
+    transport: LoadTransport = LoadTransport.IN_PROCESS
+    http_pool_size: Optional[int] = Field(None, gt=0, le=1000)  # Defaults to concurrency_limit
     
     # Payload settings
     payload_strategy: PayloadStrategy = PayloadStrategy.FIXED
     base_payload: Dict[str, Any]
+    payload_fields: Optional[Dict[str, FieldDistribution]] = None  # pool: per-field distributions over base_payload
+    payload_pool_size: int = Field(10000, gt=0, le=1000000)  # pool/randomized: distinct payloads built before the run
+    payload_corpus: Optional[str] = None  # corpus: JSONL file name in the corpus directory
     
     # Feature toggles
     retries_enabled: bool = True
@@ -44,10 +204,52 @@ class LoadTestConfig(BaseModel):
     
     # Failure injection
     failure_injection: Optional[FailureInjectionConfig] = None
+    
+    # Stop early when an SLO threshold is breached
+    stop_conditions: Optional[StopConditions] = None
+    
+    # Delete the per-request rows from test_requests once they are archived
+    prune_archived_requests: bool = False
+    
+    @model_validator(mode="after")
+    def check_payload_source(self):
+        if self.payload_strategy == PayloadStrategy.POOL and not self.payload_fields:
+            raise ValueError("The pool payload strategy needs payload_fields")
+        if self.payload_strategy == PayloadStrategy.CORPUS and not self.payload_corpus:
+            raise ValueError("The corpus payload strategy needs payload_corpus")
+        return self
+    
+    @model_validator(mode="after")
+    def check_capacity_search(self):
+        if self.capacity_search is None:
+            return self
+        if self.stages or self.replay or self.virtual_users:
+            raise ValueError("capacity_search can't be combined with stages, replay or virtual_users")
+        # Each probe's verdict decides the next rate, so one process has to see every result as it lands
+        if self.execution_mode == ExecutionMode.MULTI_PROCESS:
+            raise ValueError("capacity_search runs in process only")
+        return self
+    
+    @model_validator(mode="after")
+    def check_simulation(self):
+        if self.simulation is None:
+            return self
+        if self.stages or self.replay or self.virtual_users or self.capacity_search:
+            raise ValueError("A simulation runs total_requests or rps and duration only")
+        if self.execution_mode == ExecutionMode.MULTI_PROCESS:
+            raise ValueError("A simulation runs in process only")
+        requests = self.total_requests or (self.rps or 5) * (self.duration or 30)
+        if requests > SIMULATION_MAX_REQUESTS:
+            raise ValueError(f"A simulation is limited to {SIMULATION_MAX_REQUESTS} requests")
+        return self
 
 class LoadTestRequest(BaseModel):
     config: LoadTestConfig
 
+class StopTestRequest(BaseModel):
+    drain_timeout_sec: float = Field(5.0, ge=0, le=300)  # In-flight requests still running after this are abandoned
+    reason: Optional[str] = None
+
 class LoadTestResult(BaseModel):
     test_id: str
     status: TestStatus
@@ -63,6 +265,22 @@ class LoadTestResult(BaseModel):
     start_time: Optional[datetime]
     end_time: Optional[datetime]
     duration_sec: Optional[float]
+    target_rps: Optional[float] = None
+    achieved_rps: Optional[float] = None
+    rps_timeline: Optional[List[Dict[str, Any]]] = None
+    p50_latency_ms: Optional[float] = None
+    p90_latency_ms: Optional[float] = None
+    p999_latency_ms: Optional[float] = None
+    max_latency_ms: Optional[float] = None
+    stage_results: Optional[List[Dict[str, Any]]] = None
+    latency_breakdown: Optional[Dict[str, Any]] = None  # response_time / service_time / queue_delay summaries, plus per-request-stage ones under request_stages
+    http_pool_stats: Optional[Dict[str, Any]] = None
+    stop_reason: Optional[str] = None
+    abandoned_requests: Optional[int] = None
+    virtual_user_stats: Optional[Dict[str, Any]] = None  # Per-user throughput and Little's law check
+    capacity_search: Optional[Dict[str, Any]] = None  # SLOs and probe history of a capacity search
+    saturation_rps: Optional[float] = None  # Highest probed rate that met the SLOs
+    simulation: Optional[Dict[str, Any]] = None  # Calibration and station utilization of a simulated run
 
 class LoadTestStatus(BaseModel):
     test_id: str
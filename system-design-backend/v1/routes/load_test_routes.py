@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException, status, Request
-from v1.models.load_test import LoadTestRequest, LoadTestResult, LoadTestStatus, TestStatus
+from fastapi import APIRouter, HTTPException, status, Request, Query
+from typing import List, Optional
+from v1.models.load_test import LoadTestRequest, LoadTestResult, LoadTestStatus, TestStatus, StopTestRequest
+from v1.services.database_service_traced import db_service_traced as db_service
 from v1.services.load_test_service import load_test_service
+from v1.services.load_test_comparison import comparison_service
+from v1.services.scalability_analysis import scalability_service
+from v1.services.load_test_archive import archive_service
+from v1.services.load_test_export import export_service, EXPORT_SECTIONS, EXPORT_FORMATS
+from v1.services.load_test_timeseries import LoadTestTimeSeries
 from v1.services.observability import logger
+from exceptions.retryable import DatabaseOverloadedException
 import json
 
 router = APIRouter(prefix="/tests")
@@ -22,11 +30,13 @@ async def start_load_test(request_body: LoadTestRequest, request: Request):
         print(f"DEBUG: Config: {config}")
         print(f"DEBUG: Config dict: {config.dict()}")
         
-        # Ensure either total_requests or (rps + duration) is provided
-        if not config.total_requests and not (config.rps and config.duration):
+        # Ensure either total_requests, (rps + duration), a staged profile, a replay or a capacity search is provided
+        if (not config.total_requests and not (config.rps and config.duration) and not config.stages
+                and not config.replay and not (config.virtual_users and config.duration) and not config.capacity_search):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Must provide either total_requests or both rps and duration"
+                detail="Must provide either total_requests, both rps and duration, stages, replay, "
+                       "virtual_users and duration, or capacity_search"
             )
         
         print("DEBUG: Starting load test service")
@@ -40,6 +50,12 @@ async def start_load_test(request_body: LoadTestRequest, request: Request):
             progress={"message": "Test started, executing in background"}
         )
         
+    except (HTTPException, DatabaseOverloadedException):
+        # The 400 above, and the 503 main.py returns when the database executor is full
+        raise
+    except ValueError as e:
+        # A bad payload configuration, e.g. a missing or empty corpus, found while building the payload source
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"DEBUG: Exception occurred: {e}")
         import traceback
@@ -49,6 +65,109 @@ async def start_load_test(request_body: LoadTestRequest, request: Request):
             detail=f"Failed to start load test: {str(e)}"
         )
 
+@router.get("/active", response_model=List[LoadTestStatus])
+async def list_active_load_tests():
+    """List tests that are currently running"""
+    return [
+        LoadTestStatus(
+            test_id=test["test_id"],
+            status=TestStatus.RUNNING,
+            progress={"message": "Test is stopping" if test["stopping"] else "Test is running",
+                      "stopping": test["stopping"], **(test["progress"] or {})}
+        )
+        for test in load_test_service.get_active_tests()
+    ]
+
+@router.get("/compare")
+async def compare_load_tests(
+    baseline: str = Query(..., description="test_id of the reference run"),
+    candidate: str = Query(..., description="test_id of the run being evaluated"),
+    alpha: float = Query(0.05, gt=0, lt=1, description="Significance level")
+):
+    """Compare latency distributions, throughput and error rates of two finished tests"""
+    runs = {}
+    for test_id in (baseline, candidate):
+        result = await load_test_service.get_test_result(test_id)
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Load test {test_id} not found"
+            )
+        if result["status"] not in (TestStatus.COMPLETED.value, TestStatus.STOPPED.value):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Load test {test_id} is {result['status']}; only finished tests can be compared"
+            )
+        runs[test_id] = result
+    
+    try:
+        return await comparison_service.compare(runs[baseline], runs[candidate], alpha)
+    except DatabaseOverloadedException:
+        raise
+    except Exception as e:
+        logger.error("load_test_comparison_failed", baseline=baseline, candidate=candidate, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to compare load tests: {str(e)}"
+        )
+
+@router.get("/scalability")
+async def analyze_scalability(
+    test_ids: List[str] = Query(..., description="Finished runs of one configuration at different concurrency levels"),
+    predict: Optional[List[int]] = Query(None, description="Concurrency levels to predict throughput and latency at")
+):
+    """Fit the Universal Scalability Law to the runs' throughput vs. concurrency and extrapolate"""
+    if predict and min(predict) < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Prediction concurrency levels must be at least 1"
+        )
+    
+    runs = []
+    for test_id in dict.fromkeys(test_ids):
+        result = await load_test_service.get_test_result(test_id)
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Load test {test_id} not found"
+            )
+        if result["status"] not in (TestStatus.COMPLETED.value, TestStatus.STOPPED.value):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Load test {test_id} is {result['status']}; only finished tests can be analyzed"
+            )
+        runs.append(result)
+    
+    try:
+        return await scalability_service.analyze(runs, predict)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("scalability_analysis_failed", test_ids=test_ids, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to analyze scalability: {str(e)}"
+        )
+
+@router.post("/{test_id}/stop", response_model=LoadTestStatus)
+async def stop_load_test(test_id: str, stop_request: Optional[StopTestRequest] = None):
+    """Stop a running load test and finalize it with the results collected so far"""
+    stop_request = stop_request or StopTestRequest()
+    if not await load_test_service.stop_test(test_id, stop_request.drain_timeout_sec, stop_request.reason):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Load test {test_id} is not running"
+        )
+    
+    return LoadTestStatus(
+        test_id=test_id,
+        status=TestStatus.RUNNING,
+        progress={
+            "message": f"Stopping; in-flight requests have {stop_request.drain_timeout_sec}s to finish",
+            "stopping": True
+        }
+    )
+
 @router.get("/{test_id}/result", response_model=LoadTestResult)
 async def get_load_test_result(test_id: str):
     """Get load test result by test_id"""
@@ -76,7 +195,23 @@ async def get_load_test_result(test_id: str):
             p99_latency_ms=result.get("p99_latency_ms"),
             start_time=result.get("started_at"),
             end_time=result.get("completed_at"),
-            duration_sec=result.get("duration_sec")
+            duration_sec=result.get("duration_sec"),
+            target_rps=result.get("target_rps"),
+            achieved_rps=result.get("achieved_rps"),
+            rps_timeline=json.loads(result["rps_timeline"]) if result.get("rps_timeline") else None,
+            p50_latency_ms=result.get("p50_latency_ms"),
+            p90_latency_ms=result.get("p90_latency_ms"),
+            p999_latency_ms=result.get("p999_latency_ms"),
+            max_latency_ms=result.get("max_latency_ms"),
+            stage_results=json.loads(result["stage_results"]) if result.get("stage_results") else None,
+            latency_breakdown=json.loads(result["latency_breakdown"]) if result.get("latency_breakdown") else None,
+            http_pool_stats=json.loads(result["http_pool_stats"]) if result.get("http_pool_stats") else None,
+            stop_reason=result.get("stop_reason"),
+            abandoned_requests=result.get("abandoned_requests"),
+            virtual_user_stats=json.loads(result["virtual_user_stats"]) if result.get("virtual_user_stats") else None,
+            capacity_search=json.loads(result["capacity_search"]) if result.get("capacity_search") else None,
+            saturation_rps=result.get("saturation_rps"),
+            simulation=json.loads(result["simulation"]) if result.get("simulation") else None
         )
         
     except HTTPException:
@@ -88,10 +223,86 @@ async def get_load_test_result(test_id: str):
             detail=f"Failed to fetch test result: {str(e)}"
         )
 
+@router.get("/{test_id}/timeseries")
+async def get_load_test_timeseries(test_id: str, resolution: int = Query(1, description="Bucket size in seconds: 1, 10 or 60")):
+    """Throughput, error rate and latency percentiles over the course of a finished test"""
+    if resolution not in LoadTestTimeSeries.RESOLUTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"resolution must be one of {', '.join(map(str, LoadTestTimeSeries.RESOLUTIONS))}"
+        )
+    
+    result = await load_test_service.get_test_result(test_id)
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Load test {test_id} not found"
+        )
+    
+    buckets = await load_test_service.get_timeseries(test_id, resolution)
+    return {"test_id": test_id, "status": result["status"], "resolution_sec": resolution, "buckets": buckets}
+
+@router.get("/{test_id}/archive")
+async def get_load_test_archive(test_id: str):
+    """Describe the columnar archive of a test's per-request data"""
+    archive = await db_service.run(archive_service.open, test_id)
+    if archive is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Load test {test_id} has no archive"
+        )
+    return archive.info()
+
+@router.post("/{test_id}/archive")
+async def archive_load_test(test_id: str, prune: bool = Query(False, description="Delete the test_requests rows once archived")):
+    """(Re)build a finished test's archive from test_requests, optionally pruning the rows"""
+    result = await load_test_service.get_test_result(test_id)
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Load test {test_id} not found"
+        )
+    if result["status"] not in (TestStatus.COMPLETED.value, TestStatus.STOPPED.value, TestStatus.FAILED.value):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Load test {test_id} is {result['status']}; only finished tests can be archived"
+        )
+    
+    try:
+        info = await db_service.run(archive_service.write, test_id)
+        if info is None:
+            # Nothing left in test_requests: keep an existing archive rather than replacing it
+            archive = await db_service.run(archive_service.open, test_id)
+            if archive is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Load test {test_id} has no request rows to archive"
+                )
+            info = archive.info()
+        pruned = await db_service.run(archive_service.prune, test_id) if prune else 0
+        return {**info, "pruned_rows": pruned}
+    except (HTTPException, DatabaseOverloadedException):
+        raise
+    except Exception as e:
+        logger.error("load_test_archive_failed", test_id=test_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to archive load test: {str(e)}"
+        )
+
 @router.get("/{test_id}/status", response_model=LoadTestStatus)
 async def get_load_test_status(test_id: str):
     """Get current status of a load test"""
     try:
+        # Running tests are served from in-memory counters, without a database read
+        live_progress = load_test_service.get_live_progress(test_id)
+        if live_progress:
+            return LoadTestStatus(
+                test_id=test_id,
+                status=TestStatus.RUNNING,
+                progress={"message": "Test is running", **live_progress}
+            )
+        
         result = await load_test_service.get_test_result(test_id)
         
         if not result:
@@ -110,6 +321,12 @@ async def get_load_test_status(test_id: str):
                 "succeeded": result.get("succeeded", 0),
                 "failed": result.get("failed", 0)
             }
+        elif result["status"] == TestStatus.STOPPED.value:
+            progress = {
+                "message": f"Test stopped: {result.get('stop_reason')}",
+                "succeeded": result.get("succeeded", 0),
+                "failed": result.get("failed", 0)
+            }
         
         return LoadTestStatus(
             test_id=test_id,
@@ -148,6 +365,53 @@ async def download_test_result(test_id: str):
             detail=f"Failed to download test result: {str(e)}"
         )
 
+@router.get("/{test_id}/export")
+async def export_test_data(
+    test_id: str,
+    format: str = Query("ndjson", description="ndjson or csv"),
+    include: Optional[List[str]] = Query(None, description="Sections: summary, requests, events"),
+    gzip: bool = Query(False, description="Gzip the stream")
+):
+    """Stream a test's summary, per-request rows and events as NDJSON or CSV"""
+    from fastapi.responses import StreamingResponse
+    
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of {', '.join(EXPORT_FORMATS)}"
+        )
+    sections = include or (list(EXPORT_SECTIONS) if format == "ndjson" else ["requests"])
+    unknown = [section for section in sections if section not in EXPORT_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sections: {', '.join(unknown)}; choose from {', '.join(EXPORT_SECTIONS)}"
+        )
+    if format == "csv" and len(sections) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV exports one section at a time"
+        )
+    
+    result = await load_test_service.get_test_result(test_id)
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Load test {test_id} not found"
+        )
+    
+    filename = f"load_test_{test_id}" + (f"_{sections[0]}" if format == "csv" else "") + f".{format}"
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        export_service.stream(result, sections, format, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 @router.post("/{test_id}/email")
 async def email_test_result(test_id: str, email: str):
     """Email test result (mock implementation)"""
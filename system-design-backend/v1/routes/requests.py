@@ -6,12 +6,16 @@ from datetime import datetime
 import hashlib
 import json
 from typing import List, Optional
-from v1.services.database_service_traced import db_service_traced as db_service
-from v1.services.idempotency_service import idempotency_service
+from v1.services.database_service_traced import db_service_traced as db_service, async_db_service_traced
+from v1.services.idempotency_service import async_idempotency_service
 from v1.services.cache_service import cache_service
 from v1.models.request import Request
 from v1.services.observability import logger, log_request_with_metrics, ACTIVE_REQUESTS
-from v1.services.rate_limiting_service import rate_limiting_service, WindowType
+from v1.services.stage_timer import (StageTimer, VALIDATION, ADMISSION, IDEMPOTENCY_READ_THROUGH, DB_INSERT,
+                                     CACHE_RESPONSE)
+from v1.services.rate_limiting_service import WindowType
+from v1.services.admission_service import async_admission_service
+from v1.services.http_load_client import get_traffic_client
 from tracing.trace_context import TraceContext
 from models.tracing.trace_models import EventType
 from config.failure_injection import config as failure_config
@@ -37,8 +41,10 @@ async def post_request(request_body: PostRequestModel, request: FastAPIRequest):
     
     ACTIVE_REQUESTS.inc()
     
+    timer = StageTimer()
+    
     # Start tracing context
-    with TraceContext(request_uuid, request_metadata_trace):
+    with TraceContext(request_uuid, request_metadata_trace, stage_timer=timer):
         try:
             headers = request.headers   
             if "Idempotency-Key" not in headers:
@@ -67,12 +73,20 @@ async def post_request(request_body: PostRequestModel, request: FastAPIRequest):
                 }
             )
             
-            if not rate_limiting_service.is_allowed(
+            timer.mark(VALIDATION)
+            
+            # Rate limit and cached-response lookup in one Redis round trip
+            allowed, existing_response = await async_admission_service.admit(
                 client_id=client_id,
                 max_requests=request_body.rate_limiting,
-                time_window=60, 
-                window_type=window_type
-            ):
+                time_window=60,
+                window_type=window_type,
+                idempotency_key=idempotency_key,
+                cache_enabled=request_body.cache_enabled
+            )
+            timer.mark(ADMISSION)
+            
+            if not allowed:
                 TraceContext.trace_event(
                     EventType.RATE_LIMIT_EXCEEDED,
                     {"client_id": client_id, "limit": request_body.rate_limiting}
@@ -84,12 +98,14 @@ async def post_request(request_body: PostRequestModel, request: FastAPIRequest):
                     detail="Rate limit exceeded"
                 )
             
-            # Enhanced caching with read-through pattern and tracing
-            existing_response = idempotency_service.get_response_with_read_through(
-                idempotency_key,
-                cache_enabled=request_body.cache_enabled,
-                cache_ttl=request_body.cache_ttl
-            )
+            # Read-through: fall back to the database when the cache had nothing
+            if existing_response is None:
+                existing_response = await async_idempotency_service.get_response_after_cache_miss(
+                    idempotency_key,
+                    cache_enabled=request_body.cache_enabled,
+                    cache_ttl=request_body.cache_ttl
+                )
+                timer.mark(IDEMPOTENCY_READ_THROUGH)
             
             if existing_response:
                 if request_body.cache_enabled:
@@ -115,7 +131,8 @@ async def post_request(request_body: PostRequestModel, request: FastAPIRequest):
             )
             
             # Database operations with automatic tracing via decorators
-            db_service.create(request_metadata, request_id=request_uuid)
+            await async_db_service_traced.create(request_metadata, request_id=request_uuid)
+            timer.mark(DB_INSERT)
             
             duration = time.time() - start_time
             request_metadata.latency_ms = int(duration * 1000)
@@ -127,12 +144,13 @@ async def post_request(request_body: PostRequestModel, request: FastAPIRequest):
             }
             
             # Cache with enhanced failure handling
-            idempotency_service.cache_response(
+            await async_idempotency_service.cache_response(
                 idempotency_key, 
                 response_data,
                 cache_enabled=request_body.cache_enabled,
                 cache_ttl=request_body.cache_ttl
             )
+            timer.mark(CACHE_RESPONSE)
             
             TraceContext.trace_event(
                 EventType.RESPONSE_SENT,
@@ -228,15 +246,9 @@ async def _execute_single_request(payload: PostRequestModel) -> TrafficResult:
     request_id = str(uuid.uuid4())
     
     try:
-        # Make actual HTTP request to our own endpoint
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:8000/requests/",
-                json=payload.dict(),
-                headers={"Idempotency-Key": request_id}
-            )
-            
+        # Make actual HTTP request to our own endpoint over the shared keep-alive pool
+        response = await get_traffic_client().post_request(payload.dict(), request_id)
+        
         duration = (time.time() - start_time) * 1000
         return TrafficResult(
             request_id=request_id,
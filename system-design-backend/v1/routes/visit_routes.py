@@ -5,12 +5,8 @@ from datetime import datetime
 
 router = APIRouter(prefix="/visits")
 
-@router.post("/track")
-async def track_visit(request: Request):
-    """Track a page visit"""
-    visitor_ip = request.client.host if request.client else "unknown"
-    user_agent = request.headers.get("user-agent", "unknown")
-    
+def _record_visit(visitor_ip: str, user_agent: str):
+    """Insert the visit and refresh visit_stats; runs on the database executor"""
     with db_service.get_session() as session:
         # Record the visit
         session.execute(
@@ -35,29 +31,30 @@ async def track_visit(request: Request):
         )
         
         session.commit()
+
+@router.post("/track")
+async def track_visit(request: Request):
+    """Track a page visit"""
+    visitor_ip = request.client.host if request.client else "unknown"
+    user_agent = request.headers.get("user-agent", "unknown")
+    
+    await db_service.run(_record_visit, visitor_ip, user_agent)
     
     return {"status": "tracked"}
 
 @router.get("/stats")
 async def get_visit_stats():
     """Get visit statistics"""
-    with db_service.get_session() as session:
-        result = session.execute(
-            text("SELECT total_visits, unique_visitors FROM visit_stats WHERE id = 1")
-        ).fetchone()
-        
-        if result:
-            return {
-                "total_visits": result[0],
-                "unique_visitors": result[1]
-            }
-        
-@router.get("/admin")
-async def get_admin_stats(password: str = None):
-    """Get detailed admin statistics"""
-    if password != "admin123":  # Simple password check
-        return {"error": "Unauthorized"}
+    rows = await db_service.run(
+        db_service.fetch_all,
+        text("SELECT total_visits, unique_visitors FROM visit_stats WHERE id = 1")
+    )
     
+    if rows:
+        return rows[0]
+        
+def _admin_stats():
+    """Visit and load test statistics for the admin view; runs on the database executor"""
     with db_service.get_session() as session:
         # Get visit stats
         visit_stats = session.execute(
@@ -91,15 +88,13 @@ async def get_admin_stats(password: str = None):
                 "completed_tests": test_stats[1] if test_stats else 0
             }
         }
-        
-@router.get("/admin/download")
-async def download_database(password: str = None):
-    """Download database data as JSON"""
+
+def _export_database():
+    """
+    Every visit and load test row as a JSON attachment; runs on the database
+    executor, which also keeps serializing the export off the loop
+    """
     from fastapi.responses import JSONResponse
-    import json
-    
-    if password != "admin123":
-        return {"error": "Unauthorized"}
     
     with db_service.get_session() as session:
         # Get all data
@@ -114,7 +109,23 @@ async def download_database(password: str = None):
             "test_requests": [dict(row._mapping) for row in test_requests]
         }
         
-        return JSONResponse(
-            content=data,
-            headers={"Content-Disposition": "attachment; filename=database_export.json"}
-        )
\ No newline at end of file
+    return JSONResponse(
+        content=data,
+        headers={"Content-Disposition": "attachment; filename=database_export.json"}
+    )
+
+@router.get("/admin")
+async def get_admin_stats(password: str = None):
+    """Get detailed admin statistics"""
+    if password != "admin123":  # Simple password check
+        return {"error": "Unauthorized"}
+    
+    return await db_service.run(_admin_stats)
+        
+@router.get("/admin/download")
+async def download_database(password: str = None):
+    """Download database data as JSON"""
+    if password != "admin123":
+        return {"error": "Unauthorized"}
+    
+    return await db_service.run(_export_database)
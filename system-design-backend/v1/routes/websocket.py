@@ -1,4 +1,5 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Dict, Set
 import json
 import asyncio
 
@@ -7,6 +8,8 @@ router = APIRouter()
 class ConnectionManager:
     def __init__(self):
         self.active_connections: list[WebSocket] = []
+        # Topics (e.g. load test ids) each connection subscribed to
+        self.subscriptions: Dict[WebSocket, Set[str]] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
@@ -15,6 +18,13 @@ class ConnectionManager:
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.subscriptions.pop(websocket, None)
+
+    def subscribe(self, websocket: WebSocket, topic: str):
+        self.subscriptions.setdefault(websocket, set()).add(topic)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        self.subscriptions.get(websocket, set()).discard(topic)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         try:
@@ -22,6 +32,15 @@ class ConnectionManager:
         except:
             self.disconnect(websocket)
 
+    async def broadcast(self, message: str, topic: str = None):
+        """Send to every connection, or only to subscribers of topic"""
+        if topic is None:
+            targets = list(self.active_connections)
+        else:
+            targets = [ws for ws, topics in self.subscriptions.items() if topic in topics]
+        if targets:
+            await asyncio.gather(*(self.send_personal_message(message, ws) for ws in targets))
+
 manager = ConnectionManager()
 
 @router.websocket("/ws")
@@ -33,6 +52,8 @@ async def websocket_endpoint(websocket: WebSocket):
             # Wait for any message from client (ping/pong)
             try:
                 data = await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
+                if await _handle_subscription(data, websocket):
+                    continue
                 # Echo back a simple response
                 await manager.send_personal_message(
                     json.dumps({"type": "pong", "data": "connected"}),
@@ -47,4 +68,34 @@ async def websocket_endpoint(websocket: WebSocket):
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception:
-        manager.disconnect(websocket)
\ No newline at end of file
+        manager.disconnect(websocket)
+
+async def _handle_subscription(data: str, websocket: WebSocket) -> bool:
+    """Handle {"type": "subscribe"|"unsubscribe", "test_id": ...}; returns False for other messages"""
+    try:
+        message = json.loads(data)
+    except ValueError:
+        return False
+    if not isinstance(message, dict) or message.get("type") not in ("subscribe", "unsubscribe") or not message.get("test_id"):
+        return False
+
+    test_id = message["test_id"]
+    if message["type"] == "unsubscribe":
+        manager.unsubscribe(websocket, test_id)
+        return True
+
+    manager.subscribe(websocket, test_id)
+    
+    # Import here to avoid circular imports
+    from v1.services.load_test_service import load_test_service
+    
+    # Send a full snapshot so the subscriber can apply later delta frames on top of it
+    await manager.send_personal_message(
+        json.dumps({
+            "type": "subscribed",
+            "test_id": test_id,
+            "progress": load_test_service.get_live_progress(test_id)
+        }),
+        websocket
+    )
+    return True
@@ -0,0 +1,110 @@
+import json
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from v1.services.cache_service import async_cache_service, CACHE_HITS, CACHE_MISSES, CACHE_FAILURES
+from v1.services.rate_limiting_service import WindowType
+from v1.services.redis_service import async_redis_service
+from v1.services.observability import logger
+
+# KEYS[1]: rate-limit key; KEYS[2] (optional): idempotency cache key
+# ARGV: window type, max requests, window seconds, now (epoch seconds), sliding-window member
+ADMISSION_SCRIPT = """
+local allowed = 1
+local max_requests = tonumber(ARGV[2])
+local window = tonumber(ARGV[3])
+if ARGV[1] == 'fixed' then
+    local count = tonumber(redis.call('GET', KEYS[1]) or '0')
+    if count >= max_requests then
+        allowed = 0
+    else
+        redis.call('INCR', KEYS[1])
+        if count == 0 then
+            redis.call('EXPIRE', KEYS[1], window)
+        end
+    end
+else
+    local now = tonumber(ARGV[4])
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+    if redis.call('ZCARD', KEYS[1]) >= max_requests then
+        allowed = 0
+    else
+        redis.call('ZADD', KEYS[1], now, ARGV[5])
+        redis.call('EXPIRE', KEYS[1], window)
+    end
+end
+if allowed == 0 or #KEYS < 2 then
+    return {allowed, false}
+end
+return {allowed, redis.call('GET', KEYS[2])}
+"""
+
+class AdmissionService:
+    """
+    Rate limit and idempotency lookup for one request in a single Redis round trip.
+
+    A server-side script checks and counts the request against its rate
+    limit and, if admitted, reads the cached idempotent response, atomically;
+    the separate GET-then-SET limiter could let concurrent requests through
+    past the limit. Fixed windows use the same counter keys as
+    RateLimitingService (an INCR on its JSON-encoded integer); sliding windows
+    keep a sorted set of arrival times instead of a JSON list. Like the other
+    Redis-backed services it fails open: without Redis every request is
+    admitted and the idempotency lookup falls back to the database.
+    """
+
+    def __init__(self):
+        self.redis = async_redis_service
+        self.cache = async_cache_service
+        self.enabled = async_redis_service.connected
+        self.script = async_redis_service.r.register_script(ADMISSION_SCRIPT)
+        logger.info(f"admission service initialized, enabled: {self.enabled}")
+
+    def _rate_limit_key(self, client_id: str, time_window: int, window_type: WindowType, now: float) -> str:
+        if window_type == WindowType.FIXED:
+            window_start = (int(now) // time_window) * time_window
+            return self.redis.hash_key(f"rate_limit:fixed:{client_id}:{window_start}")
+        return self.redis.hash_key(f"rate_limit:sliding_log:{client_id}")
+
+    async def admit(self, client_id: str, max_requests: int, time_window: int,
+                    window_type: WindowType = WindowType.FIXED, idempotency_key: str = None,
+                    cache_enabled: bool = True) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        (allowed, cached response). The cached response is None when the
+        request was rejected, caching is off, or the key is not cached yet.
+        """
+        if not self.enabled:
+            return True, None
+
+        now = time.time()
+        keys = [self._rate_limit_key(client_id, time_window, window_type, now)]
+        lookup = bool(idempotency_key and cache_enabled)
+        if lookup:
+            keys.append(self.redis.hash_key(self.cache._generate_cache_key("idempotency", idempotency_key)))
+
+        try:
+            allowed, cached = await self.script(
+                keys=keys,
+                args=[window_type.value, max_requests, time_window, now, f"{now}:{uuid.uuid4().hex}"]
+            )
+        except Exception as e:
+            CACHE_FAILURES.labels(operation="admission").inc()
+            logger.warning("admission_script_failed", client_id=client_id, error=str(e))
+            return True, None
+
+        if not allowed:
+            logger.warning("rate_limit_exceeded", client_id=client_id, window=window_type.value)
+            return False, None
+        if not lookup:
+            return True, None
+
+        if cached is None:
+            CACHE_MISSES.labels(cache_type="idempotency").inc()
+            return True, None
+        CACHE_HITS.labels(cache_type="idempotency").inc()
+        # Stored by AsyncCacheService.set: a JSON string of the JSON-encoded response
+        value = json.loads(cached)
+        return True, json.loads(value) if isinstance(value, str) else value
+
+async_admission_service = AdmissionService()
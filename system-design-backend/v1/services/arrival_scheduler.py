@@ -0,0 +1,118 @@
+import asyncio
+import math
+import random
+import time
+from typing import Dict, Any, List, AsyncIterator, Tuple
+
+from v1.models.load_test import ArrivalDistribution
+
+class ArrivalScheduler:
+    """
+    Open-loop arrival scheduler for sustained load tests.
+
+    Every arrival has an absolute target timestamp derived from the previous
+    target (never from the time the previous request was actually sent), so
+    scheduling overhead and event-loop lag cannot accumulate into drift. When
+    the loop stalls, overdue arrivals are released immediately to catch up.
+
+    The rate may ramp linearly from start_rps to rps over the window. Arrival
+    times come from inverting the cumulative intensity, so every distribution
+    follows the ramp exactly rather than stepping once per interval.
+    """
+
+    # Yield to the event loop at least this often while catching up after a stall
+    CATCH_UP_YIELD_EVERY = 100
+
+    def __init__(self, rps: float, duration: float,
+                 distribution: ArrivalDistribution = ArrivalDistribution.CONSTANT,
+                 start_rps: float = None, origin: float = None):
+        self.rps = rps
+        self.start_rps = rps if start_rps is None else start_rps
+        self.duration = duration
+        self.distribution = distribution
+        # Per-second buckets are counted from origin (defaults to the scheduler's own start)
+        self.origin = origin
+        self.start_time = None
+        self.sent = 0
+        self.last_send_time = None
+        self._target_per_second: Dict[int, int] = {}
+        self._achieved_per_second: Dict[int, int] = {}
+
+    def _next_work(self) -> float:
+        """Expected-arrival units until the next request, averaging 1 for every distribution"""
+        if self.distribution == ArrivalDistribution.POISSON:
+            return random.expovariate(1.0)
+        if self.distribution == ArrivalDistribution.UNIFORM:
+            return random.uniform(0, 2.0)
+        return 1.0
+
+    @property
+    def expected_arrivals(self) -> float:
+        return (self.start_rps + self.rps) / 2.0 * self.duration
+
+    def _offset_for(self, work: float) -> float:
+        """Seconds into the window at which `work` arrivals are expected (inverse cumulative rate)"""
+        if work > self.expected_arrivals:
+            return math.inf
+        if self.start_rps == self.rps:
+            return work / self.rps
+        slope = (self.rps - self.start_rps) / self.duration
+        return (math.sqrt(max(self.start_rps ** 2 + 2 * slope * work, 0.0)) - self.start_rps) / slope
+
+    async def arrivals(self) -> AsyncIterator[Tuple[int, float]]:
+        """Yield (request_index, target_time) at each scheduled arrival"""
+        self.start_time = time.perf_counter()
+        if self.origin is None:
+            self.origin = self.start_time
+        end_time = self.start_time + self.duration
+        work = 0.0
+        target = self.start_time
+        overdue_streak = 0
+
+        while target < end_time:
+            delay = target - time.perf_counter()
+            if delay > 0:
+                overdue_streak = 0
+                await asyncio.sleep(delay)
+            else:
+                # Behind schedule: release immediately, but don't starve in-flight requests
+                overdue_streak += 1
+                if overdue_streak % self.CATCH_UP_YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+
+            self.last_send_time = time.perf_counter()
+            self._count(self._target_per_second, target)
+            self._count(self._achieved_per_second, self.last_send_time)
+            yield self.sent, target
+
+            self.sent += 1
+            work += self._next_work()
+            target = self.start_time + self._offset_for(work)
+
+    def _count(self, buckets: Dict[int, int], timestamp: float):
+        second = int(timestamp - self.origin)
+        buckets[second] = buckets.get(second, 0) + 1
+
+    def rps_timeline(self) -> List[Dict[str, Any]]:
+        """Target vs. achieved send rate for each second of the run"""
+        seconds = set(self._target_per_second) | set(self._achieved_per_second)
+        return [
+            {
+                "second": second,
+                "target_rps": self._target_per_second.get(second, 0),
+                "achieved_rps": self._achieved_per_second.get(second, 0)
+            }
+            for second in sorted(seconds)
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """Overall target vs. achieved RPS for the scheduled window"""
+        if self.start_time is None or self.last_send_time is None:
+            return {}
+        # A run that fell behind keeps sending past its window; count that overrun
+        send_window = max(self.last_send_time - self.start_time, self.duration)
+        return {
+            "target_rps": self.expected_arrivals / self.duration,
+            "achieved_rps": self.sent / send_window,
+            "rps_timeline": self.rps_timeline()
+        }
@@ -1,6 +1,6 @@
 import json
 from typing import Optional, Any, Callable
-from v1.services.redis_service import redis_service
+from v1.services.redis_service import redis_service, async_redis_service
 from v1.services.observability import logger
 from prometheus_client import Counter, Histogram
 import hashlib
@@ -112,4 +112,66 @@ class CacheService:
             logger.error("cache_pattern_invalidation_failed", pattern=pattern, error=str(e))
             return 0
 
-cache_service = CacheService()
\ No newline at end of file
+cache_service = CacheService()
+
+class AsyncCacheService:
+    """CacheService for the event loop: same keys, encoding and metrics over the asyncio Redis client"""
+    def __init__(self):
+        self.redis = async_redis_service
+        self.default_ttl = cache_service.default_ttl
+
+    def _generate_cache_key(self, prefix: str, identifier: str) -> str:
+        return cache_service._generate_cache_key(prefix, identifier)
+
+    async def get(self, key: str, cache_type: str = "generic") -> Optional[Any]:
+        """Get value from cache with metrics"""
+        try:
+            with CACHE_LATENCY.time():
+                value = await self.redis.get(key)
+
+            if value is not None:
+                CACHE_HITS.labels(cache_type=cache_type).inc()
+                logger.debug("cache_hit", key=key, cache_type=cache_type)
+                return json.loads(value) if isinstance(value, str) else value
+            else:
+                CACHE_MISSES.labels(cache_type=cache_type).inc()
+                logger.debug("cache_miss", key=key, cache_type=cache_type)
+                return None
+
+        except Exception as e:
+            CACHE_FAILURES.labels(operation="get").inc()
+            logger.error("cache_get_failed", key=key, error=str(e))
+            return None
+
+    async def set(self, key: str, value: Any, ttl: int = None) -> bool:
+        """Set value in cache with failure handling"""
+        try:
+            ttl = ttl or self.default_ttl
+            serialized_value = json.dumps(value) if not isinstance(value, str) else value
+
+            with CACHE_LATENCY.time():
+                result = await self.redis.set(key, serialized_value, ttl=ttl)
+
+            logger.debug("cache_set", key=key, ttl=ttl)
+            return result
+
+        except Exception as e:
+            CACHE_FAILURES.labels(operation="set").inc()
+            logger.error("cache_set_failed", key=key, error=str(e))
+            return False
+
+    async def delete(self, key: str) -> bool:
+        """Delete key from cache (cache invalidation)"""
+        try:
+            with CACHE_LATENCY.time():
+                result = await self.redis.delete(key)
+
+            logger.info("cache_invalidated", key=key)
+            return result
+
+        except Exception as e:
+            CACHE_FAILURES.labels(operation="delete").inc()
+            logger.error("cache_delete_failed", key=key, error=str(e))
+            return False
+
+async_cache_service = AsyncCacheService()
\ No newline at end of file
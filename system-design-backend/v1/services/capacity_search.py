@@ -0,0 +1,93 @@
+import math
+from typing import Dict, Any, List, Optional
+
+from v1.models.load_test import CapacitySearch, LoadStage
+from v1.services.load_test_collector import LoadTestCollector
+
+class CapacitySearchState:
+    """
+    Drives a capacity search: which rate to probe next and when to stop.
+
+    The rate is multiplied by step_factor after every passing probe until
+    one fails (or max_rps passes), which brackets the saturation point
+    between the best passing rate and the lowest failing one. The bracket
+    is then bisected until it is within `precision` of the failing rate.
+    Each probe is judged on its own requests only: p99, error rate and
+    completed throughput against the target.
+    """
+
+    def __init__(self, search: CapacitySearch):
+        self.search = search
+        self.stages: List[LoadStage] = []
+        self.probes: List[Dict[str, Any]] = []
+        self.passing: Optional[int] = None  # Highest rate that met the SLOs
+        self.failing: Optional[int] = None  # Lowest rate that did not
+
+    def next_rate(self) -> Optional[int]:
+        """Rate for the next probe, or None when the search is done"""
+        if len(self.probes) >= self.search.max_probes:
+            return None
+        if not self.probes:
+            return self.search.start_rps
+        if self.failing is None:
+            if self.passing >= self.search.max_rps:
+                return None
+            return min(math.ceil(self.passing * self.search.step_factor), self.search.max_rps)
+        low = self.passing or 0
+        if self.failing - low <= max(1, self.search.precision * self.failing):
+            return None
+        return (low + self.failing) // 2
+
+    def probe_stage(self, rate: int) -> LoadStage:
+        stage = LoadStage(name=f"probe_{len(self.stages)}", rps=rate, duration=self.search.probe_duration)
+        self.stages.append(stage)
+        return stage
+
+    def judge(self, rate: int, collector: LoadTestCollector, elapsed_sec: float,
+              interrupted: bool = False) -> Dict[str, Any]:
+        """Record one probe's verdict; an interrupted probe (test stopped) gets none"""
+        completed = collector.total
+        p99 = collector.latency_histogram.percentile(99) if completed else None
+        error_rate = collector.status_counts["failed"] / completed * 100 if completed else None
+        throughput = completed / elapsed_sec if elapsed_sec > 0 else 0.0
+
+        failures = []
+        if not completed:
+            failures.append("no requests completed")
+        else:
+            if p99 > self.search.max_p99_ms:
+                failures.append(f"p99 {p99:.1f}ms exceeded {self.search.max_p99_ms}ms")
+            if error_rate > self.search.max_error_rate:
+                failures.append(f"error rate {error_rate:.1f}% exceeded {self.search.max_error_rate}%")
+        if throughput < rate * self.search.min_achieved_ratio:
+            failures.append(f"completed {throughput:.1f} rps of {rate} rps")
+
+        passed = None if interrupted else not failures
+        if passed:
+            self.passing = max(self.passing or 0, rate)
+        elif passed is False:
+            self.failing = min(self.failing or rate, rate)
+
+        probe = {
+            "probe": len(self.probes),
+            "target_rps": rate,
+            "throughput_rps": throughput,
+            "requests": completed,
+            "p99_ms": p99,
+            "error_rate": error_rate,
+            "passed": passed,
+            "failures": failures
+        }
+        self.probes.append(probe)
+        return probe
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "settings": self.search.dict(),
+            "saturation_rps": self.passing,
+            # "slo": bracketed by a failing probe; "max_rps": passed every rate up to max_rps;
+            # "incomplete": stopped or out of probes before either
+            "limit": "slo" if self.failing is not None else
+                     "max_rps" if self.passing is not None and self.passing >= self.search.max_rps else "incomplete",
+            "probes": self.probes
+        }
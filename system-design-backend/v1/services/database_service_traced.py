@@ -1,24 +1,82 @@
-from sqlalchemy import create_engine, text
+import asyncio
+from sqlalchemy import create_engine, text, select, insert, Table
 from sqlalchemy.orm import sessionmaker, Session
-from typing import TypeVar, Type, List, Optional
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from typing import TypeVar, Type, List, Optional, Callable, Dict, Any, Union
 import os
 from v1.models.request import Request
 from v1.services.observability import logger
+from middleware.failure_injection import inject_db_latency
+from v1.services.db_executor import db_executor
+from v1.services.group_commit_writer import GroupCommitWriter
 
 T = TypeVar('T')
 
+# SQLite with persistent storage in container
+DB_PATH = os.path.join('/app/data', 'load_test.db')
+
+# Columns added to existing tables after they first shipped. SQLite has no
+# "ADD COLUMN IF NOT EXISTS", so init_db adds whichever ones are missing.
+COLUMN_MIGRATIONS = {
+    "test_runs": {
+        "target_rps": "REAL",
+        "achieved_rps": "REAL",
+        "rps_timeline": "TEXT",
+        "p50_latency_ms": "REAL",
+        "p90_latency_ms": "REAL",
+        "p999_latency_ms": "REAL",
+        "max_latency_ms": "REAL",
+        "latency_histogram": "TEXT",
+        "stage_results": "TEXT",
+        "latency_breakdown": "TEXT",
+        "http_pool_stats": "TEXT",
+        "stop_reason": "TEXT",
+        "abandoned_requests": "INTEGER",
+        "virtual_user_stats": "TEXT",
+        "capacity_search": "TEXT",
+        "saturation_rps": "REAL",
+        "simulation": "TEXT",
+    },
+    "test_requests": {
+        "stage_index": "INTEGER",
+        "service_time_ms": "REAL",
+        "queue_delay_ms": "REAL",
+    },
+}
+
 class DatabaseServiceWithTracing:
     def __init__(self):
-        # Use SQLite with persistent storage in container
-        db_path = os.path.join('/app/data', 'load_test.db')
-        self.engine = create_engine(f"sqlite:///{db_path}")
+        self.engine = create_engine(f"sqlite:///{DB_PATH}")
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self.executor = db_executor
         self.init_db()
-        logger.info(f"SQLite database initialized at {db_path}")
+        logger.info(f"SQLite database initialized at {DB_PATH}")
     
     def get_session(self) -> Session:
         return self.SessionLocal()
     
+    async def run(self, fn: Callable[..., T], *args, reject_when_full: bool = True, **kwargs) -> T:
+        """
+        Run blocking database work (one of this service's methods, or a function
+        using its sessions) on the bounded executor so it never blocks the event
+        loop. Raises DatabaseOverloadedException when the executor queue is full.
+        """
+        return await self.executor.run(fn, *args, reject_when_full=reject_when_full, **kwargs)
+    
+    def execute_write(self, statement, params: Union[Dict[str, Any], List[Dict[str, Any]]] = None) -> int:
+        """Execute one statement (a list of params runs it executemany) and commit; returns the row count"""
+        with self.get_session() as session:
+            result = session.execute(statement, params or {})
+            session.commit()
+            return result.rowcount
+    
+    def fetch_all(self, statement, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Rows of a query as dicts"""
+        with self.get_session() as session:
+            return [dict(row._mapping) for row in session.execute(statement, params or {}).fetchall()]
+    
+    @inject_db_latency()
     def create(self, obj: T, request_id: str = None, session: Optional[Session] = None) -> T:
         # Import here to avoid circular dependency
         from models.tracing.trace_models import EventType
@@ -38,6 +96,7 @@ class DatabaseServiceWithTracing:
             db.refresh(obj)
             return obj
     
+    @inject_db_latency()
     def get_by_idempotency_key(self, idempotency_key: str, request_id: str = None, session: Optional[Session] = None) -> Optional[Request]:
         from models.tracing.trace_models import EventType
         from tracing.trace_context import TraceContext
@@ -101,6 +160,8 @@ class DatabaseServiceWithTracing:
                 for statement in statements:
                     conn.execute(text(statement))
                 conn.commit()
+            
+            self._apply_column_migrations()
         
         # Initialize visit tracking schema
         visit_schema_path = os.path.join(os.path.dirname(__file__), '../../visit_tracking_schema.sql')
@@ -117,5 +178,112 @@ class DatabaseServiceWithTracing:
                 # Initialize visit stats if not exists
                 conn.execute(text("INSERT OR IGNORE INTO visit_stats (id, total_visits, unique_visitors) VALUES (1, 0, 0)"))
                 conn.commit()
+    
+    def _apply_column_migrations(self):
+        """Add columns introduced after a table was created in an existing database"""
+        with self.engine.connect() as conn:
+            for table, columns in COLUMN_MIGRATIONS.items():
+                existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+                for column, column_type in columns.items():
+                    if column not in existing:
+                        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+                        logger.info("schema_column_added", table=table, column=column)
+            conn.commit()
+
+db_service_traced = DatabaseServiceWithTracing()
+
+class AsyncDatabaseServiceWithTracing:
+    """
+    Request-path operations of DatabaseServiceWithTracing on an asyncio engine
+    (aiosqlite), so a slow commit suspends only the request waiting on it.
+    Schema setup stays with the sync service, which runs first on import.
+
+    aiosqlite defaults to NullPool, which opens a connection (and its worker
+    thread) per session; a small pool keeps them. SQLite admits one writer at
+    a time and concurrent writers back off in its busy handler for tens of
+    milliseconds, so writes queue on an asyncio lock instead while reads
+    still run side by side.
+
+    create() without a session goes through a GroupCommitWriter per table:
+    rows from concurrent requests are inserted together, one Core executemany
+    and one commit per batch, and nothing is read back afterwards.
+    """
+    def __init__(self):
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{DB_PATH}", poolclass=AsyncAdaptedQueuePool,
+                                          pool_size=5, max_overflow=0)
+        self._write_lock = asyncio.Lock()
+        # Callers read attributes of returned rows after the session closes
+        self.SessionLocal = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+        self._writers: Dict[str, GroupCommitWriter] = {}
+        logger.info(f"async SQLite engine initialized at {DB_PATH}")
+
+    def get_session(self) -> AsyncSession:
+        return self.SessionLocal()
+
+    @inject_db_latency()
+    async def create(self, obj: T, request_id: str = None, session: Optional[AsyncSession] = None) -> T:
+        # Import here to avoid circular dependency
+        from models.tracing.trace_models import EventType
+        from tracing.trace_context import TraceContext
+
+        if TraceContext.get_request_id():
+            TraceContext.trace_event(EventType.DB_CALL_STARTED, {"operation": "create"})
+
+        if session:
+            session.add(obj)
+            await session.commit()
+            await session.refresh(obj)
+            return obj
+        await self._writer_for(obj.__table__).insert(self._row_values(obj))
+        return obj
+
+    def _writer_for(self, table: Table) -> GroupCommitWriter:
+        writer = self._writers.get(table.name)
+        if writer is None:
+            statement = insert(table)
+
+            async def write_rows(rows: List[Dict[str, Any]]):
+                async with self._write_lock, self.engine.begin() as conn:
+                    await conn.execute(statement, rows)
+
+            writer = self._writers[table.name] = GroupCommitWriter(write_rows, name=table.name)
+        return writer
+
+    @staticmethod
+    def _row_values(obj) -> Dict[str, Any]:
+        """
+        Column values of an ORM object for a Core insert. Scalar column defaults
+        are applied to the object too, since it is not refreshed after the insert.
+        """
+        row = {}
+        for column in obj.__table__.columns:
+            value = getattr(obj, column.key)
+            if value is None and column.default is not None and column.default.is_scalar:
+                value = column.default.arg
+                setattr(obj, column.key, value)
+            row[column.key] = value
+        return row
+
+    @inject_db_latency()
+    async def get_by_idempotency_key(self, idempotency_key: str, request_id: str = None,
+                                     session: Optional[AsyncSession] = None) -> Optional[Request]:
+        from models.tracing.trace_models import EventType
+        from tracing.trace_context import TraceContext
+
+        if TraceContext.get_request_id():
+            TraceContext.trace_event(EventType.DB_CALL_STARTED, {"operation": "get_by_idempotency_key"})
+
+        statement = select(Request).where(Request.idempotency_key == idempotency_key).limit(1)
+        if session:
+            return (await session.execute(statement)).scalars().first()
+        async with self.get_session() as db:
+            return (await db.execute(statement)).scalars().first()
+
+    async def close(self):
+        """Commit queued rows and close pooled connections; the engine reconnects on next use, from whichever loop is running"""
+        for writer in self._writers.values():
+            await writer.drain()
+        await self.engine.dispose()
+        self._write_lock = asyncio.Lock()
 
-db_service_traced = DatabaseServiceWithTracing()
\ No newline at end of file
+async_db_service_traced = AsyncDatabaseServiceWithTracing()
\ No newline at end of file
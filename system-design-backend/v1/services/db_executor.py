@@ -0,0 +1,111 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from exceptions.retryable import DatabaseOverloadedException
+from v1.services.observability import logger
+
+T = TypeVar('T')
+
+# Executor metrics
+DB_EXECUTOR_QUEUE_DEPTH = Gauge('db_executor_queue_depth', 'Database operations waiting for an executor thread')
+DB_EXECUTOR_BUSY_WORKERS = Gauge('db_executor_busy_workers', 'Executor threads running a database operation')
+DB_EXECUTOR_UTILIZATION = Gauge('db_executor_utilization', 'Fraction of executor threads busy right now')
+DB_EXECUTOR_BUSY_SECONDS = Counter('db_executor_busy_seconds_total',
+                                   'Thread-seconds spent running database operations; rate() / workers is average utilization')
+DB_EXECUTOR_WAIT = Histogram('db_executor_wait_seconds', 'Time a database operation waited for an executor thread',
+                             buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5])
+DB_EXECUTOR_DURATION = Histogram('db_executor_duration_seconds', 'Time a database operation ran on an executor thread')
+DB_EXECUTOR_REJECTIONS = Counter('db_executor_rejections_total', 'Database operations rejected because the queue was full')
+
+class DatabaseExecutor:
+    """
+    Bounded thread pool for blocking database work started from the event loop.
+
+    Unlike asyncio.to_thread, which shares the loop's default executor with
+    everything else, this pool is sized for the database and has a fixed
+    queue: once max_queue operations are waiting for a thread, run() raises
+    DatabaseOverloadedException immediately instead of queueing more work
+    that would only time out. The caller's contextvars (TraceContext's
+    request id among them) are copied into the worker thread.
+    """
+
+    def __init__(self, max_workers: int = None, max_queue: int = None):
+        self.max_workers = max_workers or int(os.getenv("DB_EXECUTOR_WORKERS", "4"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("DB_EXECUTOR_QUEUE_SIZE", "64"))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="db-executor")
+        # Counters change on the loop (submit) and in worker threads (start/finish)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._busy = 0
+        logger.info("database executor initialized", max_workers=self.max_workers, max_queue=self.max_queue)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    @property
+    def busy_workers(self) -> int:
+        return self._busy
+
+    async def run(self, fn: Callable[..., T], *args, reject_when_full: bool = True, **kwargs) -> T:
+        """
+        Run fn(*args, **kwargs) on an executor thread and await its result.
+
+        reject_when_full=False queues the operation even past max_queue; it is
+        for bookkeeping writes that must not be lost (a handful per load test),
+        not for per-request work.
+        """
+        with self._lock:
+            if reject_when_full and self._queued >= self.max_queue:
+                DB_EXECUTOR_REJECTIONS.inc()
+                raise DatabaseOverloadedException(
+                    f"Database executor queue is full ({self._queued} waiting, {self._busy}/{self.max_workers} busy)"
+                )
+            self._queued += 1
+            DB_EXECUTOR_QUEUE_DEPTH.set(self._queued)
+
+        context = contextvars.copy_context()
+        future = self._pool.submit(context.run, self._call, time.perf_counter(), fn, args, kwargs)
+        future.add_done_callback(self._cancelled_before_start)
+        return await asyncio.wrap_future(future)
+
+    def _call(self, submitted: float, fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._busy += 1
+            self._set_gauges()
+        DB_EXECUTOR_WAIT.observe(started - submitted)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._busy -= 1
+                self._set_gauges()
+            DB_EXECUTOR_DURATION.observe(elapsed)
+            DB_EXECUTOR_BUSY_SECONDS.inc(elapsed)
+
+    def _cancelled_before_start(self, future: Future):
+        # Awaiting callers that are cancelled cancel the queued future; it never reaches _call
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self._set_gauges()
+
+    def _set_gauges(self):
+        DB_EXECUTOR_QUEUE_DEPTH.set(self._queued)
+        DB_EXECUTOR_BUSY_WORKERS.set(self._busy)
+        DB_EXECUTOR_UTILIZATION.set(self._busy / self.max_workers)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+db_executor = DatabaseExecutor()
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from v1.services.observability import logger
+
+# Group commit metrics
+GROUP_COMMIT_BATCH_SIZE = Histogram('db_group_commit_batch_size', 'Rows inserted per group commit',
+                                    buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256])
+GROUP_COMMIT_WAIT = Histogram('db_group_commit_wait_seconds', 'Time a row waited for its batch to commit',
+                              buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0])
+GROUP_COMMIT_FLUSH_DURATION = Histogram('db_group_commit_flush_duration_seconds', 'Time to insert and commit one batch')
+GROUP_COMMIT_FALLBACKS = Counter('db_group_commit_fallbacks_total',
+                                 'Batches that failed and were retried one row per transaction')
+
+class GroupCommitWriter:
+    """
+    Group commit for single-row inserts issued concurrently from the event loop.
+
+    insert() queues a row and waits until the batch holding it commits. One
+    batch is written at a time, as one executemany INSERT in one transaction:
+    rows that arrive while a batch is committing form the next one, which is
+    written as soon as the first commits, so under load concurrent requests
+    share a commit (and its fsync) instead of queueing for one each. An idle
+    writer waits max_delay for company before writing (0 writes on the next
+    loop iteration), and a batch never exceeds max_rows. If a batch fails,
+    its rows are retried one transaction each, so only the callers whose rows
+    fail see an exception.
+
+    write_rows(rows) does the insert and commit; the caller owns the engine.
+    """
+
+    def __init__(self, write_rows: Callable[[List[Dict[str, Any]]], Awaitable[None]], name: str,
+                 max_rows: int = None, max_delay: float = None):
+        self.write_rows = write_rows
+        self.name = name
+        self.max_rows = max_rows or int(os.getenv("DB_GROUP_COMMIT_MAX_ROWS", "64"))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv("DB_GROUP_COMMIT_DELAY_MS", "0")) / 1000
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writing: Optional[asyncio.Task] = None
+
+    async def insert(self, row: Dict[str, Any]):
+        """Queue a row and return once it is committed; raises what its insert raised"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future, time.perf_counter()))
+        # While a batch is committing, rows wait for it to finish instead of a timer
+        if self._writing is None:
+            if len(self._pending) >= self.max_rows:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_delay, self._flush)
+        await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._writing is not None or not self._pending:
+            return
+        batch, self._pending = self._pending[:self.max_rows], self._pending[self.max_rows:]
+        self._writing = asyncio.get_running_loop().create_task(self._write(batch))
+        self._writing.add_done_callback(self._written)
+
+    def _written(self, task: asyncio.Task):
+        self._writing = None
+        self._flush()
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]]):
+        start_time = time.perf_counter()
+        try:
+            await self.write_rows([row for row, _, _ in batch])
+        except Exception as e:
+            GROUP_COMMIT_FALLBACKS.inc()
+            logger.warning("group_commit_batch_failed", writer=self.name, batch_size=len(batch), error=str(e))
+            for row, future, queued_at in batch:
+                try:
+                    await self.write_rows([row])
+                except Exception as row_error:
+                    self._resolve(future, queued_at, row_error)
+                else:
+                    self._resolve(future, queued_at)
+            return
+
+        GROUP_COMMIT_BATCH_SIZE.observe(len(batch))
+        GROUP_COMMIT_FLUSH_DURATION.observe(time.perf_counter() - start_time)
+        for _, future, queued_at in batch:
+            self._resolve(future, queued_at)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, queued_at: float, error: Exception = None):
+        GROUP_COMMIT_WAIT.observe(time.perf_counter() - queued_at)
+        # The caller may have been cancelled while its row was being written
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
+
+    async def drain(self):
+        """Write everything queued and wait for it to commit"""
+        self._flush()
+        while self._writing is not None:
+            await asyncio.gather(self._writing, return_exceptions=True)
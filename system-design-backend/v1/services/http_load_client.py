@@ -0,0 +1,111 @@
+import os
+from typing import Dict, Any, List, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+from v1.services.observability import logger
+
+# HTTP transport metrics
+HTTP_CONNECTIONS_OPENED = Counter('load_test_http_connections_opened_total', 'TCP connections opened by the load test HTTP client')
+HTTP_REQUESTS_SENT = Counter('load_test_http_requests_total', 'Requests sent by the load test HTTP client')
+HTTP_IN_FLIGHT = Gauge('load_test_http_in_flight', 'Load test HTTP requests currently in flight')
+
+DEFAULT_TARGET_URL = os.getenv('LOAD_TEST_TARGET_URL', 'http://localhost:8000')
+
+class HttpLoadClient:
+    """
+    Pooled keep-alive HTTP client for driving the real /requests/ endpoint.
+
+    One httpx.AsyncClient is shared by every request, capped at pool_size
+    connections that are all kept alive, so after warm-up requests reuse
+    open connections instead of paying TCP setup each time. Requests beyond
+    the cap wait for a free connection. Connection opens are counted through
+    httpcore's trace extension, which gives the reuse ratio.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, pool_size: int = 100, timeout: float = 30.0):
+        self.base_url = base_url or DEFAULT_TARGET_URL
+        self.pool_size = pool_size
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            # No pool timeout: waiting for a connection is queueing, not a failure
+            timeout=httpx.Timeout(timeout, pool=None)
+        )
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "connections_opened": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0
+        }
+
+    async def post_request(self, payload: Dict[str, Any], idempotency_key: str) -> httpx.Response:
+        """POST one request to the target service"""
+        self._stats["requests"] += 1
+        self._stats["in_flight"] += 1
+        self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._stats["in_flight"])
+        HTTP_REQUESTS_SENT.inc()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            return await self._client.post(
+                "/requests/",
+                json=payload,
+                headers={"Idempotency-Key": idempotency_key},
+                extensions={"trace": self._trace}
+            )
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            self._stats["in_flight"] -= 1
+            HTTP_IN_FLIGHT.dec()
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+            HTTP_CONNECTIONS_OPENED.inc()
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection pool usage so far"""
+        return self._summarize(self.pool_size, self._stats)
+
+    async def close(self):
+        await self._client.aclose()
+        logger.info("http_load_client_closed", base_url=self.base_url, **self.stats())
+
+    @classmethod
+    def merge_stats(cls, stats_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine pool stats from several clients (e.g. one per generator process)"""
+        totals = {key: sum(stats[key] for stats in stats_list)
+                  for key in ("requests", "errors", "connections_opened", "peak_in_flight")}
+        return cls._summarize(sum(stats["pool_size"] for stats in stats_list), totals)
+
+    @staticmethod
+    def _summarize(pool_size: int, counters: Dict[str, Any]) -> Dict[str, Any]:
+        requests = counters["requests"]
+        return {
+            "pool_size": pool_size,
+            "requests": requests,
+            "errors": counters["errors"],
+            "connections_opened": counters["connections_opened"],
+            # Share of requests that went out on an already-open connection
+            "connection_reuse_ratio": 1 - counters["connections_opened"] / requests if requests else None,
+            "peak_in_flight": counters["peak_in_flight"]
+        }
+
+_traffic_client: Optional[HttpLoadClient] = None
+
+def get_traffic_client() -> HttpLoadClient:
+    """Shared client for ad-hoc traffic generation (/requests/generate)"""
+    global _traffic_client
+    if _traffic_client is None:
+        _traffic_client = HttpLoadClient()
+    return _traffic_client
+
+async def close_traffic_client():
+    global _traffic_client
+    if _traffic_client is not None:
+        await _traffic_client.close()
+        _traffic_client = None
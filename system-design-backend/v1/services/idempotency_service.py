@@ -1,5 +1,5 @@
 from typing import Optional, Dict, Any
-from v1.services.database_service_traced import db_service_traced as db_service
+from v1.services.database_service_traced import db_service_traced as db_service, async_db_service_traced as async_db_service
 from v1.services.observability import logger
 
 class IdempotencyService:
@@ -94,4 +94,58 @@ class IdempotencyService:
         pattern = "idempotency:*"
         return self.cache.invalidate_pattern(pattern)
 
-idempotency_service = IdempotencyService()
\ No newline at end of file
+idempotency_service = IdempotencyService()
+
+class AsyncIdempotencyService:
+    """Request-path methods of IdempotencyService over the asyncio cache and database clients"""
+    def __init__(self):
+        try:
+            from v1.services.cache_service import async_cache_service
+            self.cache = async_cache_service
+            self.cache_enabled = True
+        except Exception:
+            self.cache = None
+            self.cache_enabled = False
+        self.db = async_db_service
+        logger.info(f"async idempotency service initialized, cache enabled: {self.cache_enabled}")
+
+    def _get_cache_key(self, idempotency_key: str) -> str:
+        """Generate cache key for idempotency"""
+        if self.cache:
+            return self.cache._generate_cache_key("idempotency", idempotency_key)
+        return f"idempotency:{idempotency_key}"
+
+    async def _fetch_from_db(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        existing_request = await self.db.get_by_idempotency_key(idempotency_key)
+        if existing_request:
+            return {
+                "status": 200,
+                "status_message": "received",
+                "request_id": existing_request.request_id
+            }
+        return None
+
+    async def get_response_after_cache_miss(self, idempotency_key: str, cache_enabled: bool = True,
+                                            cache_ttl: int = 300) -> Optional[Dict[str, Any]]:
+        """
+        Database half of the read-through, for callers that already looked the
+        key up in the cache (the admission script) and missed
+        """
+        response = await self._fetch_from_db(idempotency_key)
+        if response and cache_enabled and self.cache_enabled and self.cache:
+            logger.info("request_served_from_database", idempotency_key=idempotency_key)
+            await self.cache.set(self._get_cache_key(idempotency_key), response, cache_ttl)
+        return response
+
+    async def cache_response(self, idempotency_key: str, response_data: Dict[str, Any],
+                             cache_enabled: bool = True, cache_ttl: int = 300):
+        """Cache response data with failure handling"""
+        if not cache_enabled or not self.cache_enabled or not self.cache:
+            return
+
+        success = await self.cache.set(self._get_cache_key(idempotency_key), response_data, ttl=cache_ttl)
+
+        if not success:
+            logger.warning("failed_to_cache_response", idempotency_key=idempotency_key)
+
+async_idempotency_service = AsyncIdempotencyService()
\ No newline at end of file
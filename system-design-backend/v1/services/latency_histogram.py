@@ -0,0 +1,135 @@
+import math
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+class LatencyHistogram:
+    """
+    Streaming, mergeable log-bucketed latency histogram.
+
+    A value v lands in bucket ceil(log_gamma(v)) with gamma = (1 + a) / (1 - a),
+    so every reported percentile is within relative error `a` of the true value.
+    Memory depends only on the range of values seen (about 1,100 buckets span
+    1 microsecond to 1 hour at 1% accuracy), never on the number of samples.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value_ms: float = 0.001):
+        self.relative_accuracy = relative_accuracy
+        self.min_value_ms = min_value_ms
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0  # Values at or below min_value_ms
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, value_ms: float):
+        """Add a single latency sample"""
+        self.count += 1
+        self.sum += value_ms
+        if self.min is None or value_ms < self.min:
+            self.min = value_ms
+        if self.max is None or value_ms > self.max:
+            self.max = value_ms
+
+        if value_ms <= self.min_value_ms:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value_ms) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def record_many(self, values_ms: np.ndarray):
+        """Add a batch of samples in one vectorized pass"""
+        values_ms = np.asarray(values_ms, dtype=np.float64)
+        if not values_ms.size:
+            return
+        self.count += int(values_ms.size)
+        self.sum += float(values_ms.sum())
+        low, high = float(values_ms.min()), float(values_ms.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+        above = values_ms[values_ms > self.min_value_ms]
+        self.zero_count += int(values_ms.size - above.size)
+        indices, counts = np.unique(np.ceil(np.log(above) / self._log_gamma).astype(np.int64), return_counts=True)
+        for index, bucket_count in zip(indices.tolist(), counts.tolist()):
+            self.buckets[index] = self.buckets.get(index, 0) + bucket_count
+
+    def merge(self, other: "LatencyHistogram"):
+        """Fold another histogram with the same accuracy into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge histograms with different relative accuracy")
+        if not other.count:
+            return
+
+        self.count += other.count
+        self.sum += other.sum
+        self.zero_count += other.zero_count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        for index, bucket_count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + bucket_count
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Value at the given percentile (0-100), within the configured relative error"""
+        if not self.count:
+            return None
+        if percentile >= 100:
+            return self.max
+
+        rank = percentile / 100.0 * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return self.min
+
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Headline latency statistics for a run"""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact JSON-serializable form, suitable for storing with a run"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value_ms": self.min_value_ms,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "zero_count": self.zero_count,
+            "buckets": [[index, self.buckets[index]] for index in sorted(self.buckets)]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(data["relative_accuracy"], data["min_value_ms"])
+        histogram.count = data["count"]
+        histogram.sum = data["sum"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        histogram.zero_count = data["zero_count"]
+        histogram.buckets = {index: bucket_count for index, bucket_count in data["buckets"]}
+        return histogram
@@ -0,0 +1,38 @@
+"""
+Process-pool entry point for multi-process load generation.
+
+Each worker process runs its own event loop and its own LoadTestService
+instance, generating one shard of the test's load against the shared
+database and Redis.
+"""
+import asyncio
+from typing import Dict, Any
+
+from v1.models.load_test import LoadTestConfig
+
+def run_generator_shard(test_id: str, config_json: str, shard_index: int, shard_count: int,
+                        control: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one shard of a load test to completion and return its collector.
+
+    control is a multiprocessing Manager dict shared by the parent and all
+    shards; a "stop" entry in it stops every shard.
+    """
+    # Import inside the worker so each process builds its own service singletons
+    from v1.services.load_test_service import load_test_service
+    
+    config = LoadTestConfig.parse_raw(config_json)
+    return asyncio.run(_execute_shard(load_test_service, test_id, config, shard_index, shard_count, control))
+
+async def _execute_shard(load_test_service, test_id: str, config: LoadTestConfig, shard_index: int, shard_count: int,
+                         control: Dict[str, Any]) -> Dict[str, Any]:
+    from v1.services.database_service_traced import async_db_service_traced
+    from v1.services.redis_service import async_redis_service
+
+    try:
+        return await load_test_service.execute_shard(test_id, config, shard_index, shard_count, control)
+    finally:
+        # The asyncio clients' pooled connections belong to this loop, and open
+        # aiosqlite connections keep their threads (and the worker process) alive
+        await async_db_service_traced.close()
+        await async_redis_service.close()
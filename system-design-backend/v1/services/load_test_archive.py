@@ -0,0 +1,193 @@
+import json
+import os
+import struct
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+
+from v1.services.database_service_traced import db_service_traced as db_service
+from v1.services.observability import logger
+
+ARCHIVE_DIR = os.path.join('/app/data', 'archives')
+
+MAGIC = b"LTARCH1\n"
+ALIGNMENT = 64
+
+# Column name -> dtype. Missing floats are NaN, missing integers -1
+COLUMNS = (
+    ("offset_ms", "<f8"),        # Request start, ms after the run's first request
+    ("latency_ms", "<f4"),
+    ("service_time_ms", "<f4"),
+    ("queue_delay_ms", "<f4"),
+    ("status_code", "<i2"),
+    ("status", "u1"),            # Index into STATUSES; 255 for anything else
+    ("stage_index", "<i2"),
+)
+STATUSES = ("success", "failed", "rate_limited", "duplicate", "pending")
+UNKNOWN_STATUS = 255
+
+class LoadTestArchive:
+    """
+    Read-only view of one run's archived per-request data.
+
+    The file is a small JSON header followed by one contiguous, 64-byte
+    aligned array per column, so every column maps straight into memory
+    with np.memmap: nothing is read until it is touched and analytics
+    only page in the columns they use.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a load test archive")
+            (header_length,) = struct.unpack("<I", f.read(4))
+            self.header = json.loads(f.read(header_length))
+        self.rows: int = self.header["rows"]
+        self.statuses: List[str] = self.header["statuses"]
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy, read-only view of one column"""
+        if name not in self._columns:
+            spec = self.header["columns"][name]
+            if not self.rows:
+                self._columns[name] = np.empty(0, dtype=spec["dtype"])
+            else:
+                self._columns[name] = np.memmap(self.path, dtype=spec["dtype"], mode="r",
+                                                offset=spec["offset"], shape=(self.rows,))
+        return self._columns[name]
+
+    def status_mask(self, status: str) -> np.ndarray:
+        """Boolean mask of requests with the given status"""
+        if status not in self.statuses:
+            return np.zeros(self.rows, dtype=bool)
+        return self.column("status") == self.statuses.index(status)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "test_id": self.header["test_id"],
+            "rows": self.rows,
+            "first_request_at": self.header["first_request_at"],
+            "size_bytes": os.path.getsize(self.path),
+            "columns": {name: spec["dtype"] for name, spec in self.header["columns"].items()},
+            "statuses": self.statuses
+        }
+
+class LoadTestArchiveService:
+    """
+    Compacts a finished run's test_requests rows into a columnar archive.
+
+    Rows are streamed out of SQLite in chunks and written straight into the
+    memory-mapped columns of the new file, so memory stays bounded however
+    large the run is. Once archived, the SQLite rows can be pruned and the
+    analytics read the archive instead.
+    """
+
+    CHUNK_SIZE = 50000
+
+    def path_for(self, test_id: str) -> str:
+        return os.path.join(ARCHIVE_DIR, f"{test_id}.ltarch")
+
+    def open(self, test_id: str) -> Optional[LoadTestArchive]:
+        """The run's archive, or None if it has not been archived"""
+        path = self.path_for(test_id)
+        return LoadTestArchive(path) if os.path.exists(path) else None
+
+    def write(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """Archive the run's test_requests rows; returns the archive info (None if there are no rows)"""
+        connection = db_service.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT COUNT(*), MIN(started_at) FROM test_requests WHERE test_id = ?", (test_id,))
+            rows, first_request_at = cursor.fetchone()
+            if not rows:
+                return None
+
+            header = {
+                "version": 1,
+                "test_id": test_id,
+                "rows": rows,
+                "first_request_at": str(first_request_at),
+                "statuses": list(STATUSES),
+                "columns": {}
+            }
+            # Header size must be known before column offsets; reserve room for the largest offsets
+            header_length = len(json.dumps(self._with_offsets(header, 10 ** 15)).encode()) + 32
+            offset = self._align(len(MAGIC) + 4 + header_length)
+            header = self._with_offsets(header, offset)
+
+            os.makedirs(ARCHIVE_DIR, exist_ok=True)
+            path = self.path_for(test_id)
+            temp_path = f"{path}.tmp"
+            encoded = json.dumps(header).encode().ljust(header_length)
+            with open(temp_path, "wb") as f:
+                f.write(MAGIC)
+                f.write(struct.pack("<I", header_length))
+                f.write(encoded)
+                last = list(header["columns"].values())[-1]
+                f.truncate(last["offset"] + rows * np.dtype(last["dtype"]).itemsize)
+
+            columns = {
+                name: np.memmap(temp_path, dtype=spec["dtype"], mode="r+", offset=spec["offset"], shape=(rows,))
+                for name, spec in header["columns"].items()
+            }
+            status_case = " ".join(f"WHEN '{status}' THEN {index}" for index, status in enumerate(STATUSES))
+            cursor.execute(f"""
+                SELECT started_at, latency_ms, service_time_ms, queue_delay_ms,
+                       COALESCE(status_code, -1),
+                       CASE status {status_case} ELSE {UNKNOWN_STATUS} END,
+                       COALESCE(stage_index, -1)
+                FROM test_requests WHERE test_id = ? ORDER BY id
+            """, (test_id,))
+
+            origin = np.datetime64(str(first_request_at), "us")
+            written = 0
+            while True:
+                chunk = cursor.fetchmany(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                started_at, *values = zip(*chunk)
+                end = written + len(chunk)
+                # Timestamps parse in one vectorized pass at microsecond precision
+                columns["offset_ms"][written:end] = (np.array(started_at, dtype="datetime64[us]") - origin) / np.timedelta64(1, "ms")
+                for (name, _), column_values in zip(COLUMNS[1:], values):
+                    # None becomes NaN in the float columns
+                    columns[name][written:end] = np.array(column_values, dtype=np.float64)
+                written = end
+
+            for column in columns.values():
+                column.flush()
+            del columns
+            os.replace(temp_path, path)
+        finally:
+            connection.close()
+
+        info = LoadTestArchive(path).info()
+        logger.info("load_test_archived", **info)
+        return info
+
+    def prune(self, test_id: str) -> int:
+        """Delete the run's test_requests rows; only allowed once an archive holds them"""
+        archive = self.open(test_id)
+        if archive is None:
+            raise ValueError(f"Load test {test_id} has no archive")
+        with db_service.get_session() as session:
+            result = session.execute(text("DELETE FROM test_requests WHERE test_id = :test_id"), {"test_id": test_id})
+            session.commit()
+        logger.info("load_test_requests_pruned", test_id=test_id, rows=result.rowcount, archived_rows=archive.rows)
+        return result.rowcount
+
+    def _with_offsets(self, header: Dict[str, Any], offset: int) -> Dict[str, Any]:
+        columns = {}
+        for name, dtype in COLUMNS:
+            columns[name] = {"dtype": dtype, "offset": offset}
+            offset = self._align(offset + header["rows"] * np.dtype(dtype).itemsize)
+        return {**header, "columns": columns}
+
+    @staticmethod
+    def _align(offset: int) -> int:
+        return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+archive_service = LoadTestArchiveService()
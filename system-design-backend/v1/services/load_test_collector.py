@@ -0,0 +1,93 @@
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from v1.services.latency_histogram import LatencyHistogram
+from v1.services.load_test_timeseries import LoadTestTimeSeries
+
+class LoadTestCollector:
+    """
+    Aggregates request outcomes as they complete so a run never has to hold
+    one result per request. Latencies go into a streaming histogram, so
+    memory stays constant however many requests the run makes.
+
+    latency_ms is the corrected response time (queue delay + service time);
+    the two components are kept in their own histograms. In-process requests
+    also report request_stages_ms, their server-side StageTimer breakdown,
+    kept in one histogram per request stage.
+    """
+
+    STATUSES = ("success", "failed", "rate_limited", "duplicate")
+
+    def __init__(self, parent: Optional["LoadTestCollector"] = None):
+        # A stage's collector also feeds the whole-run collector it belongs to
+        self.parent = parent
+        self.total = 0
+        self.status_counts: Dict[str, int] = {status: 0 for status in self.STATUSES}
+        self.latency_histogram = LatencyHistogram()
+        self.service_time_histogram = LatencyHistogram()
+        self.queue_delay_histogram = LatencyHistogram()
+        # One per request stage seen; HTTP-transport results report none
+        self.request_stage_histograms: Dict[str, LatencyHistogram] = {}
+        # Completions since the last rotation, for rolling live percentiles
+        self.recent_histogram = LatencyHistogram()
+        # Only the whole-run collector keeps a time series; stages feed it through their parent
+        self.timeseries = LoadTestTimeSeries() if parent is None else None
+
+    def record(self, result: Dict[str, Any]):
+        """Fold a single request result into the running totals"""
+        self.total += 1
+        status = result.get("status")
+        if status in self.status_counts:
+            self.status_counts[status] += 1
+        if "latency_ms" in result:
+            self.latency_histogram.record(result["latency_ms"])
+            self.recent_histogram.record(result["latency_ms"])
+        if "service_time_ms" in result:
+            self.service_time_histogram.record(result["service_time_ms"])
+            self.queue_delay_histogram.record(result["queue_delay_ms"])
+        for stage, stage_ms in result.get("request_stages_ms", {}).items():
+            self._request_stage_histogram(stage).record(stage_ms)
+        if self.timeseries is not None:
+            self.timeseries.record(status, result.get("latency_ms"))
+        if self.parent is not None:
+            self.parent.record(result)
+
+    def record_many(self, status_codes: np.ndarray, latency_ms: np.ndarray, service_time_ms: np.ndarray,
+                    queue_delay_ms: np.ndarray, completed_at: np.ndarray):
+        """Fold a batch of results in one vectorized pass; status_codes index into STATUSES"""
+        self.total += int(status_codes.size)
+        for code, count in enumerate(np.bincount(status_codes, minlength=len(self.STATUSES)).tolist()):
+            self.status_counts[self.STATUSES[code]] += count
+        self.latency_histogram.record_many(latency_ms)
+        self.recent_histogram.record_many(latency_ms)
+        self.service_time_histogram.record_many(service_time_ms)
+        self.queue_delay_histogram.record_many(queue_delay_ms)
+        if self.timeseries is not None:
+            self.timeseries.record_many(self.STATUSES, status_codes, latency_ms, completed_at)
+        if self.parent is not None:
+            self.parent.record_many(status_codes, latency_ms, service_time_ms, queue_delay_ms, completed_at)
+
+    def _request_stage_histogram(self, stage: str) -> LatencyHistogram:
+        histogram = self.request_stage_histograms.get(stage)
+        if histogram is None:
+            histogram = self.request_stage_histograms[stage] = LatencyHistogram()
+        return histogram
+
+    def rotate_recent_histogram(self) -> LatencyHistogram:
+        """Start a new recent-latency window and return the one just closed"""
+        closed, self.recent_histogram = self.recent_histogram, LatencyHistogram()
+        return closed
+
+    def merge(self, other: "LoadTestCollector"):
+        """Fold another collector (e.g. from a generator worker process) into this one"""
+        self.total += other.total
+        for status, count in other.status_counts.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + count
+        self.latency_histogram.merge(other.latency_histogram)
+        self.service_time_histogram.merge(other.service_time_histogram)
+        self.queue_delay_histogram.merge(other.queue_delay_histogram)
+        for stage, stage_histogram in other.request_stage_histograms.items():
+            self._request_stage_histogram(stage).merge(stage_histogram)
+        if self.timeseries is not None and other.timeseries is not None:
+            self.timeseries.merge(other.timeseries)
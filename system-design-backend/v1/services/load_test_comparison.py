@@ -0,0 +1,206 @@
+import asyncio
+import math
+import time
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from v1.services.database_service_traced import db_service_traced as db_service
+from v1.services.load_test_archive import archive_service
+from v1.services.observability import logger
+
+PERCENTILES = (50, 75, 90, 95, 99, 99.9)
+
+class LoadTestComparisonService:
+    """
+    Statistical comparison of two load test runs.
+
+    Latencies are pulled straight into numpy arrays and compared with a
+    Mann-Whitney U test (does the candidate's latency distribution sit
+    above or below the baseline's?) plus bootstrap confidence intervals
+    for the difference at each percentile. All of it is vectorized, so a
+    multi-million-row run compares in seconds.
+    """
+
+    # Bootstrap works on a random subsample of each run; percentile CIs
+    # barely tighten beyond this and memory stays bounded
+    BOOTSTRAP_MAX_SAMPLES = 20000
+    BOOTSTRAP_ITERATIONS = 200
+
+    async def compare(self, baseline: Dict[str, Any], candidate: Dict[str, Any], alpha: float = 0.05) -> Dict[str, Any]:
+        """
+        Compare two finished test_runs rows. Latencies are loaded on the
+        database executor; the statistics run in a worker thread.
+        """
+        start_time = time.monotonic()
+        baseline_latencies = await db_service.run(self._load_latencies, baseline["test_id"])
+        candidate_latencies = await db_service.run(self._load_latencies, candidate["test_id"])
+        load_seconds = time.monotonic() - start_time
+        return await asyncio.to_thread(self._compare, baseline, candidate, baseline_latencies, candidate_latencies,
+                                       alpha, start_time, load_seconds)
+
+    def _compare(self, baseline: Dict[str, Any], candidate: Dict[str, Any], baseline_latencies: np.ndarray,
+                 candidate_latencies: np.ndarray, alpha: float, start_time: float, load_seconds: float) -> Dict[str, Any]:
+        result = {
+            "baseline_test_id": baseline["test_id"],
+            "candidate_test_id": candidate["test_id"],
+            "samples": {"baseline": int(baseline_latencies.size), "candidate": int(candidate_latencies.size)},
+            "throughput": self._throughput_delta(baseline, candidate),
+            "error_rate": self._error_rate_delta(baseline, candidate)
+        }
+
+        if not baseline_latencies.size or not candidate_latencies.size:
+            result["verdict"] = "insufficient_data"
+            return result
+
+        result["latency"] = self._percentile_deltas(baseline_latencies, candidate_latencies)
+        result["mann_whitney"] = self._mann_whitney(baseline_latencies, candidate_latencies)
+        result["verdict"] = self._verdict(result["mann_whitney"], alpha)
+        result["alpha"] = alpha
+
+        logger.info("load_test_comparison_completed", baseline=baseline["test_id"], candidate=candidate["test_id"],
+                    samples=result["samples"], verdict=result["verdict"],
+                    load_seconds=round(load_seconds, 3), total_seconds=round(time.monotonic() - start_time, 3))
+        return result
+
+    def _load_latencies(self, test_id: str) -> np.ndarray:
+        """All recorded latencies of a run as a float64 array"""
+        archive = archive_service.open(test_id)
+        if archive is not None:
+            latencies = archive.column("latency_ms")
+            return latencies[~np.isnan(latencies)].astype(np.float64)
+
+        # Not archived yet: a raw DB-API cursor skips building a Row object per request
+        connection = db_service.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT latency_ms FROM test_requests WHERE test_id = ? AND latency_ms IS NOT NULL", (test_id,))
+            return np.fromiter((row[0] for row in cursor), dtype=np.float64)
+        finally:
+            connection.close()
+
+    def _percentile_deltas(self, baseline: np.ndarray, candidate: np.ndarray) -> Dict[str, Any]:
+        """Per-percentile values, deltas and bootstrap confidence intervals for the delta"""
+        baseline_values = np.percentile(baseline, PERCENTILES)
+        candidate_values = np.percentile(candidate, PERCENTILES)
+        ci_low, ci_high = self._bootstrap_delta_ci(baseline, candidate)
+
+        deltas = {}
+        for index, percentile in enumerate(PERCENTILES):
+            delta = candidate_values[index] - baseline_values[index]
+            deltas[f"p{percentile:g}".replace(".", "")] = {
+                "baseline_ms": float(baseline_values[index]),
+                "candidate_ms": float(candidate_values[index]),
+                "delta_ms": float(delta),
+                "delta_pct": float(delta / baseline_values[index] * 100) if baseline_values[index] else None,
+                "ci_low_ms": float(ci_low[index]),
+                "ci_high_ms": float(ci_high[index]),
+                # The interval excludes zero: the shift at this percentile is unlikely to be noise
+                "significant": bool(ci_low[index] > 0 or ci_high[index] < 0)
+            }
+
+        deltas["mean"] = {
+            "baseline_ms": float(baseline.mean()),
+            "candidate_ms": float(candidate.mean()),
+            "delta_ms": float(candidate.mean() - baseline.mean())
+        }
+        deltas["max"] = {
+            "baseline_ms": float(baseline.max()),
+            "candidate_ms": float(candidate.max()),
+            "delta_ms": float(candidate.max() - baseline.max())
+        }
+        return deltas
+
+    def _bootstrap_delta_ci(self, baseline: np.ndarray, candidate: np.ndarray, confidence: float = 0.95):
+        """Bootstrap CI for candidate - baseline at every percentile at once"""
+        rng = np.random.default_rng()
+        baseline = self._subsample(rng, baseline)
+        candidate = self._subsample(rng, candidate)
+
+        # One (iterations x n) resample per run; percentiles along each row
+        baseline_resamples = rng.choice(baseline, size=(self.BOOTSTRAP_ITERATIONS, baseline.size))
+        candidate_resamples = rng.choice(candidate, size=(self.BOOTSTRAP_ITERATIONS, candidate.size))
+        deltas = (np.percentile(candidate_resamples, PERCENTILES, axis=1)
+                  - np.percentile(baseline_resamples, PERCENTILES, axis=1))
+
+        tail = (1 - confidence) / 2 * 100
+        return np.percentile(deltas, tail, axis=1), np.percentile(deltas, 100 - tail, axis=1)
+
+    def _subsample(self, rng: np.random.Generator, values: np.ndarray) -> np.ndarray:
+        if values.size <= self.BOOTSTRAP_MAX_SAMPLES:
+            return values
+        return rng.choice(values, size=self.BOOTSTRAP_MAX_SAMPLES, replace=False)
+
+    def _mann_whitney(self, baseline: np.ndarray, candidate: np.ndarray) -> Dict[str, Any]:
+        """Two-sided Mann-Whitney U test (normal approximation with tie correction)"""
+        n1, n2 = baseline.size, candidate.size
+        combined = np.concatenate((baseline, candidate))
+        order = np.argsort(combined, kind="mergesort")
+        sorted_values = combined[order]
+
+        # Tied values share the average of the ranks they span
+        _, first_index, tie_counts = np.unique(sorted_values, return_index=True, return_counts=True)
+        average_ranks = first_index + (tie_counts + 1) / 2.0
+        ranks = np.empty(combined.size, dtype=np.float64)
+        ranks[order] = np.repeat(average_ranks, tie_counts)
+
+        u_candidate = ranks[n1:].sum() - n2 * (n2 + 1) / 2.0
+        n = n1 + n2
+        tie_term = float((tie_counts.astype(np.float64) ** 3 - tie_counts).sum())
+        variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0.0
+        mean_u = n1 * n2 / 2.0
+
+        if variance > 0:
+            z = (u_candidate - mean_u) / math.sqrt(variance)
+            p_value = math.erfc(abs(z) / math.sqrt(2))
+        else:
+            z, p_value = 0.0, 1.0
+
+        return {
+            "u_statistic": float(u_candidate),
+            "z_score": float(z),
+            "p_value": float(p_value),
+            # Probability that a random candidate request is slower than a random baseline one
+            "prob_candidate_slower": float(u_candidate / (n1 * n2))
+        }
+
+    def _verdict(self, mann_whitney: Dict[str, Any], alpha: float) -> str:
+        # With millions of samples tiny shifts are "significant"; also require a non-trivial effect
+        effect = mann_whitney["prob_candidate_slower"] - 0.5
+        if mann_whitney["p_value"] >= alpha or abs(effect) < 0.02:
+            return "no_significant_difference"
+        return "regression" if effect > 0 else "improvement"
+
+    def _throughput_delta(self, baseline: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+        baseline_rps = self._throughput(baseline)
+        candidate_rps = self._throughput(candidate)
+        return {
+            "baseline_rps": baseline_rps,
+            "candidate_rps": candidate_rps,
+            "delta_rps": candidate_rps - baseline_rps if baseline_rps is not None and candidate_rps is not None else None,
+            "delta_pct": (candidate_rps - baseline_rps) / baseline_rps * 100 if baseline_rps and candidate_rps is not None else None
+        }
+
+    def _throughput(self, run: Dict[str, Any]) -> Optional[float]:
+        if run.get("achieved_rps"):
+            return run["achieved_rps"]
+        completed = self._completed(run)
+        return completed / run["duration_sec"] if run.get("duration_sec") else None
+
+    def _error_rate_delta(self, baseline: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+        baseline_rate = self._error_rate(baseline)
+        candidate_rate = self._error_rate(candidate)
+        return {
+            "baseline_pct": baseline_rate,
+            "candidate_pct": candidate_rate,
+            "delta_pct": candidate_rate - baseline_rate if baseline_rate is not None and candidate_rate is not None else None
+        }
+
+    def _error_rate(self, run: Dict[str, Any]) -> Optional[float]:
+        completed = self._completed(run)
+        return (run.get("failed") or 0) / completed * 100 if completed else None
+
+    def _completed(self, run: Dict[str, Any]) -> int:
+        return sum(run.get(column) or 0 for column in ("succeeded", "failed", "rate_limited", "duplicates"))
+
+comparison_service = LoadTestComparisonService()
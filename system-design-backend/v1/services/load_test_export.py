@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Iterator, Iterable, Optional, AsyncIterator
+
+import numpy as np
+from sqlalchemy import text
+
+from v1.services.database_service_traced import db_service_traced as db_service
+from v1.services.load_test_archive import archive_service, UNKNOWN_STATUS
+
+EXPORT_SECTIONS = ("summary", "requests", "events")
+RECORD_TYPES = {"summary": "summary", "requests": "request", "events": "event"}
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# test_runs columns holding JSON text, decoded in NDJSON exports
+JSON_COLUMNS = ("config", "rps_timeline", "stage_results", "latency_breakdown", "http_pool_stats", "virtual_user_stats", "capacity_search", "simulation")
+
+class LoadTestExportService:
+    """
+    Streams one test's data as NDJSON or CSV, optionally gzipped.
+
+    Rows are read in keyset-paginated chunks (WHERE id > last id LIMIT n),
+    each on a short-lived connection, and encoded as they go, so memory
+    stays flat whatever the row count. A cursor held open for the whole
+    download would keep SQLite's shared lock and block the recorder's
+    writes for as long as a slow client takes to read.
+
+    The encoding pipeline is synchronous; stream() advances it one chunk at
+    a time on the database executor, so the reads never block the event
+    loop and share the executor's bound with the rest of the database work.
+    """
+
+    CHUNK_SIZE = 5000
+
+    async def stream(self, summary: Dict[str, Any], sections: List[str], export_format: str,
+                     compress: bool = False) -> AsyncIterator[bytes]:
+        """Encoded (and optionally gzipped) export chunks"""
+        chunks = self._chunks(summary, sections, export_format, compress)
+        while True:
+            # The response has already started, so a full executor queues the read rather than failing the download
+            chunk = await db_service.run(next, chunks, None, reject_when_full=False)
+            if chunk is None:
+                return
+            yield chunk
+
+    def _chunks(self, summary: Dict[str, Any], sections: List[str], export_format: str,
+                compress: bool) -> Iterator[bytes]:
+        if export_format == "csv":
+            # CSV has one header, so it carries exactly one section
+            chunks = self._csv(self._rows(summary, sections[0]))
+        else:
+            chunks = self._ndjson(summary, sections)
+        return self._gzip(chunks) if compress else chunks
+
+    def _rows(self, summary: Dict[str, Any], section: str) -> Iterator[List[Dict[str, Any]]]:
+        """Chunks of row dicts for one section"""
+        test_id = summary["test_id"]
+        if section == "summary":
+            return iter([[summary]])
+        if section == "events":
+            return self._paginate("request_events", test_id)
+        if not self._has_request_rows(test_id) and archive_service.open(test_id) is not None:
+            # Rows were pruned after archiving
+            return self._archived_requests(test_id)
+        return self._paginate("test_requests", test_id)
+
+    def _paginate(self, table: str, test_id: str) -> Iterator[List[Dict[str, Any]]]:
+        last_id = 0
+        while True:
+            with db_service.engine.connect() as conn:
+                rows = conn.execute(
+                    text(f"SELECT * FROM {table} WHERE test_id = :test_id AND id > :last_id ORDER BY id LIMIT :limit"),
+                    {"test_id": test_id, "last_id": last_id, "limit": self.CHUNK_SIZE}
+                ).fetchall()
+            if not rows:
+                return
+            yield [dict(row._mapping) for row in rows]
+            last_id = rows[-1].id
+
+    def _has_request_rows(self, test_id: str) -> bool:
+        with db_service.engine.connect() as conn:
+            return conn.execute(
+                text("SELECT 1 FROM test_requests WHERE test_id = :test_id LIMIT 1"), {"test_id": test_id}
+            ).first() is not None
+
+    def _archived_requests(self, test_id: str) -> Iterator[List[Dict[str, Any]]]:
+        """Per-request rows rebuilt from the archive; request ids and error messages are not archived"""
+        archive = archive_service.open(test_id)
+        first_request_at = datetime.fromisoformat(archive.header["first_request_at"])
+        for start in range(0, archive.rows, self.CHUNK_SIZE):
+            end = min(start + self.CHUNK_SIZE, archive.rows)
+            offsets = archive.column("offset_ms")[start:end].tolist()
+            latencies, service_times, queue_delays = (
+                self._floats(archive.column(name)[start:end])
+                for name in ("latency_ms", "service_time_ms", "queue_delay_ms")
+            )
+            status_codes = archive.column("status_code")[start:end].tolist()
+            statuses = archive.column("status")[start:end].tolist()
+            stages = archive.column("stage_index")[start:end].tolist()
+            yield [
+                {
+                    "test_id": test_id,
+                    "started_at": str(first_request_at + timedelta(milliseconds=offsets[i])),
+                    "status": archive.statuses[statuses[i]] if statuses[i] != UNKNOWN_STATUS else None,
+                    "status_code": status_codes[i] if status_codes[i] >= 0 else None,
+                    "latency_ms": latencies[i],
+                    "service_time_ms": service_times[i],
+                    "queue_delay_ms": queue_delays[i],
+                    "stage_index": stages[i] if stages[i] >= 0 else None
+                }
+                for i in range(end - start)
+            ]
+
+    @staticmethod
+    def _floats(values: np.ndarray) -> List[Optional[float]]:
+        """Column slice as Python floats, NaN back to None"""
+        return [None if value != value else value for value in values.astype(np.float64).tolist()]
+
+    def _ndjson(self, summary: Dict[str, Any], sections: List[str]) -> Iterator[bytes]:
+        for section in sections:
+            for rows in self._rows(summary, section):
+                if section == "summary":
+                    rows = [self._decode_json_columns(row) for row in rows]
+                yield "".join(
+                    json.dumps({"record_type": RECORD_TYPES[section], **row}, default=str) + "\n" for row in rows
+                ).encode()
+
+    def _decode_json_columns(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: json.loads(value) if key in JSON_COLUMNS and isinstance(value, str) else value
+            for key, value in row.items()
+        }
+
+    def _csv(self, chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+        writer = None
+        buffer = io.StringIO()
+        for rows in chunks:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(rows[0]), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def _gzip(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+export_service = LoadTestExportService()
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import time
+from typing import Dict, Any, Callable, Optional
+
+from v1.services.latency_histogram import LatencyHistogram
+from v1.services.load_test_collector import LoadTestCollector
+from v1.services.observability import logger
+
+class LoadTestProgress:
+    """
+    Live progress for a running load test.
+
+    Reads the test's in-memory collector (no database access) and pushes
+    throttled delta frames to WebSocket subscribers: at most one frame per
+    interval, carrying only the fields that changed since the last frame.
+    An optional check callback sees every sampled snapshot, e.g. to stop a
+    test that breaches its SLO.
+    """
+
+    # Rolling percentiles cover the last one to two windows of completions
+    ROLLING_WINDOW_SECONDS = 5.0
+
+    def __init__(self, test_id: str, collector: LoadTestCollector, interval: float = 1.0,
+                 check: Optional[Callable[[Dict[str, Any]], None]] = None, publish: bool = True):
+        self.test_id = test_id
+        self.collector = collector
+        self.interval = interval
+        self.check = check
+        self.publish = publish
+        self.start_time = time.monotonic()
+        self._last_frame: Dict[str, Any] = {}
+        self._rate_sample = (self.start_time, 0)
+        self._previous_window = LatencyHistogram()
+        self._window_started = self.start_time
+        self._current_rps = 0.0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop publishing and send a last frame with the final counters"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._sample()
+        await self._publish()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current running counters, rolling latency and send rate"""
+        collector = self.collector
+        rolling = LatencyHistogram()
+        rolling.merge(self._previous_window)
+        rolling.merge(collector.recent_histogram)
+        return {
+            "elapsed_sec": round(time.monotonic() - self.start_time, 3),
+            "completed": collector.total,
+            "succeeded": collector.status_counts["success"],
+            "failed": collector.status_counts["failed"],
+            "rate_limited": collector.status_counts["rate_limited"],
+            "duplicates": collector.status_counts["duplicate"],
+            "current_rps": round(self._current_rps, 2),
+            "rolling_p95_ms": rolling.percentile(95),
+            "rolling_p99_ms": rolling.percentile(99)
+        }
+
+    def _sample(self):
+        """Advance the RPS estimate and rotate the rolling latency window"""
+        now = time.monotonic()
+        last_time, last_completed = self._rate_sample
+        # Too short a gap (e.g. the final frame right after a tick) gives a meaningless rate
+        if now - last_time >= self.interval / 2:
+            self._current_rps = (self.collector.total - last_completed) / (now - last_time)
+            self._rate_sample = (now, self.collector.total)
+
+        if now - self._window_started >= self.ROLLING_WINDOW_SECONDS:
+            self._previous_window = self.collector.rotate_recent_histogram()
+            self._window_started = now
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self._sample()
+            if self.check:
+                # A failing check must not end the task: live frames and later checks still need it
+                try:
+                    self.check(self.snapshot())
+                except Exception as e:
+                    logger.error("load_test_progress_check_failed", test_id=self.test_id, error=str(e))
+            try:
+                await self._publish()
+            except Exception as e:
+                logger.warning("load_test_progress_publish_failed", test_id=self.test_id, error=str(e))
+
+    async def _publish(self):
+        if not self.publish:
+            return
+
+        # Import here to avoid circular imports
+        from v1.routes.websocket import manager
+        
+        frame = self.snapshot()
+        delta = {key: value for key, value in frame.items() if self._last_frame.get(key) != value}
+        self._last_frame = frame
+        if not delta:
+            return
+
+        await manager.broadcast(
+            json.dumps({"type": "test_progress", "test_id": self.test_id, "delta": delta}),
+            topic=self.test_id
+        )
@@ -1,16 +1,35 @@
 import asyncio
+import multiprocessing
+import os
 import uuid
 import time
 import json
 import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from statistics import mean, quantiles
 from sqlalchemy import text
 
-from v1.models.load_test import LoadTestConfig, TestStatus, PayloadStrategy
+from v1.models.load_test import (
+    LoadTestConfig, LoadStage, TestStatus, ExecutionMode, RampShape, LoadTransport, StopConditions
+)
 from v1.routes.schema import PostRequestModel
 from v1.services.database_service_traced import db_service_traced as db_service
+from v1.services.arrival_scheduler import ArrivalScheduler
+from v1.services.replay_scheduler import ReplayScheduler
+from v1.services.load_test_collector import LoadTestCollector
+from v1.services.load_test_timeseries import LoadTestTimeSeries
+from v1.services.virtual_user_stats import VirtualUserStats
+from v1.services.capacity_search import CapacitySearchState
+from v1.services.load_test_simulator import simulator
+from v1.services.load_generator_worker import run_generator_shard
+from v1.services.request_recorder import RequestRecorder
+from v1.services.load_test_progress import LoadTestProgress
+from v1.services.http_load_client import HttpLoadClient
+from v1.services.payload_source import PayloadSource, build_payload_source
+from v1.services.load_test_archive import archive_service
+from v1.services.stage_timer import StageTimer
 from v1.services.observability import logger
 from tracing.trace_context import TraceContext
 from models.tracing.trace_models import EventType
@@ -23,18 +42,45 @@ TEST_DURATION = Histogram('load_test_duration_seconds', 'Load test duration')
 TEST_REQUEST_SUCCESS = Counter('load_test_requests_success_total', 'Successful load test requests')
 TEST_REQUEST_FAILED = Counter('load_test_requests_failed_total', 'Failed load test requests')
 ACTIVE_LOAD_TESTS = Gauge('active_load_tests', 'Currently running load tests')
+TEST_QUEUE_DELAY = Histogram('load_test_queue_delay_seconds', 'Delay between a request\'s intended and actual send time')
 
 class LoadTestService:
+    # How often a generator worker checks for a stop requested elsewhere
+    STOP_POLL_INTERVAL = 0.25
+    
     def __init__(self):
         self.active_tests: Dict[str, asyncio.Task] = {}
         self.test_results: Dict[str, Dict[str, Any]] = {}
+        self.recorders: Dict[str, RequestRecorder] = {}
+        self.progress: Dict[str, LoadTestProgress] = {}
+        self.stage_runs: Dict[str, List[Dict[str, Any]]] = {}
+        self.virtual_user_runs: Dict[str, Dict[str, Any]] = {}
+        self.capacity_searches: Dict[str, CapacitySearchState] = {}
+        self.http_clients: Dict[str, HttpLoadClient] = {}
+        self.payload_sources: Dict[str, PayloadSource] = {}
+        self.in_flight: Dict[str, set] = {}
+        self.stop_requests: Dict[str, Dict[str, Any]] = {}
+        self.shard_controls: Dict[str, Any] = {}  # Manager dicts shared with generator workers
         
     async def start_test(self, config: LoadTestConfig) -> str:
         """Start a new load test and return test_id"""
         test_id = str(uuid.uuid4())
+        # Replay configs count their recorded requests with a query, so off the loop and only once
+        expected_requests = await db_service.run(self._expected_requests, config)
+        
+        # Build payloads before the run so the timed phase only hands them out;
+        # generator workers build their own and simulations send none
+        if config.execution_mode == ExecutionMode.IN_PROCESS and not config.simulation:
+            self.payload_sources[test_id] = await asyncio.to_thread(
+                build_payload_source, config, expected_requests
+            )
         
         # Store test configuration in database
-        await self._create_test_record(test_id, config)
+        try:
+            await self._create_test_record(test_id, config, expected_requests)
+        except Exception:
+            self._close_payload_source(test_id)
+            raise
         
         # Start test execution in background
         task = asyncio.create_task(self._execute_test(test_id, config))
@@ -50,23 +96,80 @@ class LoadTestService:
         """Get test result by test_id"""
         return await self._get_test_from_db(test_id)
     
-    async def _create_test_record(self, test_id: str, config: LoadTestConfig):
+    async def get_timeseries(self, test_id: str, resolution: int) -> List[Dict[str, Any]]:
+        """Stored time-series buckets for a finished test at the given resolution"""
+        return await db_service.run(
+            db_service.fetch_all,
+            text("""
+            SELECT * FROM test_timeseries
+            WHERE test_id = :test_id AND resolution_sec = :resolution
+            ORDER BY bucket_offset_sec
+            """),
+            {"test_id": test_id, "resolution": resolution}
+        )
+    
+    def get_live_progress(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """In-memory progress counters for a running test, without touching the database"""
+        progress = self.progress.get(test_id)
+        return progress.snapshot() if progress else None
+    
+    def get_active_tests(self) -> List[Dict[str, Any]]:
+        """Tests currently running in this process"""
+        return [
+            {
+                "test_id": test_id,
+                "stopping": test_id in self.stop_requests,
+                "progress": self.get_live_progress(test_id)
+            }
+            for test_id in self.active_tests
+        ]
+    
+    async def stop_test(self, test_id: str, drain_timeout_sec: float = 5.0, reason: str = None) -> bool:
+        """Stop a running test; returns False if it isn't running"""
+        if test_id not in self.active_tests:
+            return False
+        self.request_stop(test_id, reason or "stopped by request", drain_timeout_sec)
+        return True
+    
+    def request_stop(self, test_id: str, reason: str, drain_timeout_sec: float):
+        """
+        Stop scheduling new requests for a test. In-flight requests get
+        drain_timeout_sec to finish; any still running then are cancelled and
+        counted as abandoned. The test is finalized with what was collected.
+        """
+        if test_id in self.stop_requests:
+            return
+        
+        loop = asyncio.get_running_loop()
+        self.stop_requests[test_id] = {
+            "reason": reason,
+            "abandoned": 0,
+            "drain_timer": loop.call_later(drain_timeout_sec, self._abandon_in_flight, test_id)
+        }
+        
+        # Pass the stop on to the generator workers (or, from a worker, to the parent and other workers)
+        control = self.shard_controls.get(test_id)
+        if control is not None:
+            control.setdefault("stop", {"reason": reason, "drain_timeout_sec": drain_timeout_sec})
+        
+        logger.info("load_test_stop_requested", test_id=test_id, reason=reason, drain_timeout_sec=drain_timeout_sec)
+    
+    async def _create_test_record(self, test_id: str, config: LoadTestConfig, expected_requests: int):
         """Create initial test record in database"""
         try:
-            with db_service.get_session() as session:
-                session.execute(
-                    text("""
-                    INSERT INTO test_runs (test_id, config, status, total_requests)
-                    VALUES (:test_id, :config, :status, :total_requests)
-                    """),
-                    {
-                        "test_id": test_id,
-                        "config": json.dumps(config.dict()),
-                        "status": TestStatus.PENDING.value,
-                        "total_requests": config.total_requests or (config.rps * config.duration if config.rps and config.duration else 0)
-                    }
-                )
-                session.commit()
+            await db_service.run(
+                db_service.execute_write,
+                text("""
+                INSERT INTO test_runs (test_id, config, status, total_requests)
+                VALUES (:test_id, :config, :status, :total_requests)
+                """),
+                {
+                    "test_id": test_id,
+                    "config": config.json(),
+                    "status": TestStatus.PENDING.value,
+                    "total_requests": expected_requests
+                }
+            )
         except Exception as e:
             logger.error("failed_to_create_test_record", test_id=test_id, error=str(e))
             raise
@@ -74,26 +177,56 @@ class LoadTestService:
     async def _execute_test(self, test_id: str, config: LoadTestConfig):
         """Execute the load test"""
         start_time = time.time()
-        request_results = []
+        collector = LoadTestCollector()
         
         try:
             # Update status to running
             await self._update_test_status(test_id, TestStatus.RUNNING, {"started_at": datetime.utcnow()})
             
-            # Generate requests based on configuration
-            if config.burst_mode or config.total_requests:
-                request_results = await self._execute_burst_test(test_id, config)
+            if config.execution_mode == ExecutionMode.MULTI_PROCESS:
+                await self._execute_multi_process_test(test_id, config, collector)
             else:
-                request_results = await self._execute_sustained_test(test_id, config)
+                self._start_recorder(test_id)
+                self._start_progress(test_id, collector, config)
+                self._start_http_client(test_id, config)
+                try:
+                    await self._run_workload(test_id, config, collector)
+                finally:
+                    http_pool_stats = await self._close_http_client(test_id)
+                if http_pool_stats:
+                    self.test_results.setdefault(test_id, {})["http_pool_stats"] = http_pool_stats
             
             # Calculate final statistics
             end_time = time.time()
             duration = end_time - start_time
             
-            stats = self._calculate_statistics(request_results, start_time, end_time)
-            await self._finalize_test(test_id, stats, TestStatus.COMPLETED)
+            stats = self._calculate_statistics(collector, start_time, end_time)
+            if stats:
+                stats.update(self.test_results.get(test_id, {}))
+                if test_id in self.stage_runs:
+                    stages = self.capacity_searches[test_id].stages if config.capacity_search else config.stages
+                    stats["stage_results"] = self._stage_results(stages, self.stage_runs[test_id])
+                if test_id in self.virtual_user_runs:
+                    run = self.virtual_user_runs[test_id]
+                    stats["virtual_user_stats"] = run["stats"].summary(run["elapsed_sec"])
+            # Set even when nothing completed (stats is then empty), e.g. a capacity search stopped during its first probe
+            stats["total_requests"] = collector.total
+            if test_id in self.capacity_searches:
+                stats["capacity_search"] = self.capacity_searches[test_id].summary()
+                stats["saturation_rps"] = self.capacity_searches[test_id].passing
+            
+            stop = self._clear_stop(test_id)
+            if stop:
+                stats["stop_reason"] = stop["reason"]
+                stats["abandoned_requests"] = stop["abandoned"]
+                # Abandoned requests were sent, just cancelled before they completed
+                stats["total_requests"] += stop["abandoned"]
+            final_status = TestStatus.STOPPED if stop else TestStatus.COMPLETED
+            await self._store_timeseries(test_id, collector.timeseries, start_time)
+            await self._finalize_test(test_id, stats, final_status)
+            await self._archive_requests(test_id, config)
             
-            TESTS_COMPLETED.labels(status='completed').inc()
+            TESTS_COMPLETED.labels(status=final_status.value).inc()
             TEST_DURATION.observe(duration)
             
         except Exception as e:
@@ -104,56 +237,567 @@ class LoadTestService:
             ACTIVE_LOAD_TESTS.dec()
             if test_id in self.active_tests:
                 del self.active_tests[test_id]
+            self.test_results.pop(test_id, None)
+            self.stage_runs.pop(test_id, None)
+            self.virtual_user_runs.pop(test_id, None)
+            self.capacity_searches.pop(test_id, None)
+            self.in_flight.pop(test_id, None)
+            self._clear_stop(test_id)
+            self._close_payload_source(test_id)
     
-    async def _execute_burst_test(self, test_id: str, config: LoadTestConfig) -> List[Dict[str, Any]]:
-        """Execute burst mode test with concurrency control"""
-        semaphore = asyncio.Semaphore(config.concurrency_limit)
+    def _expected_requests(self, config: LoadTestConfig) -> int:
+        """Number of requests the configuration is expected to send (closed-loop stages excluded)"""
+        if config.replay:
+            return ReplayScheduler(config.replay).count()
+        if config.stages:
+            expected = 0.0
+            previous = None
+            for stage in config.stages:
+                if stage.rps:
+                    expected += (self._stage_start_level(stage, previous) + stage.rps) / 2.0 * stage.duration
+                previous = stage
+            return int(expected)
+        if config.virtual_users or config.capacity_search:
+            return 0
+        return config.total_requests or (config.rps * config.duration if config.rps and config.duration else 0)
+    
+    async def _run_workload(self, test_id: str, config: LoadTestConfig, collector: LoadTestCollector):
+        """Generate requests on the current event loop based on configuration"""
+        if config.simulation:
+            await self._execute_simulation(test_id, config, collector)
+        elif config.replay:
+            await self._execute_replay_test(test_id, config, collector)
+        elif config.capacity_search:
+            await self._execute_capacity_search(test_id, config, collector)
+        elif config.stages:
+            await self._execute_staged_test(test_id, config, collector)
+        elif config.virtual_users:
+            await self._execute_virtual_user_test(test_id, config, collector)
+        elif config.burst_mode or config.total_requests:
+            await self._execute_burst_test(test_id, config, collector)
+        else:
+            await self._execute_sustained_test(test_id, config, collector)
+    
+    async def _execute_multi_process_test(self, test_id: str, config: LoadTestConfig, collector: LoadTestCollector):
+        """Shard the test across a pool of generator processes and merge their results"""
+        shard_count = config.worker_processes or os.cpu_count() or 1
+        if config.total_requests:
+            shard_count = min(shard_count, config.total_requests)
+        if config.virtual_users:
+            shard_count = min(shard_count, config.virtual_users)
+        
+        logger.info("load_test_sharded", test_id=test_id, shard_count=shard_count)
+        
+        loop = asyncio.get_running_loop()
+        config_json = config.json()
+        # Spawn rather than fork: the parent has a running event loop and client threads
+        mp_context = multiprocessing.get_context("spawn")
+        with mp_context.Manager() as manager:
+            control = manager.dict()
+            self.shard_controls[test_id] = control
+            try:
+                with ProcessPoolExecutor(max_workers=shard_count, mp_context=mp_context) as pool:
+                    shard_results = await asyncio.gather(*(
+                        loop.run_in_executor(pool, run_generator_shard, test_id, config_json, shard_index, shard_count, control)
+                        for shard_index in range(shard_count)
+                    ))
+                shard_stop = control.get("stop")
+            finally:
+                self.shard_controls.pop(test_id, None)
+        
+        # A worker may have stopped the test on a breached stop condition
+        if shard_stop and test_id not in self.stop_requests:
+            self.stop_requests[test_id] = {"reason": shard_stop["reason"], "abandoned": 0, "drain_timer": None}
+        
+        schedule_summaries = []
+        http_pool_stats = []
+        for shard_result in shard_results:
+            if shard_result["stop"]:
+                self.stop_requests[test_id]["abandoned"] += shard_result["stop"]["abandoned"]
+            collector.merge(shard_result["collector"])
+            if shard_result["schedule"]:
+                schedule_summaries.append(shard_result["schedule"])
+            if shard_result["stages"]:
+                self._merge_stage_runs(self.stage_runs.setdefault(test_id, []), shard_result["stages"])
+            if shard_result["virtual_users"]:
+                self._merge_virtual_user_run(test_id, shard_result["virtual_users"])
+            if shard_result["http_pool"]:
+                http_pool_stats.append(shard_result["http_pool"])
+        
+        if schedule_summaries:
+            self.test_results[test_id] = self._merge_schedule_summaries(schedule_summaries)
+        if http_pool_stats:
+            self.test_results.setdefault(test_id, {})["http_pool_stats"] = HttpLoadClient.merge_stats(http_pool_stats)
+    
+    async def execute_shard(self, test_id: str, config: LoadTestConfig, shard_index: int, shard_count: int,
+                            control: Dict[str, Any]) -> Dict[str, Any]:
+        """Run this process's share of a multi-process test (called inside a generator worker)"""
+        shard_config = self._shard_config(config, shard_index, shard_count)
+        collector = LoadTestCollector()
+        
+        self.shard_controls[test_id] = control
+        stop_watcher = asyncio.create_task(self._watch_stop_signal(test_id, control))
+        # No WebSocket subscribers here; progress only feeds the stop conditions
+        progress = self._stop_condition_checker(test_id, collector, shard_config)
+        
+        self.payload_sources[test_id] = build_payload_source(shard_config, self._expected_requests(shard_config),
+                                                             shard_index, shard_count)
+        self._start_recorder(test_id)
+        self._start_http_client(test_id, shard_config)
+        try:
+            await self._run_workload(test_id, shard_config, collector)
+        finally:
+            stop_watcher.cancel()
+            if progress:
+                await progress.stop()
+            self._close_payload_source(test_id)
+            http_pool_stats = await self._close_http_client(test_id)
+            await self._close_recorder(test_id)
+            self.shard_controls.pop(test_id, None)
+        
+        return {
+            "collector": collector,
+            "stop": self._clear_stop(test_id),
+            "http_pool": http_pool_stats,
+            "schedule": self.test_results.pop(test_id, {}),
+            "stages": self.stage_runs.pop(test_id, []),
+            "virtual_users": self.virtual_user_runs.pop(test_id, None)
+        }
+    
+    def _shard_config(self, config: LoadTestConfig, shard_index: int, shard_count: int) -> LoadTestConfig:
+        """Give one shard an equal share of the requests, RPS and concurrency"""
+        update = {
+            "execution_mode": ExecutionMode.IN_PROCESS,
+            "concurrency_limit": max(1, -(-config.concurrency_limit // shard_count))
+        }
+        if config.total_requests:
+            base, remainder = divmod(config.total_requests, shard_count)
+            update["total_requests"] = base + (1 if shard_index < remainder else 0)
+        if config.rps:
+            update["rps"] = config.rps / shard_count
+        if config.http_pool_size:
+            update["http_pool_size"] = max(1, -(-config.http_pool_size // shard_count))
+        if config.stages:
+            update["stages"] = [self._shard_stage(stage, shard_index, shard_count) for stage in config.stages]
+        if config.replay:
+            update["replay"] = config.replay.copy(update={"shard_index": shard_index, "shard_count": shard_count})
+        if config.virtual_users:
+            base, remainder = divmod(config.virtual_users, shard_count)
+            update["virtual_users"] = base + (1 if shard_index < remainder else 0)
+        return config.copy(update=update)
+    
+    def _shard_stage(self, stage: LoadStage, shard_index: int, shard_count: int) -> LoadStage:
+        """One shard's share of a stage's rate or virtual users"""
+        if stage.rps:
+            return stage.copy(update={"rps": stage.rps / shard_count})
+        base, remainder = divmod(stage.concurrency, shard_count)
+        return stage.copy(update={"concurrency": base + (1 if shard_index < remainder else 0)})
+    
+    def _merge_stage_runs(self, stage_runs: List[Dict[str, Any]], shard_stage_runs: List[Dict[str, Any]]):
+        """Fold one shard's per-stage collectors and schedules into the whole-test stage runs"""
+        for stage_index, shard_run in enumerate(shard_stage_runs):
+            if stage_index == len(stage_runs):
+                stage_runs.append({
+                    "collector": LoadTestCollector(),
+                    "schedules": [],
+                    "virtual_users": VirtualUserStats(shard_run["virtual_users"].think_time) if shard_run["virtual_users"] else None,
+                    "started_offset_sec": shard_run["started_offset_sec"],
+                    "ended_offset_sec": shard_run["ended_offset_sec"]
+                })
+            run = stage_runs[stage_index]
+            run["collector"].merge(shard_run["collector"])
+            run["schedules"].extend(shard_run["schedules"])
+            if shard_run["virtual_users"]:
+                run["virtual_users"].merge(shard_run["virtual_users"])
+            run["started_offset_sec"] = min(run["started_offset_sec"], shard_run["started_offset_sec"])
+            run["ended_offset_sec"] = max(run["ended_offset_sec"], shard_run["ended_offset_sec"])
+    
+    def _merge_virtual_user_run(self, test_id: str, shard_run: Dict[str, Any]):
+        """Fold one shard's virtual users into the whole-test run"""
+        run = self.virtual_user_runs.get(test_id)
+        if run is None:
+            self.virtual_user_runs[test_id] = {"stats": VirtualUserStats(shard_run["stats"].think_time),
+                                               "elapsed_sec": shard_run["elapsed_sec"]}
+            run = self.virtual_user_runs[test_id]
+        run["stats"].merge(shard_run["stats"])
+        run["elapsed_sec"] = max(run["elapsed_sec"], shard_run["elapsed_sec"])
+    
+    def _merge_schedule_summaries(self, summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Sum per-shard arrival schedules into whole-test target vs. achieved RPS"""
+        timeline: Dict[int, Dict[str, Any]] = {}
+        for summary in summaries:
+            for point in summary.get("rps_timeline", []):
+                merged = timeline.setdefault(point["second"], {"second": point["second"], "target_rps": 0, "achieved_rps": 0})
+                merged["target_rps"] += point["target_rps"]
+                merged["achieved_rps"] += point["achieved_rps"]
+        
+        return {
+            "target_rps": sum(summary.get("target_rps", 0) for summary in summaries),
+            "achieved_rps": sum(summary.get("achieved_rps", 0) for summary in summaries),
+            "rps_timeline": [timeline[second] for second in sorted(timeline)]
+        }
+    
+    async def _watch_stop_signal(self, test_id: str, control: Dict[str, Any]):
+        """Pick up a stop requested by the parent process or another generator worker"""
+        while test_id not in self.stop_requests:
+            stop = control.get("stop")
+            if stop:
+                self.request_stop(test_id, stop["reason"], stop["drain_timeout_sec"])
+                return
+            await asyncio.sleep(self.STOP_POLL_INTERVAL)
+    
+    def _stopping(self, test_id: str) -> bool:
+        return test_id in self.stop_requests
+    
+    def _clear_stop(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """Forget a test's stop request, returning its reason and abandoned count"""
+        stop = self.stop_requests.pop(test_id, None)
+        if not stop:
+            return None
+        if stop["drain_timer"]:
+            stop["drain_timer"].cancel()
+        return {"reason": stop["reason"], "abandoned": stop["abandoned"]}
+    
+    def _check_stop_conditions(self, test_id: str, conditions: StopConditions, snapshot: Dict[str, Any]):
+        """Stop the test if its live progress breaches an SLO threshold"""
+        completed = snapshot["completed"]
+        if self._stopping(test_id) or completed < conditions.min_requests:
+            return
+        
+        error_rate = snapshot["failed"] / completed * 100
+        if conditions.max_error_rate is not None and error_rate > conditions.max_error_rate:
+            self.request_stop(test_id, f"error rate {error_rate:.1f}% exceeded {conditions.max_error_rate}%",
+                              conditions.drain_timeout_sec)
+        elif conditions.max_p99_ms is not None and (snapshot["rolling_p99_ms"] or 0) > conditions.max_p99_ms:
+            self.request_stop(test_id, f"p99 {snapshot['rolling_p99_ms']:.1f}ms exceeded {conditions.max_p99_ms}ms",
+                              conditions.drain_timeout_sec)
+    
+    def _track(self, test_id: str, coroutine) -> asyncio.Task:
+        """Run a request or worker as a task that a stop can abandon once the drain deadline passes"""
+        task = asyncio.create_task(coroutine)
+        in_flight = self.in_flight.setdefault(test_id, set())
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        return task
+    
+    async def _drain(self, test_id: str):
+        """Wait for the test's tracked tasks; abandoned ones finish as cancelled"""
+        in_flight = self.in_flight.get(test_id)
+        while in_flight:
+            await asyncio.gather(*list(in_flight), return_exceptions=True)
+    
+    def _abandon_in_flight(self, test_id: str):
+        """Drain deadline reached: cancel whatever is still running"""
+        pending = [task for task in self.in_flight.get(test_id, ()) if not task.done()]
+        for task in pending:
+            task.cancel()
+        if test_id in self.stop_requests:
+            self.stop_requests[test_id]["abandoned"] += len(pending)
+        if pending:
+            logger.warning("load_test_requests_abandoned", test_id=test_id, abandoned=len(pending))
+    
+    async def _execute_burst_test(self, test_id: str, config: LoadTestConfig, collector: LoadTestCollector):
+        """Execute burst mode test with a fixed pool of concurrency_limit workers"""
         total_requests = config.total_requests or 100
         
-        tasks = []
-        for i in range(total_requests):
-            payload = self._generate_payload(config, i)
-            task = self._execute_single_request(test_id, payload, semaphore, config)
-            tasks.append(task)
+        # Workers pull indices lazily, so only concurrency_limit requests exist at once
+        request_indices = iter(range(total_requests))
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        return [r for r in results if not isinstance(r, Exception)]
+        async def worker():
+            for request_index in request_indices:
+                if self._stopping(test_id):
+                    return
+                payload = self._next_payload(test_id)
+                await self._run_and_record(test_id, payload, None, config, collector)
+                # The request path may never suspend; yield so other workers, progress and stop requests run
+                await asyncio.sleep(0)
+        
+        for _ in range(min(config.concurrency_limit, total_requests)):
+            self._track(test_id, worker())
+        await self._drain(test_id)
     
-    async def _execute_sustained_test(self, test_id: str, config: LoadTestConfig) -> List[Dict[str, Any]]:
-        """Execute sustained RPS test"""
+    async def _execute_sustained_test(self, test_id: str, config: LoadTestConfig, collector: LoadTestCollector):
+        """Execute sustained RPS test on an open-loop arrival schedule"""
         semaphore = asyncio.Semaphore(config.concurrency_limit)
-        results = []
         
-        rps = config.rps or 5
-        duration = config.duration or 30
-        interval = 1.0 / rps
+        scheduler = ArrivalScheduler(
+            rps=config.rps or 5,
+            duration=config.duration or 30,
+            distribution=config.arrival_distribution
+        )
+        await self._send_on_schedule(test_id, config, scheduler, semaphore, collector)
+        
+        self.test_results[test_id] = scheduler.summary()
         
-        end_time = time.time() + duration
-        request_count = 0
+        # Wait for all requests to complete
+        await self._drain(test_id)
+    
+    async def _execute_simulation(self, test_id: str, config: LoadTestConfig, collector: LoadTestCollector):
+        """Simulate the run on simulated time in a worker thread; no traffic is sent and no request rows are written"""
+        # Calibration reads the database, so it goes through the executor; the simulation itself is CPU-bound
+        calibrate_from = config.simulation.calibrate_from
+        calibration = await db_service.run(simulator.calibrate, calibrate_from, reject_when_full=False) if calibrate_from else None
+        # Duration, rates and retries come from simulated time and override the wall-clock ones
+        self.test_results[test_id] = await asyncio.to_thread(simulator.run, config, collector, time.time(), calibration)
+    
+    async def _execute_replay_test(self, test_id: str, config: LoadTestConfig, collector: LoadTestCollector):
+        """Replay a recorded window of real traffic on its original (optionally compressed) timing"""
+        semaphore = asyncio.Semaphore(config.concurrency_limit)
+        scheduler = ReplayScheduler(config.replay)
+        
+        async for request_index, intended_time, record in scheduler.arrivals():
+            if self._stopping(test_id):
+                break
+            payload = self._next_payload(test_id)
+            # Namespaced per test, so keys repeated in the recording repeat in the replay without
+            # colliding with the original requests or an earlier replay
+            idempotency_key = f"replay_{test_id}_{record['idempotency_key'] or record['request_id']}"
+            self._track(test_id, self._run_and_record(test_id, payload, semaphore, config, collector,
+                                                      intended_time=intended_time, idempotency_key=idempotency_key))
+        
+        self.test_results[test_id] = scheduler.summary()
+        await self._drain(test_id)
+    
+    async def _send_on_schedule(self, test_id: str, config: LoadTestConfig, scheduler: ArrivalScheduler,
+                                semaphore: asyncio.Semaphore, collector: LoadTestCollector,
+                                stage_index: Optional[int] = None):
+        """Start one request per scheduled arrival, leaving them tracked as in flight"""
+        async for request_index, intended_time in scheduler.arrivals():
+            if self._stopping(test_id):
+                break
+            payload = self._next_payload(test_id)
+            
+            # Don't await here; arrivals must not depend on response times
+            self._track(test_id, self._run_and_record(test_id, payload, semaphore, config, collector, stage_index, intended_time))
+    
+    async def _execute_staged_test(self, test_id: str, config: LoadTestConfig, collector: LoadTestCollector):
+        """Execute a multi-stage load profile, each stage open-loop (rps) or closed-loop (concurrency)"""
+        semaphore = asyncio.Semaphore(config.concurrency_limit)
+        stage_runs = self.stage_runs.setdefault(test_id, [])
+        # Every stage's RPS timeline is counted in seconds since the start of the whole run
+        origin = time.perf_counter()
+        previous = None
         
-        while time.time() < end_time:
-            payload = self._generate_payload(config, request_count)
-            task = self._execute_single_request(test_id, payload, semaphore, config)
+        for stage_index, stage in enumerate(config.stages):
+            if self._stopping(test_id):
+                break
+            stage_collector = LoadTestCollector(parent=collector)
+            started = time.perf_counter()
+            schedules = []
+            user_stats = None
             
-            # Don't await here to maintain RPS
-            result_task = asyncio.create_task(task)
-            results.append(result_task)
+            if stage.rps:
+                scheduler = ArrivalScheduler(
+                    rps=stage.rps,
+                    duration=stage.duration,
+                    distribution=config.arrival_distribution,
+                    start_rps=self._stage_start_level(stage, previous),
+                    origin=origin
+                )
+                # Requests still in flight at the boundary finish during the next stage
+                await self._send_on_schedule(test_id, config, scheduler, semaphore, stage_collector, stage_index)
+                if scheduler.summary():
+                    schedules.append(scheduler.summary())
+            else:
+                user_stats = await self._execute_closed_loop_stage(test_id, config, stage, self._stage_start_level(stage, previous),
+                                                                   stage_collector, stage_index)
             
-            request_count += 1
-            await asyncio.sleep(interval)
+            stage_runs.append({
+                "collector": stage_collector,
+                "schedules": schedules,
+                "virtual_users": user_stats,
+                "started_offset_sec": started - origin,
+                "ended_offset_sec": time.perf_counter() - origin
+            })
+            logger.info("load_test_stage_completed", test_id=test_id, stage_index=stage_index,
+                        name=stage.name, requests=stage_collector.total)
+            previous = stage
         
-        # Wait for all requests to complete
-        completed_results = await asyncio.gather(*results, return_exceptions=True)
-        return [r for r in completed_results if not isinstance(r, Exception)]
+        await self._drain(test_id)
+        self._summarize_rps_stages(test_id, config.stages, stage_runs)
     
-    async def _execute_single_request(self, test_id: str, payload: PostRequestModel, semaphore: asyncio.Semaphore, config: LoadTestConfig) -> Dict[str, Any]:
-        """Execute a single request with proper tracing and failure scenarios"""
-        async with semaphore:
-            request_id = str(uuid.uuid4())
-            start_time = time.time()
+    def _summarize_rps_stages(self, test_id: str, stages: List[LoadStage], stage_runs: List[Dict[str, Any]]):
+        """Whole-run target vs. achieved RPS over the open-loop stages, weighted by duration"""
+        rps_stages = [(stage, run["schedules"][0]) for stage, run in zip(stages, stage_runs) if run["schedules"]]
+        if rps_stages:
+            rps_duration = sum(stage.duration for stage, _ in rps_stages)
+            self.test_results[test_id] = {
+                "target_rps": sum(schedule["target_rps"] * stage.duration for stage, schedule in rps_stages) / rps_duration,
+                "achieved_rps": sum(schedule["achieved_rps"] * stage.duration for stage, schedule in rps_stages) / rps_duration,
+                "rps_timeline": self._merge_schedule_summaries([schedule for _, schedule in rps_stages])["rps_timeline"]
+            }
+    
+    async def _execute_capacity_search(self, test_id: str, config: LoadTestConfig, collector: LoadTestCollector):
+        """Run short open-loop probes, stepping then bisecting the rate, to find the highest RPS within the SLOs"""
+        search = CapacitySearchState(config.capacity_search)
+        self.capacity_searches[test_id] = search
+        semaphore = asyncio.Semaphore(config.concurrency_limit)
+        stage_runs = self.stage_runs.setdefault(test_id, [])
+        origin = time.perf_counter()
+        
+        rate = search.next_rate()
+        while rate and not self._stopping(test_id):
+            stage_index = len(stage_runs)
+            stage = search.probe_stage(rate)
+            probe_collector = LoadTestCollector(parent=collector)
+            started = time.perf_counter()
+            scheduler = ArrivalScheduler(rps=rate, duration=stage.duration,
+                                         distribution=config.arrival_distribution, origin=origin)
+            await self._send_on_schedule(test_id, config, scheduler, semaphore, probe_collector, stage_index)
+            # Drain before judging: the probe's slowest requests are the ones that matter, and the
+            # next probe must not inherit its backlog
+            await self._drain(test_id)
+            ended = time.perf_counter()
+            
+            stage_runs.append({
+                "collector": probe_collector,
+                "schedules": [scheduler.summary()] if scheduler.summary() else [],
+                "virtual_users": None,
+                "started_offset_sec": started - origin,
+                "ended_offset_sec": ended - origin
+            })
+            probe = search.judge(rate, probe_collector, ended - started, interrupted=self._stopping(test_id))
+            logger.info("capacity_probe_completed", test_id=test_id, target_rps=rate, passed=probe["passed"],
+                        p99_ms=probe["p99_ms"], error_rate=probe["error_rate"], failures=probe["failures"])
             
-            # Store request record
-            await self._store_request_record(test_id, request_id, start_time)
+            rate = search.next_rate()
+            if rate and config.capacity_search.cooldown_sec:
+                await asyncio.sleep(config.capacity_search.cooldown_sec)
+        
+        self._summarize_rps_stages(test_id, search.stages, stage_runs)
+        logger.info("capacity_search_completed", test_id=test_id, saturation_rps=search.passing,
+                    probes=len(search.probes))
+    
+    async def _execute_virtual_user_test(self, test_id: str, config: LoadTestConfig, collector: LoadTestCollector):
+        """Closed loop: each virtual user sends, waits for the response, thinks, and repeats for `duration`"""
+        stage = LoadStage(name="virtual_users", concurrency=config.virtual_users, duration=config.duration or 30)
+        started = time.perf_counter()
+        user_stats = await self._execute_closed_loop_stage(test_id, config, stage, stage.concurrency, collector)
+        await self._drain(test_id)
+        self.virtual_user_runs[test_id] = {"stats": user_stats, "elapsed_sec": time.perf_counter() - started}
+    
+    async def _execute_closed_loop_stage(self, test_id: str, config: LoadTestConfig, stage: LoadStage, start_level: int,
+                                         collector: LoadTestCollector, stage_index: Optional[int] = None) -> VirtualUserStats:
+        """Keep the stage's virtual users cycling through request and think time until the stage ends"""
+        stage_start = time.perf_counter()
+        user_stats = VirtualUserStats(config.think_time)
+        
+        async def virtual_user(begin: float, end: float):
+            delay = stage_start + begin - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            user = user_stats.add_user()
+            active_since = time.perf_counter()
+            stop_time = stage_start + end
+            try:
+                while time.perf_counter() < stop_time and not self._stopping(test_id):
+                    payload = self._next_payload(test_id)
+                    sent = time.perf_counter()
+                    await self._run_and_record(test_id, payload, None, config, collector, stage_index)
+                    received = time.perf_counter()
+                    user["response_time_sec"] += received - sent
+                    user["requests"] += 1
+                    
+                    # Never think past the end of the user's window. Only the drawn think time
+                    # counts: time spent waiting for the event loop beyond it is generator overhead,
+                    # which the Little's law check should expose. With no think time still yield, as
+                    # the request path may never suspend and the other users need their turn
+                    think = min(user_stats.think_seconds(), max(stop_time - received, 0.0))
+                    await asyncio.sleep(think)
+                    user["think_time_sec"] += think
+            finally:
+                user["active_sec"] = time.perf_counter() - active_since
+        
+        windows = [
+            self._virtual_user_window(user, start_level, stage.concurrency, stage.duration)
+            for user in range(max(start_level, stage.concurrency))
+        ]
+        users = [self._track(test_id, virtual_user(begin, end)) for begin, end in windows if begin < end]
+        await asyncio.gather(*users, return_exceptions=True)
+        return user_stats
+    
+    def _virtual_user_window(self, user: int, start_level: int, target_level: int, duration: float):
+        """Seconds into the stage during which virtual user `user` is active on a linear ramp"""
+        if user < min(start_level, target_level):
+            return 0.0, duration
+        if target_level > start_level:
+            # Ramping up: user k joins once the level passes k
+            return (user - start_level) / (target_level - start_level) * duration, duration
+        # Ramping down: user k leaves once the level drops to k
+        return 0.0, (start_level - user) / (start_level - target_level) * duration
+    
+    def _stage_start_level(self, stage: LoadStage, previous: Optional[LoadStage]) -> float:
+        """Level a stage starts at: its own target for a step, else the previous stage's target of the same kind (or zero)"""
+        if stage.ramp != RampShape.LINEAR:
+            return stage.rps or stage.concurrency
+        if stage.rps:
+            return previous.rps if previous and previous.rps else 0
+        return previous.concurrency if previous and previous.concurrency else 0
+    
+    def _stage_results(self, stages: List[LoadStage], stage_runs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Per-stage counts, latency and throughput for a staged run (or a capacity search's probes)"""
+        stage_results = []
+        for stage_index, (stage, run) in enumerate(zip(stages, stage_runs)):
+            stage_collector = run["collector"]
+            elapsed = run["ended_offset_sec"] - run["started_offset_sec"]
+            stage_result = {
+                "stage_index": stage_index,
+                "name": stage.name,
+                "rps": stage.rps,
+                "concurrency": stage.concurrency,
+                "ramp": stage.ramp.value,
+                "duration": stage.duration,
+                "started_offset_sec": run["started_offset_sec"],
+                "ended_offset_sec": run["ended_offset_sec"],
+                "total_requests": stage_collector.total,
+                "succeeded": stage_collector.status_counts["success"],
+                "failed": stage_collector.status_counts["failed"],
+                "rate_limited": stage_collector.status_counts["rate_limited"],
+                "duplicates": stage_collector.status_counts["duplicate"],
+                "throughput_rps": stage_collector.total / elapsed if elapsed > 0 else None,
+                "latency": stage_collector.latency_histogram.summary(),
+                "queue_delay": stage_collector.queue_delay_histogram.summary()
+            }
+            if run["schedules"]:
+                schedule = self._merge_schedule_summaries(run["schedules"])
+                stage_result["target_rps"] = schedule["target_rps"]
+                stage_result["achieved_rps"] = schedule["achieved_rps"]
+            if run.get("virtual_users"):
+                stage_result["virtual_users"] = run["virtual_users"].summary(elapsed)
+            stage_results.append(stage_result)
+        return stage_results
+    
+    async def _run_and_record(self, test_id: str, payload: PostRequestModel, semaphore: Optional[asyncio.Semaphore],
+                              config: LoadTestConfig, collector: LoadTestCollector, stage_index: Optional[int] = None,
+                              intended_time: Optional[float] = None, idempotency_key: Optional[str] = None):
+        """Execute one request and fold its result into the collector"""
+        try:
+            result = await self._execute_single_request(test_id, payload, semaphore, config, stage_index, intended_time,
+                                                        idempotency_key)
+        except Exception as e:
+            logger.error("load_test_request_crashed", test_id=test_id, error=str(e))
+            return
+        collector.record(result)
+    
+    async def _execute_single_request(self, test_id: str, payload: PostRequestModel, semaphore: Optional[asyncio.Semaphore],
+                                      config: LoadTestConfig, stage_index: Optional[int] = None,
+                                      intended_time: Optional[float] = None, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute a single request with proper tracing and failure scenarios.
+        
+        intended_time is the scheduler's perf_counter target for an open-loop
+        arrival. Latency is measured from it rather than from when a semaphore
+        slot came free, so time spent queued in the generator is not hidden.
+        
+        idempotency_key, when given (replays), is sent as is and replaces the
+        randomly injected duplicates: repeats come from the recording instead.
+        """
+        async with semaphore or nullcontext():
+            request_id = idempotency_key or str(uuid.uuid4())
+            start_time = time.time()
+            send_time = time.perf_counter()
+            # Filled in by in-process requests only; HTTP ones leave it empty
+            stage_timer = StageTimer()
             
             try:
                 # Simulate various failure scenarios based on config
@@ -181,28 +825,24 @@ class LoadTestService:
                         )
                         await asyncio.sleep(latency / 1000.0)
                 
-                # Import here to avoid circular imports
-                from v1.controllers.requests import process_request_internal
-                
                 # Generate duplicate requests occasionally
-                if random.random() < 0.1:  # 10% chance of duplicate
+                if not idempotency_key and random.random() < 0.1:  # 10% chance of duplicate
                     # Use same request_id to simulate duplicate
                     existing_id = f"duplicate_{test_id}_{random.randint(1, 10)}"
-                    result = await process_request_internal(payload, existing_id)
+                    result = await self._send_request(test_id, payload, existing_id, config, stage_timer)
                     status_type = "duplicate"
                 else:
-                    result = await process_request_internal(payload, request_id)
+                    result = await self._send_request(test_id, payload, request_id, config, stage_timer)
                     status_type = "success" if result.get("status", 500) < 400 else "failed"
                 
-                end_time = time.time()
-                latency_ms = (end_time - start_time) * 1000
+                timing = self._request_timing(intended_time, send_time)
                 
                 # Handle rate limiting
                 if result.get("status") == 429:
                     status_type = "rate_limited"
                 
-                # Update request record
-                await self._update_request_record(test_id, request_id, status_type, result.get("status", 200), latency_ms)
+                await self._record_request(test_id, request_id, start_time, status_type, result.get("status", 200), timing,
+                                           stage_index=stage_index)
                 
                 if status_type == "success":
                     TEST_REQUEST_SUCCESS.inc()
@@ -212,165 +852,306 @@ class LoadTestService:
                 return {
                     "request_id": request_id,
                     "status": status_type,
-                    "latency_ms": latency_ms,
-                    "status_code": result.get("status", 200)
+                    **timing,
+                    "status_code": result.get("status", 200),
+                    "request_stages_ms": stage_timer.breakdown_ms()
                 }
                 
             except Exception as e:
-                end_time = time.time()
-                latency_ms = (end_time - start_time) * 1000
+                timing = self._request_timing(intended_time, send_time)
                 
-                await self._update_request_record(test_id, request_id, "failed", 500, latency_ms, str(e))
+                await self._record_request(test_id, request_id, start_time, "failed", 500, timing, str(e), stage_index)
                 
                 TEST_REQUEST_FAILED.inc()
                 
                 return {
                     "request_id": request_id,
                     "status": "failed",
-                    "latency_ms": latency_ms,
+                    **timing,
                     "error": str(e)
                 }
     
-    def _generate_payload(self, config: LoadTestConfig, request_index: int) -> PostRequestModel:
-        """Generate request payload based on strategy"""
-        base = config.base_payload.copy()
-        
-        if config.payload_strategy == PayloadStrategy.RANDOMIZED:
-            # Add some randomization
-            if "rate_of_requests" in base:
-                base["rate_of_requests"] = random.randint(1, base.get("rate_of_requests", 10))
-            if "number_of_requests" in base:
-                base["number_of_requests"] = random.randint(1, base.get("number_of_requests", 100))
+    async def _send_request(self, test_id: str, payload: PostRequestModel, request_id: str, config: LoadTestConfig,
+                            stage_timer: StageTimer = None) -> Dict[str, Any]:
+        """Send one request over the configured transport and return its outcome"""
+        if config.transport == LoadTransport.HTTP:
+            # Same key prefix as process_request_internal, so replays can tell generated traffic
+            # from organic traffic whichever transport sent it
+            response = await self.http_clients[test_id].post_request(payload.dict(), f"load_test_{request_id}")
+            return {"status": response.status_code}
         
-        return PostRequestModel(**base)
+        # Import here to avoid circular imports
+        from v1.controllers.requests import process_request_internal
+        return await process_request_internal(payload, request_id, stage_timer)
+    
+    def _request_timing(self, intended_time: Optional[float], send_time: float) -> Dict[str, float]:
+        """Service time, generator-side queueing delay, and the corrected response time a client would see"""
+        service_time_ms = (time.perf_counter() - send_time) * 1000
+        queue_delay_ms = max(send_time - intended_time, 0.0) * 1000 if intended_time is not None else 0.0
+        TEST_QUEUE_DELAY.observe(queue_delay_ms / 1000)
+        return {
+            "latency_ms": queue_delay_ms + service_time_ms,
+            "service_time_ms": service_time_ms,
+            "queue_delay_ms": queue_delay_ms
+        }
+    
+    def _next_payload(self, test_id: str) -> PostRequestModel:
+        """Next payload from the test's prebuilt source"""
+        return self.payload_sources[test_id].next()
     
-    def _calculate_statistics(self, results: List[Dict[str, Any]], start_time: float, end_time: float) -> Dict[str, Any]:
+    def _close_payload_source(self, test_id: str):
+        source = self.payload_sources.pop(test_id, None)
+        if source:
+            source.close()
+    
+    def _calculate_statistics(self, collector: LoadTestCollector, start_time: float, end_time: float) -> Dict[str, Any]:
         """Calculate final test statistics"""
-        if not results:
+        if not collector.total:
             return {}
         
-        latencies = [r["latency_ms"] for r in results if "latency_ms" in r]
-        
-        # Count different status types
-        succeeded = len([r for r in results if r.get("status") == "success"])
-        failed = len([r for r in results if r.get("status") == "failed"])
-        rate_limited = len([r for r in results if r.get("status") == "rate_limited"])
-        duplicates = len([r for r in results if r.get("status") == "duplicate"])
-        
         stats = {
-            "total_requests": len(results),
-            "succeeded": succeeded,
-            "failed": failed,
-            "rate_limited": rate_limited,
-            "duplicates": duplicates,
+            "total_requests": collector.total,
+            "succeeded": collector.status_counts["success"],
+            "failed": collector.status_counts["failed"],
+            "rate_limited": collector.status_counts["rate_limited"],
+            "duplicates": collector.status_counts["duplicate"],
             "retries_total": 0,  # Would need retry tracking
             "start_time": datetime.fromtimestamp(start_time),
             "end_time": datetime.fromtimestamp(end_time),
             "duration_sec": end_time - start_time
         }
         
-        if latencies:
-            stats["avg_latency_ms"] = mean(latencies)
-            percentiles = quantiles(latencies, n=100)
-            stats["p95_latency_ms"] = percentiles[94] if len(percentiles) > 94 else max(latencies)
-            stats["p99_latency_ms"] = percentiles[98] if len(percentiles) > 98 else max(latencies)
+        histogram = collector.latency_histogram
+        if histogram.count:
+            latency = histogram.summary()
+            stats["avg_latency_ms"] = latency["mean"]
+            stats["p50_latency_ms"] = latency["p50"]
+            stats["p90_latency_ms"] = latency["p90"]
+            stats["p95_latency_ms"] = latency["p95"]
+            stats["p99_latency_ms"] = latency["p99"]
+            stats["p999_latency_ms"] = latency["p999"]
+            stats["max_latency_ms"] = latency["max"]
+            stats["latency_histogram"] = histogram.to_dict()
+            stats["latency_breakdown"] = {
+                "response_time": latency,
+                "service_time": collector.service_time_histogram.summary(),
+                "queue_delay": collector.queue_delay_histogram.summary()
+            }
+            if collector.request_stage_histograms:
+                stats["latency_breakdown"]["request_stages"] = {
+                    stage: stage_histogram.summary() for stage, stage_histogram in collector.request_stage_histograms.items()
+                }
         
         return stats
     
-    async def _store_request_record(self, test_id: str, request_id: str, start_time: float):
-        """Store individual request record"""
-        with db_service.get_session() as session:
-            session.execute(
-                text("""
-                INSERT INTO test_requests (test_id, request_id, started_at, status)
-                VALUES (:test_id, :request_id, :started_at, :status)
-                """),
-                {
-                    "test_id": test_id,
-                    "request_id": request_id,
-                    "started_at": datetime.fromtimestamp(start_time),
-                    "status": "pending"
-                }
-            )
-            session.commit()
+    def _start_recorder(self, test_id: str):
+        """Start the write-behind recorder for this test's test_requests rows"""
+        recorder = RequestRecorder(test_id)
+        recorder.start()
+        self.recorders[test_id] = recorder
+    
+    async def _close_recorder(self, test_id: str):
+        """Flush and stop the test's recorder, if it has one"""
+        recorder = self.recorders.pop(test_id, None)
+        if recorder:
+            await recorder.close()
+    
+    def _start_http_client(self, test_id: str, config: LoadTestConfig):
+        """Open the test's pooled HTTP client when it drives the real endpoint"""
+        if config.transport == LoadTransport.HTTP:
+            self.http_clients[test_id] = HttpLoadClient(pool_size=config.http_pool_size or config.concurrency_limit)
     
-    async def _update_request_record(self, test_id: str, request_id: str, status: str, 
-                                   status_code: int, latency_ms: float, error_message: str = None):
-        """Update request record with results"""
-        with db_service.get_session() as session:
-            session.execute(
+    async def _close_http_client(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """Close the test's HTTP client, if it has one, and return its pool stats"""
+        client = self.http_clients.pop(test_id, None)
+        if not client:
+            return None
+        await client.close()
+        return client.stats()
+    
+    def _start_progress(self, test_id: str, collector: LoadTestCollector, config: LoadTestConfig):
+        """Start pushing live progress frames for this test to WebSocket subscribers"""
+        progress = LoadTestProgress(test_id, collector, check=self._stop_condition_check(test_id, config))
+        progress.start()
+        self.progress[test_id] = progress
+    
+    def _stop_condition_checker(self, test_id: str, collector: LoadTestCollector, config: LoadTestConfig) -> Optional[LoadTestProgress]:
+        """Watch a generator worker's own progress against the stop conditions, without publishing it"""
+        check = self._stop_condition_check(test_id, config)
+        if not check:
+            return None
+        progress = LoadTestProgress(test_id, collector, check=check, publish=False)
+        progress.start()
+        return progress
+    
+    def _stop_condition_check(self, test_id: str, config: LoadTestConfig):
+        if not config.stop_conditions:
+            return None
+        return lambda snapshot: self._check_stop_conditions(test_id, config.stop_conditions, snapshot)
+    
+    async def _stop_progress(self, test_id: str, status: TestStatus):
+        """Send the last progress frame and tell subscribers the test has finished"""
+        progress = self.progress.pop(test_id, None)
+        if progress:
+            await progress.stop()
+        
+        # Import here to avoid circular imports
+        from v1.routes.websocket import manager
+        await manager.broadcast(
+            json.dumps({"type": "test_status", "test_id": test_id, "status": status.value}),
+            topic=test_id
+        )
+    
+    async def _record_request(self, test_id: str, request_id: str, start_time: float, status: str,
+                              status_code: int, timing: Dict[str, float], error_message: str = None, stage_index: int = None):
+        """Queue the completed request's row for the next batch write"""
+        await self.recorders[test_id].record({
+            "test_id": test_id,
+            "request_id": request_id,
+            "started_at": datetime.fromtimestamp(start_time),
+            "completed_at": datetime.utcnow(),
+            "status": status,
+            "status_code": status_code,
+            "latency_ms": timing["latency_ms"],
+            "service_time_ms": timing["service_time_ms"],
+            "queue_delay_ms": timing["queue_delay_ms"],
+            "error_message": error_message,
+            "stage_index": stage_index
+        })
+    
+    async def _archive_requests(self, test_id: str, config: LoadTestConfig):
+        """Compact the run's test_requests rows into its columnar archive, then optionally prune them"""
+        try:
+            # Bookkeeping for a run that already finished, so queued even when the executor is full
+            info = await db_service.run(archive_service.write, test_id, reject_when_full=False)
+            if info and config.prune_archived_requests:
+                await db_service.run(archive_service.prune, test_id, reject_when_full=False)
+        except Exception as e:
+            # The rows stay in test_requests; the archive can be rebuilt later
+            logger.error("load_test_archive_failed", test_id=test_id, error=str(e))
+    
+    async def _store_timeseries(self, test_id: str, timeseries: LoadTestTimeSeries, start_time: float):
+        """Write the run's time-series buckets at every stored resolution"""
+        rows = [
+            {"test_id": test_id, **row}
+            for resolution in LoadTestTimeSeries.RESOLUTIONS
+            for row in timeseries.rows(start_time, resolution)
+        ]
+        if not rows:
+            return
+        
+        try:
+            await db_service.run(
+                db_service.execute_write,
                 text("""
-                UPDATE test_requests 
-                SET completed_at = :completed_at, status = :status, status_code = :status_code, 
-                    latency_ms = :latency_ms, error_message = :error_message
-                WHERE test_id = :test_id AND request_id = :request_id
+                INSERT INTO test_timeseries (
+                    test_id, resolution_sec, bucket_offset_sec, bucket_start, total, succeeded, failed,
+                    rate_limited, duplicates, achieved_rps, error_rate, avg_latency_ms, p50_latency_ms,
+                    p95_latency_ms, p99_latency_ms, max_latency_ms
+                ) VALUES (
+                    :test_id, :resolution_sec, :bucket_offset_sec, :bucket_start, :total, :succeeded, :failed,
+                    :rate_limited, :duplicates, :achieved_rps, :error_rate, :avg_latency_ms, :p50_latency_ms,
+                    :p95_latency_ms, :p99_latency_ms, :max_latency_ms
+                )
                 """),
-                {
-                    "completed_at": datetime.utcnow(),
-                    "status": status,
-                    "status_code": status_code,
-                    "latency_ms": latency_ms,
-                    "error_message": error_message,
-                    "test_id": test_id,
-                    "request_id": request_id
-                }
+                rows,
+                reject_when_full=False
             )
-            session.commit()
+        except Exception as e:
+            # The aggregate result matters more than the chart data; finalize regardless
+            logger.error("load_test_timeseries_write_failed", test_id=test_id, rows=len(rows), error=str(e))
     
     async def _update_test_status(self, test_id: str, status: TestStatus, additional_data: Dict[str, Any] = None):
         """Update test status in database"""
-        with db_service.get_session() as session:
-            if additional_data and "started_at" in additional_data:
-                session.execute(
-                    text("UPDATE test_runs SET status = :status, started_at = :started_at WHERE test_id = :test_id"),
-                    {"status": status.value, "started_at": additional_data["started_at"], "test_id": test_id}
-                )
-            else:
-                session.execute(
-                    text("UPDATE test_runs SET status = :status WHERE test_id = :test_id"),
-                    {"status": status.value, "test_id": test_id}
-                )
-            session.commit()
+        if additional_data and "started_at" in additional_data:
+            await db_service.run(
+                db_service.execute_write,
+                text("UPDATE test_runs SET status = :status, started_at = :started_at WHERE test_id = :test_id"),
+                {"status": status.value, "started_at": additional_data["started_at"], "test_id": test_id},
+                reject_when_full=False
+            )
+        else:
+            await db_service.run(
+                db_service.execute_write,
+                text("UPDATE test_runs SET status = :status WHERE test_id = :test_id"),
+                {"status": status.value, "test_id": test_id},
+                reject_when_full=False
+            )
     
     async def _finalize_test(self, test_id: str, stats: Dict[str, Any], status: TestStatus):
         """Finalize test with computed statistics"""
-        with db_service.get_session() as session:
-            session.execute(
-                text("""
-                UPDATE test_runs SET 
-                    status = :status, completed_at = :completed_at, succeeded = :succeeded, failed = :failed, 
-                    rate_limited = :rate_limited, duplicates = :duplicates, retries_total = :retries_total,
-                    avg_latency_ms = :avg_latency_ms, p95_latency_ms = :p95_latency_ms, 
-                    p99_latency_ms = :p99_latency_ms, duration_sec = :duration_sec
-                WHERE test_id = :test_id
-                """),
-                {
-                    "status": status.value,
-                    "completed_at": datetime.utcnow(),
-                    "succeeded": stats.get("succeeded", 0),
-                    "failed": stats.get("failed", 0),
-                    "rate_limited": stats.get("rate_limited", 0),
-                    "duplicates": stats.get("duplicates", 0),
-                    "retries_total": stats.get("retries_total", 0),
-                    "avg_latency_ms": stats.get("avg_latency_ms"),
-                    "p95_latency_ms": stats.get("p95_latency_ms"),
-                    "p99_latency_ms": stats.get("p99_latency_ms"),
-                    "duration_sec": stats.get("duration_sec"),
-                    "test_id": test_id
-                }
-            )
-            session.commit()
+        # Make sure every request row is on disk before the run is marked done
+        await self._close_recorder(test_id)
+        
+        await db_service.run(
+            db_service.execute_write,
+            text("""
+            UPDATE test_runs SET 
+                status = :status, completed_at = :completed_at,
+                total_requests = COALESCE(:total_requests, total_requests),
+                succeeded = :succeeded, failed = :failed, 
+                rate_limited = :rate_limited, duplicates = :duplicates, retries_total = :retries_total,
+                avg_latency_ms = :avg_latency_ms, p50_latency_ms = :p50_latency_ms,
+                p90_latency_ms = :p90_latency_ms, p95_latency_ms = :p95_latency_ms, 
+                p99_latency_ms = :p99_latency_ms, p999_latency_ms = :p999_latency_ms,
+                max_latency_ms = :max_latency_ms, latency_histogram = :latency_histogram,
+                duration_sec = :duration_sec,
+                target_rps = :target_rps, achieved_rps = :achieved_rps, rps_timeline = :rps_timeline,
+                stage_results = :stage_results, latency_breakdown = :latency_breakdown,
+                http_pool_stats = :http_pool_stats, stop_reason = :stop_reason,
+                abandoned_requests = :abandoned_requests, virtual_user_stats = :virtual_user_stats,
+                capacity_search = :capacity_search, saturation_rps = :saturation_rps,
+                simulation = :simulation
+            WHERE test_id = :test_id
+            """),
+            {
+                "status": status.value,
+                "completed_at": datetime.utcnow(),
+                # Requests actually sent; a failed run keeps the planned count from _create_test_record
+                "total_requests": stats.get("total_requests"),
+                "succeeded": stats.get("succeeded", 0),
+                "failed": stats.get("failed", 0),
+                "rate_limited": stats.get("rate_limited", 0),
+                "duplicates": stats.get("duplicates", 0),
+                "retries_total": stats.get("retries_total", 0),
+                "avg_latency_ms": stats.get("avg_latency_ms"),
+                "p50_latency_ms": stats.get("p50_latency_ms"),
+                "p90_latency_ms": stats.get("p90_latency_ms"),
+                "p95_latency_ms": stats.get("p95_latency_ms"),
+                "p99_latency_ms": stats.get("p99_latency_ms"),
+                "p999_latency_ms": stats.get("p999_latency_ms"),
+                "max_latency_ms": stats.get("max_latency_ms"),
+                "latency_histogram": json.dumps(stats["latency_histogram"]) if stats.get("latency_histogram") else None,
+                "duration_sec": stats.get("duration_sec"),
+                "target_rps": stats.get("target_rps"),
+                "achieved_rps": stats.get("achieved_rps"),
+                "rps_timeline": json.dumps(stats["rps_timeline"]) if stats.get("rps_timeline") else None,
+                "stage_results": json.dumps(stats["stage_results"]) if stats.get("stage_results") else None,
+                "latency_breakdown": json.dumps(stats["latency_breakdown"]) if stats.get("latency_breakdown") else None,
+                "http_pool_stats": json.dumps(stats["http_pool_stats"]) if stats.get("http_pool_stats") else None,
+                "stop_reason": stats.get("stop_reason"),
+                "abandoned_requests": stats.get("abandoned_requests"),
+                "virtual_user_stats": json.dumps(stats["virtual_user_stats"]) if stats.get("virtual_user_stats") else None,
+                "capacity_search": json.dumps(stats["capacity_search"]) if stats.get("capacity_search") else None,
+                "saturation_rps": stats.get("saturation_rps"),
+                "simulation": json.dumps(stats["simulation"]) if stats.get("simulation") else None,
+                "test_id": test_id
+            },
+            reject_when_full=False
+        )
+        
+        try:
+            await self._stop_progress(test_id, status)
+        except Exception as e:
+            logger.warning("load_test_progress_stop_failed", test_id=test_id, error=str(e))
     
     async def _get_test_from_db(self, test_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve test result from database"""
-        with db_service.get_session() as session:
-            result = session.execute(
-                text("SELECT * FROM test_runs WHERE test_id = :test_id"),
-                {"test_id": test_id}
-            ).fetchone()
-            
-            if result:
-                return dict(result._mapping)
-            return None
+        rows = await db_service.run(
+            db_service.fetch_all,
+            text("SELECT * FROM test_runs WHERE test_id = :test_id"),
+            {"test_id": test_id}
+        )
+        return rows[0] if rows else None
 
 load_test_service = LoadTestService()
\ No newline at end of file
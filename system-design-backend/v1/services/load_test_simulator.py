@@ -0,0 +1,396 @@
+import heapq
+import json
+import math
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+
+from v1.models.load_test import (
+    LoadTestConfig, ServiceTime, ServiceTimeDistribution, ArrivalDistribution
+)
+from v1.services.database_service_traced import db_service_traced as db_service
+from v1.services.load_test_archive import archive_service
+from v1.services.load_test_collector import LoadTestCollector
+from v1.services.observability import logger
+from tracing.trace_storage import trace_storage
+
+# Indices into LoadTestCollector.STATUSES
+SUCCESS, FAILED, RATE_LIMITED, DUPLICATE = range(4)
+
+# Event kinds on the simulation's event heap
+DB_ARRIVE, DB_DONE, DONE = range(3)
+
+class _Draws:
+    """Values from a vectorized sampler, handed out one at a time and refilled in blocks"""
+
+    BLOCK = 65536
+
+    def __init__(self, sample):
+        self._sample = sample
+        self._values: List[float] = []
+        self._position = 0
+
+    def next(self) -> float:
+        if self._position == len(self._values):
+            self._values = self._sample(self.BLOCK).tolist()
+            self._position = 0
+        value = self._values[self._position]
+        self._position += 1
+        return value
+
+class LoadTestSimulator:
+    """
+    Discrete-event simulation of the request pipeline as a queueing network.
+
+    Each request takes a generator slot (concurrency_limit of them, held
+    until it completes), passes the rate limiter (fixed or sliding window
+    over simulated time), then the front stage (rate-limit check and cache
+    lookup, an infinite-server delay). Cache hits finish there; misses
+    queue FIFO for one of db_pool_size DB connections and failed DB
+    attempts are retried with exponential backoff.
+
+    Everything random is drawn up front in vectorized numpy calls, so the
+    event loop only moves precomputed numbers through two heaps and two
+    queues, on simulated time: a million requests take seconds however
+    long the simulated run is. Results are folded into a LoadTestCollector
+    in one pass, giving the same statistics and time series as a real run.
+
+    Service times are calibrated from a finished run: cache-hit (duplicate)
+    requests give the front stage, successful ones (or their stored traces,
+    from the rate-limit check to the response) the whole pipeline, and the
+    DB stage is their difference.
+    """
+
+    CALIBRATION_SAMPLES = 20000
+    TRACE_SAMPLES = 500
+    MIN_TRACES = 50
+    RATE_LIMIT_WINDOW_SEC = 60  # The rate limiter's window in the real pipeline
+
+    def calibrate(self, test_id: str) -> Dict[str, Any]:
+        """Empirical front and DB service times (ms) and DB error rate from a finished run"""
+        with db_service.engine.connect() as conn:
+            run = conn.execute(text("SELECT config, status FROM test_runs WHERE test_id = :test_id"),
+                               {"test_id": test_id}).first()
+            if run is None:
+                raise ValueError(f"Calibration run {test_id} not found")
+            rows = conn.execute(
+                text("""
+                SELECT request_id, status, service_time_ms FROM test_requests
+                WHERE test_id = :test_id AND service_time_ms IS NOT NULL
+                ORDER BY id LIMIT :limit
+                """),
+                {"test_id": test_id, "limit": self.CALIBRATION_SAMPLES}
+            ).fetchall()
+
+        statuses = np.array([row.status for row in rows], dtype=object)
+        service_times = np.array([row.service_time_ms for row in rows], dtype=np.float64)
+        request_ids = [row.request_id for row, status in zip(rows, statuses) if status == "success"]
+        if not rows:
+            # Rows were pruned after archiving
+            archive = archive_service.open(test_id)
+            if archive is None:
+                raise ValueError(f"Calibration run {test_id} has no recorded requests")
+            service_times = np.asarray(archive.column("service_time_ms")[:self.CALIBRATION_SAMPLES], dtype=np.float64)
+            statuses = np.array([archive.statuses[code] if code < len(archive.statuses) else None
+                                 for code in archive.column("status")[:self.CALIBRATION_SAMPLES].tolist()], dtype=object)
+
+        hits = service_times[statuses == "duplicate"]
+        completed = service_times[statuses == "success"]
+        source = "test_requests"
+        spans = self._trace_spans(request_ids[:self.TRACE_SAMPLES])
+        if spans.size >= self.MIN_TRACES:
+            completed, source = spans, "traces"
+        if not completed.size:
+            raise ValueError(f"Calibration run {test_id} has no successful requests")
+
+        front = hits if hits.size else np.zeros(1)
+        # The DB stage is whatever a miss spends beyond the cache-hit path
+        db = np.maximum(completed - float(np.median(front)), 0.0)
+
+        # Injected failures are a setting of that run, not a property of the pipeline
+        injection = json.loads(run.config).get("failure_injection") or {}
+        injected = bool(injection.get("enabled"))
+        error_rate = 0.0 if injected or not statuses.size else float(np.mean(statuses == "failed")) * 100
+
+        return {
+            "test_id": test_id,
+            "source": source,
+            "samples": {"front": int(hits.size), "db": int(completed.size)},
+            "front_ms": front,
+            "db_ms": db,
+            "db_error_rate": error_rate
+        }
+
+    @staticmethod
+    def _trace_spans(request_ids: List[str]) -> np.ndarray:
+        """Rate-limit check to response, in ms, for the requests whose traces are still stored"""
+        spans = []
+        for request_id in request_ids:
+            trace = trace_storage.get_trace(request_id)
+            if trace is None:
+                continue
+            times = {}
+            for event in trace.events:
+                times.setdefault(event.event_type, event.timestamp_monotonic)
+            if "rate_limit_check" in times and "response_sent" in times:
+                spans.append((times["response_sent"] - times["rate_limit_check"]) * 1000)
+        return np.array(spans, dtype=np.float64)
+
+    def run(self, config: LoadTestConfig, collector: LoadTestCollector, wall_start: float,
+            calibration: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Simulate the configured test into `collector`; simulated time 0 maps to wall_start.
+        calibration is calibrate(simulation.calibrate_from), read by the caller.
+        """
+        simulation = config.simulation
+        started = time.perf_counter()
+        rng = np.random.default_rng(simulation.seed)
+
+        # Uncalibrated, the front stage is free unless configured (the DB stage always is one or the other)
+        front_sampler = self._sampler(simulation.front_service_time,
+                                      calibration["front_ms"] if calibration else np.zeros(1), rng)
+        db_sampler = self._sampler(simulation.db_service_time, calibration["db_ms"] if calibration else None, rng)
+        db_error_rate = (simulation.db_error_rate if simulation.db_error_rate is not None else
+                         calibration["db_error_rate"] if calibration else 0.0) / 100
+
+        arrivals = self._arrivals(config, rng)
+        n = arrivals.size
+        payload = config.base_payload
+
+        # Per-request draws, all vectorized. Times are in seconds from here on
+        repeat = rng.random(n) < simulation.cache_hit_ratio
+        front = front_sampler(n) / 1000
+        db_first = db_sampler(n) / 1000
+        db_first_failed = rng.random(n) < db_error_rate
+        injected_failure = np.zeros(n, dtype=bool)
+        injected_delay = np.zeros(n)
+        extra_latency = np.zeros(n)
+        injection = config.failure_injection
+        if injection and injection.enabled:
+            injected_failure = rng.random(n) < injection.failure_rate / 100
+            # One in three injected failures is a timeout, as in the real generator
+            injected_delay = np.where(rng.random(n) < 1 / 3, injection.timeout_seconds, 0.0)
+            if injection.latency_min_ms > 0:
+                high = max(injection.latency_max_ms, injection.latency_min_ms)
+                extra_latency = rng.integers(injection.latency_min_ms, high, size=n, endpoint=True) / 1000
+
+        outcome = self._simulate(
+            config, arrivals.tolist(), repeat.tolist(), front.tolist(), db_first.tolist(),
+            db_first_failed.tolist(), injected_failure.tolist(), injected_delay.tolist(), extra_latency.tolist(),
+            _Draws(lambda size: db_sampler(size) / 1000), _Draws(lambda size: rng.random(size) < db_error_rate),
+            cache_enabled=bool(payload.get("cache_enabled", True)),
+            rate_limit=int(payload.get("rate_limiting", 0)) or None,
+            sliding=payload.get("rate_limiting_algo") == "sliding_window"
+        )
+
+        start = np.array(outcome.pop("start"))
+        end = np.array(outcome.pop("end"))
+        status = np.array(outcome.pop("status"), dtype=np.int64)
+        collector.record_many(status, (end - arrivals) * 1000, (end - start) * 1000, (start - arrivals) * 1000,
+                              wall_start + end)
+
+        makespan = float(end.max()) if n else 0.0
+        simulated_seconds = int(math.ceil(makespan)) or 1
+        target = np.bincount(arrivals.astype(np.int64), minlength=simulated_seconds)
+        achieved = np.bincount(start.astype(np.int64), minlength=simulated_seconds)
+        wall_seconds = time.perf_counter() - started
+
+        summary = {
+            "requests": int(n),
+            "simulated_duration_sec": makespan,
+            "wall_time_sec": wall_seconds,
+            "events": outcome["events"],
+            "db_pool_size": simulation.db_pool_size,
+            "db_utilization": outcome["db_busy_sec"] / (simulation.db_pool_size * makespan) if makespan else None,
+            "db_mean_wait_ms": outcome["db_wait_sec"] / outcome["db_attempts"] * 1000 if outcome["db_attempts"] else None,
+            "db_max_queue": outcome["db_max_queue"],
+            "generator_max_queue": outcome["generator_max_queue"],
+            "db_error_rate": db_error_rate * 100,
+            "calibration": {
+                key: value for key, value in calibration.items() if key not in ("front_ms", "db_ms")
+            } if calibration else None,
+            "front_service_ms": self._describe(front * 1000),
+            "db_service_ms": self._describe(db_first * 1000)
+        }
+        logger.info("load_test_simulated", requests=summary["requests"], events=summary["events"],
+                    simulated_sec=round(makespan, 3), wall_sec=round(wall_seconds, 3))
+
+        return {
+            "retries_total": outcome["retries"],
+            "duration_sec": makespan,
+            "target_rps": n / makespan if makespan else None,
+            "achieved_rps": int(collector.total) / makespan if makespan else None,
+            "rps_timeline": [
+                {"second": second, "target_rps": int(target[second]), "achieved_rps": int(achieved[second])}
+                for second in range(max(target.size, achieved.size))
+            ] if config.rps and not config.total_requests else None,
+            "simulation": summary
+        }
+
+    def _simulate(self, config: LoadTestConfig, arrivals: List[float], repeat: List[bool], front: List[float],
+                  db_first: List[float], db_first_failed: List[bool], injected_failure: List[bool],
+                  injected_delay: List[float], extra_latency: List[float], db_retry_time: _Draws,
+                  db_retry_failed: _Draws, cache_enabled: bool, rate_limit: Optional[int],
+                  sliding: bool) -> Dict[str, Any]:
+        """The event loop; arrivals are sorted, everything else is on a heap of (time, seq, kind, request)"""
+        simulation = config.simulation
+        n = len(arrivals)
+        start = [0.0] * n
+        end = [0.0] * n
+        status = [SUCCESS] * n
+        attempts = [0] * n
+        db_enqueued = [0.0] * n
+
+        heap: List[tuple] = []
+        push, pop = heapq.heappush, heapq.heappop
+        sequence = 0
+        generator_free, generator_queue = config.concurrency_limit, deque()
+        db_free, db_queue = simulation.db_pool_size, deque()
+        max_retries = simulation.max_retries if config.retries_enabled else 0
+        backoff = simulation.retry_backoff_ms / 1000
+        window = self.RATE_LIMIT_WINDOW_SEC
+        allowed_times, window_index, window_count = deque(), -1, 0
+        counters = {"events": 0, "retries": 0, "db_busy_sec": 0.0, "db_wait_sec": 0.0, "db_attempts": 0,
+                    "db_max_queue": 0, "generator_max_queue": 0}
+
+        def begin(i: int, now: float):
+            nonlocal sequence, window_index, window_count
+            start[i] = now
+            sequence += 1
+            if rate_limit is not None:
+                if sliding:
+                    while allowed_times and allowed_times[0] <= now - window:
+                        allowed_times.popleft()
+                    limited = len(allowed_times) >= rate_limit
+                    if not limited:
+                        allowed_times.append(now)
+                else:
+                    if int(now // window) != window_index:
+                        window_index, window_count = int(now // window), 0
+                    limited = window_count >= rate_limit
+                    if not limited:
+                        window_count += 1
+                if limited:
+                    status[i] = RATE_LIMITED
+                    push(heap, (now + front[i], sequence, DONE, i))
+                    return
+            if injected_failure[i]:
+                status[i] = FAILED
+                push(heap, (now + injected_delay[i], sequence, DONE, i))
+                return
+            ready = now + extra_latency[i] + front[i]
+            if repeat[i]:
+                status[i] = DUPLICATE
+                if cache_enabled:
+                    push(heap, (ready, sequence, DONE, i))
+                    return
+            push(heap, (ready, sequence, DB_ARRIVE, i))
+
+        def start_db(i: int, now: float):
+            nonlocal sequence
+            service = db_first[i] if attempts[i] == 0 else db_retry_time.next()
+            counters["db_busy_sec"] += service
+            counters["db_wait_sec"] += now - db_enqueued[i]
+            counters["db_attempts"] += 1
+            sequence += 1
+            push(heap, (now + service, sequence, DB_DONE, i))
+
+        def finish(i: int, now: float):
+            nonlocal generator_free
+            end[i] = now
+            if generator_queue:
+                begin(generator_queue.popleft(), now)
+            else:
+                generator_free += 1
+
+        next_arrival = 0
+        while next_arrival < n or heap:
+            counters["events"] += 1
+            if next_arrival < n and (not heap or arrivals[next_arrival] <= heap[0][0]):
+                i, now = next_arrival, arrivals[next_arrival]
+                next_arrival += 1
+                if generator_free:
+                    generator_free -= 1
+                    begin(i, now)
+                else:
+                    generator_queue.append(i)
+                    if len(generator_queue) > counters["generator_max_queue"]:
+                        counters["generator_max_queue"] = len(generator_queue)
+                continue
+
+            now, _, kind, i = pop(heap)
+            if kind == DB_ARRIVE:
+                db_enqueued[i] = now
+                if db_free:
+                    db_free -= 1
+                    start_db(i, now)
+                else:
+                    db_queue.append(i)
+                    if len(db_queue) > counters["db_max_queue"]:
+                        counters["db_max_queue"] = len(db_queue)
+            elif kind == DB_DONE:
+                if db_queue:
+                    start_db(db_queue.popleft(), now)
+                else:
+                    db_free += 1
+                failed = db_first_failed[i] if attempts[i] == 0 else db_retry_failed.next()
+                attempts[i] += 1
+                if not failed:
+                    finish(i, now)
+                elif attempts[i] <= max_retries:
+                    counters["retries"] += 1
+                    sequence += 1
+                    push(heap, (now + backoff * 2 ** (attempts[i] - 1), sequence, DB_ARRIVE, i))
+                else:
+                    status[i] = FAILED
+                    finish(i, now)
+            else:
+                finish(i, now)
+
+        return {"start": start, "end": end, "status": status, **counters}
+
+    @staticmethod
+    def _arrivals(config: LoadTestConfig, rng: np.random.Generator) -> np.ndarray:
+        """Intended send times (seconds), following the real scheduler's modes"""
+        if config.burst_mode or config.total_requests:
+            # Burst: everything is due at once; the generator slots meter it out
+            return np.zeros(config.total_requests or 100)
+        rps, duration = config.rps or 5, config.duration or 30
+        n = int(rps * duration)
+        if config.arrival_distribution == ArrivalDistribution.POISSON:
+            work = rng.exponential(1.0, n)
+        elif config.arrival_distribution == ArrivalDistribution.UNIFORM:
+            work = rng.uniform(0, 2.0, n)
+        else:
+            work = np.ones(n)
+        work[0] = 0.0
+        return np.cumsum(work) / rps
+
+    @staticmethod
+    def _sampler(distribution: Optional[ServiceTime], empirical: Optional[np.ndarray], rng: np.random.Generator):
+        """Vectorized service-time sampler (ms): the configured distribution, else the calibrated samples"""
+        if distribution is None:
+            return lambda size: rng.choice(empirical, size=size)
+        mean = distribution.mean_ms
+        if distribution.distribution == ServiceTimeDistribution.CONSTANT:
+            return lambda size: np.full(size, mean)
+        if distribution.distribution == ServiceTimeDistribution.EXPONENTIAL:
+            return lambda size: rng.exponential(mean, size)
+        # Parameterised so the distribution's mean is mean_ms whatever sigma is
+        mu = math.log(mean) - distribution.sigma ** 2 / 2
+        return lambda size: rng.lognormal(mu, distribution.sigma, size)
+
+    @staticmethod
+    def _describe(values_ms: np.ndarray) -> Optional[Dict[str, float]]:
+        if not values_ms.size:
+            return None
+        return {
+            "mean": float(values_ms.mean()),
+            "p50": float(np.percentile(values_ms, 50)),
+            "p99": float(np.percentile(values_ms, 99))
+        }
+
+simulator = LoadTestSimulator()
@@ -0,0 +1,94 @@
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from v1.services.latency_histogram import LatencyHistogram
+
+class LoadTestTimeSeries:
+    """
+    Per-second completion counts and latency histograms for one run.
+
+    Buckets are keyed by wall-clock second, so series built in separate
+    generator processes merge by simply adding matching buckets. Coarser
+    resolutions are built by merging the per-second histograms, which keeps
+    their percentiles as accurate as the per-second ones.
+    """
+
+    RESOLUTIONS = (1, 10, 60)
+
+    def __init__(self):
+        self.buckets: Dict[int, Dict[str, Any]] = {}
+
+    def record(self, status: str, latency_ms: Optional[float], timestamp: float = None):
+        """Count one completed request in the bucket for the second it completed"""
+        bucket = self._bucket(int(timestamp if timestamp is not None else time.time()))
+        bucket["counts"][status] = bucket["counts"].get(status, 0) + 1
+        if latency_ms is not None:
+            bucket["histogram"].record(latency_ms)
+
+    def record_many(self, statuses: Sequence[str], status_codes: np.ndarray, latencies_ms: np.ndarray,
+                    timestamps: np.ndarray):
+        """Count a batch of completions; status_codes index into statuses"""
+        seconds = np.floor(timestamps).astype(np.int64)
+        order = np.argsort(seconds, kind="stable")
+        seconds, status_codes, latencies_ms = seconds[order], status_codes[order], latencies_ms[order]
+        starts = np.flatnonzero(np.r_[True, seconds[1:] != seconds[:-1]])
+        for begin, end in zip(starts.tolist(), np.r_[starts[1:], seconds.size].tolist()):
+            bucket = self._bucket(int(seconds[begin]))
+            for code, count in enumerate(np.bincount(status_codes[begin:end], minlength=len(statuses)).tolist()):
+                if count:
+                    bucket["counts"][statuses[code]] = bucket["counts"].get(statuses[code], 0) + count
+            bucket["histogram"].record_many(latencies_ms[begin:end])
+
+    def merge(self, other: "LoadTestTimeSeries"):
+        for second, other_bucket in other.buckets.items():
+            bucket = self._bucket(second)
+            for status, count in other_bucket["counts"].items():
+                bucket["counts"][status] = bucket["counts"].get(status, 0) + count
+            bucket["histogram"].merge(other_bucket["histogram"])
+
+    def _bucket(self, second: int) -> Dict[str, Any]:
+        bucket = self.buckets.get(second)
+        if bucket is None:
+            bucket = self.buckets[second] = {"counts": {}, "histogram": LatencyHistogram()}
+        return bucket
+
+    def rows(self, start_time: float, resolution: int) -> List[Dict[str, Any]]:
+        """One row per resolution-sized bucket, with offsets counted from the start of the run"""
+        origin = int(start_time)
+        grouped: Dict[int, Dict[str, Any]] = {}
+        for second in sorted(self.buckets):
+            offset = (second - origin) // resolution * resolution
+            group = grouped.get(offset)
+            if group is None:
+                group = grouped[offset] = {"counts": {}, "histogram": LatencyHistogram()}
+            bucket = self.buckets[second]
+            for status, count in bucket["counts"].items():
+                group["counts"][status] = group["counts"].get(status, 0) + count
+            group["histogram"].merge(bucket["histogram"])
+
+        rows = []
+        for offset, group in grouped.items():
+            counts = group["counts"]
+            total = sum(counts.values())
+            latency = group["histogram"].summary()
+            rows.append({
+                "resolution_sec": resolution,
+                "bucket_offset_sec": offset,
+                "bucket_start": datetime.fromtimestamp(origin + offset),
+                "total": total,
+                "succeeded": counts.get("success", 0),
+                "failed": counts.get("failed", 0),
+                "rate_limited": counts.get("rate_limited", 0),
+                "duplicates": counts.get("duplicate", 0),
+                "achieved_rps": total / resolution,
+                "error_rate": counts.get("failed", 0) / total * 100 if total else None,
+                "avg_latency_ms": latency["mean"],
+                "p50_latency_ms": latency["p50"],
+                "p95_latency_ms": latency["p95"],
+                "p99_latency_ms": latency["p99"],
+                "max_latency_ms": latency["max"]
+            })
+        return rows
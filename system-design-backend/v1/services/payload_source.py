@@ -0,0 +1,159 @@
+import json
+import mmap
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List
+
+import numpy as np
+
+from v1.models.load_test import LoadTestConfig, PayloadStrategy, FieldDistribution, FieldDistributionType
+from v1.routes.schema import PostRequestModel
+from v1.services.observability import logger
+
+CORPUS_DIR = os.path.join('/app/data', 'corpora')
+
+class PayloadSource(ABC):
+    """Hands out ready-built payloads; everything expensive happens before the run starts"""
+
+    @abstractmethod
+    def next(self) -> PostRequestModel:
+        ...
+
+    def close(self):
+        pass
+
+class FixedPayloadSource(PayloadSource):
+    """The same validated payload for every request (payloads are never mutated downstream)"""
+
+    def __init__(self, base_payload: Dict[str, Any]):
+        self.payload = PostRequestModel(**base_payload)
+
+    def next(self) -> PostRequestModel:
+        return self.payload
+
+class PooledPayloadSource(PayloadSource):
+    """
+    A precomputed pool of payloads, cycled in order.
+
+    Every field with a distribution is sampled for the whole pool in one
+    vectorized numpy call, and the payload models are built once up front,
+    so taking one during the timed phase is an index increment.
+    """
+
+    def __init__(self, base_payload: Dict[str, Any], fields: Dict[str, FieldDistribution], size: int,
+                 rng: np.random.Generator = None):
+        rng = rng or np.random.default_rng()
+        columns = {name: sample_field(distribution, size, rng) for name, distribution in fields.items()}
+        self.pool: List[PostRequestModel] = [
+            PostRequestModel(**{**base_payload, **{name: column[i] for name, column in columns.items()}})
+            for i in range(size)
+        ]
+        self._position = 0
+
+    def next(self) -> PostRequestModel:
+        payload = self.pool[self._position]
+        self._position = (self._position + 1) % len(self.pool)
+        return payload
+
+class CorpusPayloadSource(PayloadSource):
+    """
+    Payloads read lazily from a memory-mapped JSONL file, one per line.
+
+    Each line is merged onto base_payload, so a corpus only needs the fields
+    that vary. Lines are parsed as they are used and the file wraps around
+    at the end; only the pages being read are resident, however large the
+    corpus. Generator shards take interleaved lines (every shard_count-th).
+    """
+
+    def __init__(self, path: str, base_payload: Dict[str, Any], shard_index: int = 0, shard_count: int = 1):
+        self.path = path
+        self.base_payload = base_payload
+        self.shard_count = shard_count
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.close()
+            raise ValueError(f"Payload corpus {path} is empty")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        for _ in range(shard_index):
+            self._next_line()
+
+    def next(self) -> PostRequestModel:
+        line = self._next_line()
+        for _ in range(self.shard_count - 1):
+            self._next_line()
+        return PostRequestModel(**{**self.base_payload, **json.loads(line)})
+
+    def _next_line(self) -> bytes:
+        wrapped = False
+        while True:
+            line = self._map.readline()
+            if not line:
+                if wrapped:
+                    raise ValueError(f"Payload corpus {self.path} has no payload lines")
+                self._map.seek(0)
+                wrapped = True
+                continue
+            line = line.strip()
+            if line:
+                return line
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+def sample_field(distribution: FieldDistribution, size: int, rng: np.random.Generator) -> List[Any]:
+    """`size` draws from one field's distribution, as Python values"""
+    if distribution.distribution == FieldDistributionType.UNIFORM:
+        if isinstance(distribution.min, int) and isinstance(distribution.max, int):
+            return rng.integers(distribution.min, distribution.max, size=size, endpoint=True).tolist()
+        return rng.uniform(distribution.min, distribution.max, size=size).tolist()
+
+    if distribution.distribution == FieldDistributionType.ZIPF:
+        # Bounded Zipf: P(rank k) proportional to k^-exponent over ranks 1..n
+        ranks = len(distribution.values) if distribution.values else int(distribution.max)
+        weights = np.arange(1, ranks + 1, dtype=np.float64) ** -distribution.exponent
+        indices = rng.choice(ranks, size=size, p=weights / weights.sum())
+        if distribution.values:
+            return np.asarray(distribution.values, dtype=object)[indices].tolist()
+        return (indices + 1).tolist()
+
+    weights = np.asarray(distribution.weights, dtype=np.float64) if distribution.weights else None
+    indices = rng.choice(len(distribution.values), size=size, p=weights / weights.sum() if weights is not None else None)
+    return np.asarray(distribution.values, dtype=object)[indices].tolist()
+
+def resolve_corpus_path(name: str) -> str:
+    """Path of a corpus file, which must live in the corpus directory"""
+    path = os.path.realpath(os.path.join(CORPUS_DIR, name))
+    if os.path.dirname(path) != os.path.realpath(CORPUS_DIR):
+        raise ValueError(f"Payload corpus must be a file name in {CORPUS_DIR}")
+    if not os.path.isfile(path):
+        raise ValueError(f"Payload corpus {name} not found in {CORPUS_DIR}")
+    return path
+
+def build_payload_source(config: LoadTestConfig, expected_requests: int = 0,
+                         shard_index: int = 0, shard_count: int = 1) -> PayloadSource:
+    """Build the test's payload source; pools are sampled and validated here, before the run"""
+    if config.payload_strategy == PayloadStrategy.CORPUS:
+        source = CorpusPayloadSource(resolve_corpus_path(config.payload_corpus), config.base_payload,
+                                     shard_index, shard_count)
+    elif config.payload_strategy in (PayloadStrategy.POOL, PayloadStrategy.RANDOMIZED):
+        # No point building more distinct payloads than the run will send
+        size = min(config.payload_pool_size, expected_requests) if expected_requests else config.payload_pool_size
+        source = PooledPayloadSource(config.base_payload, payload_fields(config), max(size, 1))
+    else:
+        source = FixedPayloadSource(config.base_payload)
+
+    logger.info("payload_source_built", strategy=config.payload_strategy.value, source=type(source).__name__,
+                pool_size=len(source.pool) if isinstance(source, PooledPayloadSource) else None)
+    return source
+
+def payload_fields(config: LoadTestConfig) -> Dict[str, FieldDistribution]:
+    """Field distributions for pooled payloads"""
+    if config.payload_strategy == PayloadStrategy.POOL:
+        return config.payload_fields
+    # Randomized: the two count fields, uniform between 1 and their base value
+    return {
+        field: FieldDistribution(distribution=FieldDistributionType.UNIFORM, min=1, max=config.base_payload[field])
+        for field in ("rate_of_requests", "number_of_requests")
+        if field in config.base_payload
+    }
@@ -1,4 +1,5 @@
 import time
+import json
 from enum import Enum
 from v1.services.observability import logger
 
@@ -51,7 +52,6 @@ class RateLimitingService:
         
         # Get current requests in window (simplified - use sorted sets in production)
         requests_str = self.redis.get(redis_key) or "[]"
-        import json
         requests = json.loads(requests_str)
         
         # Filter recent requests
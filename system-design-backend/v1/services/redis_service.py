@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio
 import json
 import hashlib
 import os
@@ -48,3 +49,54 @@ class RedisService():
             return False
 
 redis_service = RedisService()
+
+class AsyncRedisService():
+    """
+    asyncio-native counterpart of RedisService for code running on the event
+    loop. Keys are hashed and values JSON-encoded the same way, so both
+    clients read each other's entries.
+    """
+    def __init__(self):
+        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
+        # Connections open lazily on the loop that first uses them, so there is
+        # nothing to ping here; reuse the sync client's startup check instead
+        self.r = redis.asyncio.from_url(redis_url)
+        self.connected = redis_service.connected
+        logger.info("async redis service initialized", redis_url=redis_url, connected=self.connected)
+
+    def hash_key(self, key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    async def get(self, key):
+        if not self.connected:
+            return None
+        try:
+            value = await self.r.get(self.hash_key(key))
+            return json.loads(value) if value else None
+        except Exception as e:
+            logger.warning("redis get failed", error=str(e))
+            return None
+
+    async def set(self, key, value, ttl=30):
+        if not self.connected:
+            return False
+        try:
+            await self.r.setex(self.hash_key(key), ttl, json.dumps(value))
+            return True
+        except Exception as e:
+            logger.warning("redis set failed", error=str(e))
+            return False
+
+    async def delete(self, key):
+        if not self.connected:
+            return False
+        try:
+            return bool(await self.r.delete(self.hash_key(key)))
+        except Exception as e:
+            logger.warning("redis delete failed", error=str(e))
+            return False
+
+    async def close(self):
+        await self.r.aclose()
+
+async_redis_service = AsyncRedisService()
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, AsyncIterator, Tuple, Optional
+
+from sqlalchemy import text
+
+from v1.models.load_test import ReplaySource
+from v1.services.arrival_scheduler import ArrivalScheduler
+from v1.services.database_service_traced import db_service_traced as db_service
+
+class ReplayScheduler(ArrivalScheduler):
+    """
+    Replays recorded traffic from the `requests` table on its original timing.
+
+    Each record's target send time is its received_at offset into the window
+    divided by the speedup factor, so a 10x replay keeps every burst and lull
+    of the original, ten times faster. Like the arrival scheduler, targets
+    are absolute and overdue records are released immediately.
+
+    Records are read in keyset-paginated chunks, each on a short-lived
+    connection, with the next chunk fetched on the database executor while
+    the current one is being replayed. Memory holds at most two chunks, however
+    long the window is.
+    """
+
+    CHUNK_SIZE = 1000
+
+    def __init__(self, source: ReplaySource, origin: float = None):
+        self.source = source
+        self.window_start = self._utc_naive(source.start)
+        self.window_end = self._utc_naive(source.end)
+        window_sec = (self.window_end - self.window_start).total_seconds()
+        super().__init__(rps=0, duration=window_sec / source.speedup, origin=origin)
+
+    @staticmethod
+    def _utc_naive(value: datetime) -> datetime:
+        # received_at is stored as naive UTC
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+    async def arrivals(self) -> AsyncIterator[Tuple[int, float, Dict[str, Any]]]:
+        """Yield (request_index, target_time, record) for every replayed record"""
+        self.start_time = time.perf_counter()
+        if self.origin is None:
+            self.origin = self.start_time
+        overdue_streak = 0
+        position = 0  # Records seen in the window, across all shards
+
+        # Chunk reads are part of a running test, so they queue even when the executor is full
+        next_chunk = asyncio.create_task(db_service.run(self._fetch, None, reject_when_full=False))
+        try:
+            while True:
+                records = await next_chunk
+                if not records:
+                    return
+                next_chunk = asyncio.create_task(db_service.run(self._fetch, records[-1], reject_when_full=False))
+
+                for record in records:
+                    position += 1
+                    if (position - 1) % self.source.shard_count != self.source.shard_index:
+                        continue
+
+                    offset = (record["received_at"] - self.window_start).total_seconds()
+                    target = self.start_time + offset / self.source.speedup
+                    delay = target - time.perf_counter()
+                    if delay > 0:
+                        overdue_streak = 0
+                        await asyncio.sleep(delay)
+                    else:
+                        overdue_streak += 1
+                        if overdue_streak % self.CATCH_UP_YIELD_EVERY == 0:
+                            await asyncio.sleep(0)
+
+                    self.last_send_time = time.perf_counter()
+                    self._count(self._target_per_second, target)
+                    self._count(self._achieved_per_second, self.last_send_time)
+                    yield self.sent, target, record
+                    self.sent += 1
+        finally:
+            next_chunk.cancel()
+
+    def count(self) -> int:
+        """Recorded requests in the window (all shards)"""
+        conditions, params = self._window_conditions()
+        with db_service.engine.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM requests WHERE {' AND '.join(conditions)}"), params).scalar()
+
+    def _window_conditions(self) -> Tuple[List[str], Dict[str, Any]]:
+        conditions = ["received_at >= :window_start", "received_at < :window_end"]
+        params = {"window_start": str(self.window_start), "window_end": str(self.window_end)}
+        if self.source.endpoint:
+            conditions.append("endpoint = :endpoint")
+            params["endpoint"] = self.source.endpoint
+        if not self.source.include_load_tests:
+            conditions.append("(idempotency_key IS NULL OR idempotency_key NOT LIKE 'load\\_test\\_%' ESCAPE '\\')")
+        return conditions, params
+
+    def _fetch(self, after: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The next chunk of recorded requests, ordered by (received_at, request_id)"""
+        conditions, params = self._window_conditions()
+        params["limit"] = self.CHUNK_SIZE
+        if after:
+            conditions.append("(received_at > :after_at OR (received_at = :after_at AND request_id > :after_id))")
+            params.update(after_at=after["received_at_raw"], after_id=after["request_id"])
+
+        with db_service.engine.connect() as conn:
+            rows = conn.execute(
+                text(f"""
+                SELECT request_id, received_at, endpoint, idempotency_key FROM requests
+                WHERE {' AND '.join(conditions)}
+                ORDER BY received_at, request_id LIMIT :limit
+                """),
+                params
+            ).fetchall()
+
+        return [
+            {
+                "request_id": row.request_id,
+                "received_at_raw": row.received_at,
+                "received_at": datetime.fromisoformat(str(row.received_at)),
+                "endpoint": row.endpoint,
+                "idempotency_key": row.idempotency_key
+            }
+            for row in rows
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """Replayed rate (recorded rate x speedup) vs. achieved send rate"""
+        if self.start_time is None or self.last_send_time is None:
+            return {}
+        send_window = max(self.last_send_time - self.start_time, self.duration)
+        return {
+            "target_rps": self.sent / self.duration if self.duration else None,
+            "achieved_rps": self.sent / send_window if send_window else None,
+            "rps_timeline": self.rps_timeline()
+        }
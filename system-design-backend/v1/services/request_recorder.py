@@ -0,0 +1,123 @@
+import asyncio
+import time
+from typing import Dict, Any, List
+
+from sqlalchemy import text
+from prometheus_client import Counter, Gauge, Histogram
+
+from v1.services.database_service_traced import db_service_traced as db_service
+from v1.services.observability import logger
+
+# Recorder metrics
+RECORDER_QUEUE_DEPTH = Gauge('load_test_recorder_queue_depth', 'Request records waiting to be written')
+RECORDER_RECORDS_WRITTEN = Counter('load_test_recorder_records_written_total', 'Request records written to test_requests')
+RECORDER_WRITE_FAILURES = Counter('load_test_recorder_write_failures_total', 'Request records dropped after a failed batch write')
+RECORDER_BACKPRESSURE_WAITS = Counter('load_test_recorder_backpressure_waits_total', 'Times a request had to wait for space in the recorder queue')
+RECORDER_BATCH_SIZE = Histogram('load_test_recorder_batch_size', 'Records per batch write',
+                                buckets=[1, 10, 50, 100, 250, 500, 1000, 2500])
+RECORDER_FLUSH_DURATION = Histogram('load_test_recorder_flush_duration_seconds', 'Batch write latency')
+
+INSERT_TEST_REQUEST = text("""
+INSERT INTO test_requests (test_id, request_id, started_at, completed_at, status, status_code, latency_ms,
+                           service_time_ms, queue_delay_ms, error_message, stage_index)
+VALUES (:test_id, :request_id, :started_at, :completed_at, :status, :status_code, :latency_ms,
+        :service_time_ms, :queue_delay_ms, :error_message, :stage_index)
+""")
+
+class RequestRecorder:
+    """
+    Write-behind recorder for test_requests rows.
+
+    Completed-request records are queued and written by a background task,
+    one executemany INSERT per batch, flushed when the batch reaches
+    batch_size or flush_interval seconds after its first record. Writes run
+    on the database executor so they never block the event loop. When the queue is
+    full, record() waits, which pushes back on the load generator.
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, test_id: str, batch_size: int = 500, flush_interval: float = 0.5,
+                 max_queue_size: int = 10000):
+        self.test_id = test_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "write_failures": 0,
+            "batches": 0,
+            "backpressure_waits": 0,
+            "max_queue_depth": 0
+        }
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def record(self, record: Dict[str, Any]):
+        """Queue a completed-request record, waiting if the writer is behind"""
+        if self.queue.full():
+            self.stats["backpressure_waits"] += 1
+            RECORDER_BACKPRESSURE_WAITS.inc()
+        await self.queue.put(record)
+        RECORDER_QUEUE_DEPTH.inc()
+        self.stats["enqueued"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queue.qsize())
+
+    async def close(self) -> Dict[str, Any]:
+        """Flush everything still queued and stop the writer"""
+        if self._task:
+            await self.queue.put(self._CLOSE)
+            await self._task
+            self._task = None
+        logger.info("request_recorder_closed", test_id=self.test_id, **self.stats)
+        return self.stats
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self.queue.get()
+            if item is self._CLOSE:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is self._CLOSE:
+                    closing = True
+                    break
+                batch.append(item)
+
+            RECORDER_QUEUE_DEPTH.dec(len(batch))
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        start_time = time.monotonic()
+        try:
+            await db_service.run(self._write_batch, batch, reject_when_full=False)
+        except Exception as e:
+            self.stats["write_failures"] += len(batch)
+            RECORDER_WRITE_FAILURES.inc(len(batch))
+            logger.error("request_recorder_flush_failed", test_id=self.test_id, batch_size=len(batch), error=str(e))
+            return
+
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        RECORDER_RECORDS_WRITTEN.inc(len(batch))
+        RECORDER_BATCH_SIZE.observe(len(batch))
+        RECORDER_FLUSH_DURATION.observe(time.monotonic() - start_time)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        with db_service.get_session() as session:
+            session.execute(INSERT_TEST_REQUEST, batch)
+            session.commit()
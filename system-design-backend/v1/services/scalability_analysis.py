@@ -0,0 +1,235 @@
+import asyncio
+import json
+import math
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from v1.services.observability import logger
+
+# Config fields that set the load level rather than what is being tested; runs
+# may differ in these and still describe the same system
+LOAD_LEVEL_FIELDS = (
+    "total_requests", "rps", "duration", "stages", "virtual_users", "replay", "capacity_search",
+    "burst_mode", "concurrency_limit", "arrival_distribution", "execution_mode", "worker_processes",
+    "http_pool_size", "stop_conditions", "prune_archived_requests"
+)
+
+class ScalabilityAnalysisService:
+    """
+    Fits the Universal Scalability Law to throughput vs. concurrency.
+
+    USL models throughput at concurrency N as
+
+        X(N) = lambda * N / (1 + sigma * (N - 1) + kappa * N * (N - 1))
+
+    where sigma is contention (the serialized fraction, as in Amdahl's
+    law) and kappa is coherency (the cost of keeping workers consistent,
+    which makes throughput fall past a peak). Rearranged as
+    N / X = (1 + sigma * (N - 1) + kappa * N * (N - 1)) / lambda the model
+    is linear in 1/lambda, sigma/lambda and kappa/lambda, so one weighted
+    least-squares solve over all points fits it; no iterative optimizer.
+    Amdahl's law is the same fit with kappa fixed at zero.
+
+    Points come from closed-loop runs, where concurrency is what the test
+    controlled: step concurrency stages, virtual-user runs and burst runs
+    (at concurrency_limit).
+    """
+
+    MIN_CONCURRENCY_LEVELS = 3
+
+    async def analyze(self, runs: List[Dict[str, Any]], predict: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """Fit finished test_runs rows and predict at `predict` concurrency levels; runs in a worker thread"""
+        return await asyncio.to_thread(self._analyze, runs, predict)
+
+    def _analyze(self, runs: List[Dict[str, Any]], predict: Optional[Sequence[int]]) -> Dict[str, Any]:
+        self._check_same_config(runs)
+        points = [point for run in runs for point in self._points(run)]
+        if len({point["concurrency"] for point in points}) < self.MIN_CONCURRENCY_LEVELS:
+            raise ValueError(f"Need closed-loop results at {self.MIN_CONCURRENCY_LEVELS} or more concurrency levels "
+                             f"(concurrency stages, virtual_users or burst runs); got {len(points)} point(s)")
+
+        concurrency = np.array([point["concurrency"] for point in points], dtype=np.float64)
+        throughput = np.array([point["throughput_rps"] for point in points], dtype=np.float64)
+        # Think time is not part of the response time Little's law gives back
+        think_sec = float(np.mean([point["think_time_ms"] for point in points])) / 1000.0
+
+        usl = self._fit(concurrency, throughput, coherency=True)
+        amdahl = self._fit(concurrency, throughput, coherency=False)
+
+        fitted = self._throughput(usl, concurrency)
+        for point, value in zip(points, fitted.tolist()):
+            point["fitted_throughput_rps"] = value
+            point["residual_pct"] = (point["throughput_rps"] - value) / point["throughput_rps"] * 100
+
+        peak = self._peak(usl, think_sec)
+        levels = self._prediction_levels(concurrency, peak, predict)
+        predicted = self._throughput(usl, levels)
+        tested_max = concurrency.max()
+
+        result = {
+            "test_ids": [run["test_id"] for run in runs],
+            "points": points,
+            "usl": usl,
+            "amdahl": amdahl,
+            "peak": peak,
+            "predictions": [
+                {
+                    "concurrency": int(level),
+                    "throughput_rps": float(rate),
+                    "latency_ms": self._latency_ms(level, rate, think_sec),
+                    "extrapolated": bool(level > tested_max or level < concurrency.min())
+                }
+                for level, rate in zip(levels.tolist(), predicted.tolist())
+            ]
+        }
+        logger.info("scalability_fit_completed", test_ids=result["test_ids"], points=len(points),
+                    sigma=usl["sigma"], kappa=usl["kappa"], r_squared=usl["fit"]["r_squared"])
+        return result
+
+    def _check_same_config(self, runs: List[Dict[str, Any]]):
+        """Runs must differ only in load level, or the curve mixes different systems"""
+        configs = [self._system_config(run) for run in runs]
+        differing = sorted({
+            key for config in configs[1:] for key in set(config) | set(configs[0])
+            if config.get(key) != configs[0].get(key)
+        })
+        if differing:
+            raise ValueError(f"Runs differ in {', '.join(differing)}; fit runs of the same configuration")
+
+    @staticmethod
+    def _system_config(run: Dict[str, Any]) -> Dict[str, Any]:
+        config = json.loads(run["config"]) if isinstance(run["config"], str) else run["config"]
+        return {key: value for key, value in config.items() if key not in LOAD_LEVEL_FIELDS}
+
+    def _points(self, run: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """(concurrency, throughput, latency) observations from one run"""
+        config = json.loads(run["config"]) if isinstance(run["config"], str) else run["config"]
+        points = []
+
+        if config.get("stages"):
+            # Only step stages hold one concurrency level for their whole duration
+            for stage in json.loads(run["stage_results"]) if run.get("stage_results") else []:
+                if stage["concurrency"] and stage["ramp"] == "step" and stage["throughput_rps"]:
+                    users = stage.get("virtual_users") or {}
+                    points.append(self._point(run, "stage", stage["concurrency"], stage["throughput_rps"],
+                                              stage["latency"]["mean"], users.get("mean_think_time_ms"),
+                                              stage_index=stage["stage_index"]))
+        elif config.get("virtual_users") and not config.get("replay") and not config.get("capacity_search"):
+            users = json.loads(run["virtual_user_stats"]) if run.get("virtual_user_stats") else {}
+            if users:
+                points.append(self._point(run, "virtual_users", config["virtual_users"], users["throughput_rps"],
+                                          users["mean_response_time_ms"], users["mean_think_time_ms"]))
+        elif (config.get("burst_mode") or config.get("total_requests")) and not config.get("replay") \
+                and not config.get("capacity_search") and run.get("duration_sec"):
+            completed = sum(run.get(column) or 0 for column in ("succeeded", "failed", "rate_limited", "duplicates"))
+            concurrency = min(config["concurrency_limit"], config.get("total_requests") or 100)
+            if completed:
+                points.append(self._point(run, "burst", concurrency, completed / run["duration_sec"],
+                                          run.get("avg_latency_ms")))
+        return points
+
+    @staticmethod
+    def _point(run: Dict[str, Any], source: str, concurrency: int, throughput: float, latency_ms: Optional[float],
+               think_time_ms: Optional[float] = None, stage_index: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            "test_id": run["test_id"],
+            "source": source,
+            "stage_index": stage_index,
+            "concurrency": concurrency,
+            "throughput_rps": throughput,
+            "latency_ms": latency_ms,
+            "think_time_ms": think_time_ms or 0.0
+        }
+
+    def _fit(self, concurrency: np.ndarray, throughput: np.ndarray, coherency: bool) -> Dict[str, Any]:
+        """Weighted linear least squares for lambda, sigma and (optionally) kappa"""
+        columns = {
+            "sigma": concurrency - 1,
+            "kappa": concurrency * (concurrency - 1)
+        }
+        if not coherency:
+            del columns["kappa"]
+
+        # Residuals in N/X scale as X^2/N times residuals in X; weighting by that
+        # makes the solve minimize (approximately) the throughput error
+        weights = throughput ** 2 / concurrency
+        target = concurrency / throughput
+
+        while True:
+            design = np.column_stack([np.ones_like(concurrency)] + list(columns.values()))
+            solution, *_ = np.linalg.lstsq(design * weights[:, None], target * weights, rcond=None)
+            inverse_lambda, coefficients = solution[0], dict(zip(columns, solution[1:] / solution[0]))
+            # Negative contention or coherency is not physical (it means superlinear scaling in
+            # the data); pin the most negative coefficient at zero and refit the rest
+            negative = [name for name, value in coefficients.items() if value < 0]
+            if not negative or inverse_lambda <= 0:
+                break
+            del columns[min(negative, key=coefficients.get)]
+
+        model = {
+            "lambda": float(1 / inverse_lambda) if inverse_lambda > 0 else None,
+            "sigma": float(coefficients.get("sigma", 0.0)),
+            "kappa": float(coefficients.get("kappa", 0.0))
+        }
+        model["fit"] = self._goodness_of_fit(throughput, self._throughput(model, concurrency), 1 + len(columns))
+        return model
+
+    @staticmethod
+    def _throughput(model: Dict[str, Any], concurrency: np.ndarray) -> np.ndarray:
+        if model["lambda"] is None:
+            return np.full_like(concurrency, np.nan, dtype=np.float64)
+        return model["lambda"] * concurrency / (
+            1 + model["sigma"] * (concurrency - 1) + model["kappa"] * concurrency * (concurrency - 1)
+        )
+
+    @staticmethod
+    def _goodness_of_fit(observed: np.ndarray, fitted: np.ndarray, parameters: int) -> Dict[str, Optional[float]]:
+        residuals = observed - fitted
+        total = float(np.sum((observed - observed.mean()) ** 2))
+        r_squared = 1 - float(np.sum(residuals ** 2)) / total if total > 0 else None
+        dof = observed.size - parameters
+        return {
+            "points": int(observed.size),
+            "parameters": parameters,
+            "r_squared": r_squared,
+            "adjusted_r_squared": 1 - (1 - r_squared) * (observed.size - 1) / dof if r_squared is not None and dof > 0 else None,
+            "rmse_rps": float(np.sqrt(np.mean(residuals ** 2))),
+            "mape_pct": float(np.mean(np.abs(residuals / observed)) * 100)
+        }
+
+    def _peak(self, model: Dict[str, Any], think_sec: float) -> Dict[str, Any]:
+        """Concurrency at which throughput peaks (USL), or the asymptote it approaches (Amdahl)"""
+        if model["lambda"] is None:
+            return {}
+        if model["kappa"] > 0 and model["sigma"] < 1:
+            concurrency = math.sqrt((1 - model["sigma"]) / model["kappa"])
+            throughput = float(self._throughput(model, np.array([concurrency]))[0])
+            return {
+                "concurrency": concurrency,
+                "throughput_rps": throughput,
+                "latency_ms": self._latency_ms(concurrency, throughput, think_sec)
+            }
+        # No coherency penalty: throughput never falls, it levels off at lambda / sigma
+        return {
+            "concurrency": None,
+            "throughput_rps": model["lambda"] / model["sigma"] if model["sigma"] > 0 else None,
+            "latency_ms": None
+        }
+
+    @staticmethod
+    def _prediction_levels(concurrency: np.ndarray, peak: Dict[str, Any], predict: Optional[Sequence[int]]) -> np.ndarray:
+        if predict:
+            return np.array(sorted(set(predict)), dtype=np.float64)
+        # Default: a geometric sweep to twice the highest tested level (or past the peak)
+        upper = max(concurrency.max() * 2, (peak.get("concurrency") or 0) * 1.5)
+        return np.unique(np.round(np.geomspace(1, upper, num=12)))
+
+    @staticmethod
+    def _latency_ms(concurrency: float, throughput: float, think_sec: float) -> Optional[float]:
+        """Response time by Little's law for a closed loop: R = N / X - Z"""
+        if not throughput or throughput != throughput:
+            return None
+        return max(concurrency / throughput - think_sec, 0.0) * 1000
+
+scalability_service = ScalabilityAnalysisService()
@@ -0,0 +1,87 @@
+import math
+import random
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from v1.models.load_test import ThinkTime, ThinkTimeDistribution
+
+class VirtualUserStats:
+    """
+    Per-user accounting for closed-loop virtual users.
+
+    Each user tracks how many requests it completed, how long it spent
+    waiting for responses and thinking, and how long it was active. From
+    those the summary checks Little's law for the closed loop,
+    N = X * (R + Z): the average number of active users should equal
+    throughput times the per-request cycle (response time plus think time).
+    A large deviation means the users spent time outside that cycle, which
+    usually points at the load generator itself.
+    """
+
+    def __init__(self, think_time: Optional[ThinkTime] = None):
+        self.think_time = think_time
+        self.users: List[Dict[str, float]] = []
+
+    def add_user(self) -> Dict[str, float]:
+        user = {"requests": 0, "response_time_sec": 0.0, "think_time_sec": 0.0, "active_sec": 0.0}
+        self.users.append(user)
+        return user
+
+    def think_seconds(self) -> float:
+        """One think time drawn from the configured distribution (0 when there is none)"""
+        think_time = self.think_time
+        if think_time is None:
+            return 0.0
+        mean = think_time.mean_ms / 1000.0
+        if think_time.distribution == ThinkTimeDistribution.EXPONENTIAL:
+            seconds = random.expovariate(1.0 / mean)
+        elif think_time.distribution == ThinkTimeDistribution.LOGNORMAL:
+            # Parameterised so the distribution's mean is mean_ms whatever sigma is
+            seconds = random.lognormvariate(math.log(mean) - think_time.sigma ** 2 / 2, think_time.sigma)
+        elif think_time.distribution == ThinkTimeDistribution.UNIFORM:
+            seconds = random.uniform(0, 2 * mean)
+        else:
+            seconds = mean
+        if think_time.max_ms is not None:
+            seconds = min(seconds, think_time.max_ms / 1000.0)
+        return seconds
+
+    def merge(self, other: "VirtualUserStats"):
+        self.users.extend(other.users)
+
+    def summary(self, elapsed_sec: float) -> Dict[str, Any]:
+        """Per-user throughput and the Little's law check over elapsed_sec of wall time"""
+        users = [user for user in self.users if user["active_sec"] > 0]
+        requests = sum(user["requests"] for user in users)
+        if not users or not requests or elapsed_sec <= 0:
+            return {}
+
+        throughput = requests / elapsed_sec
+        response_time = sum(user["response_time_sec"] for user in users) / requests
+        think_time = sum(user["think_time_sec"] for user in users) / requests
+        # Time-averaged number of active users (less than the peak while ramping)
+        active_users = sum(user["active_sec"] for user in users) / elapsed_sec
+        predicted_users = throughput * (response_time + think_time)
+        per_user = np.array([user["requests"] / user["active_sec"] for user in users])
+
+        return {
+            "users": len(users),
+            "avg_active_users": active_users,
+            "think_time": self.think_time.dict() if self.think_time else None,
+            "requests": requests,
+            "throughput_rps": throughput,
+            "mean_response_time_ms": response_time * 1000,
+            "mean_think_time_ms": think_time * 1000,
+            "per_user_throughput_rps": {
+                "mean": float(per_user.mean()),
+                "min": float(per_user.min()),
+                "p50": float(np.percentile(per_user, 50)),
+                "max": float(per_user.max())
+            },
+            "littles_law": {
+                "predicted_users": predicted_users,
+                "actual_users": active_users,
+                "deviation_pct": (predicted_users - active_users) / active_users * 100
+            }
+        }
@@ -24,6 +24,8 @@ function LoadTestApp() {
     resultError,
     autoRefresh,
     startTest,
+    stopTest,
+    isStopping,
     fetchResults,
     toggleAutoRefresh,
     resetTest,
@@ -96,6 +98,8 @@ function LoadTestApp() {
             autoRefresh={autoRefresh}
             onToggleAutoRefresh={toggleAutoRefresh}
             onReset={resetTest}
+            onStop={stopTest}
+            isStopping={isStopping}
           />
         </div>
 
@@ -137,7 +141,8 @@ function LoadTestApp() {
                   fontWeight: '600',
                   color: testStatus.status === 'completed' ? '#10b981' : 
                         testStatus.status === 'running' ? '#3b82f6' : 
-                        testStatus.status === 'failed' ? '#ef4444' : '#f59e0b'
+                        testStatus.status === 'failed' ? '#ef4444' :
+                        testStatus.status === 'stopped' ? '#f97316' : '#f59e0b'
                 }}>
                   {testStatus.status.toUpperCase()}
                 </span>
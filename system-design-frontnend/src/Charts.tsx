@@ -1,5 +1,7 @@
-import { PieChart, Pie, Cell, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
-import { type TestResult } from './types';
+import { PieChart, Pie, Cell, BarChart, Bar, LineChart, Line, Legend, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
+import { useQuery } from '@tanstack/react-query';
+import { api } from './api';
+import { type TestResult, type TestTimeSeries } from './types';
 
 interface ChartsProps {
   testResult: TestResult;
@@ -26,6 +28,18 @@ export function Charts({ testResult }: ChartsProps) {
     { name: 'P99', value: testResult.p99_latency_ms || 0 },
   ].filter(item => item.value > 0);
 
+  // Per-second buckets for short runs, coarser ones for long runs
+  const duration = testResult.duration_sec || 0;
+  const resolution: TestTimeSeries['resolution_sec'] = duration <= 600 ? 1 : duration <= 3600 ? 10 : 60;
+  const isFinished = testResult.status === 'completed' || testResult.status === 'stopped';
+
+  const { data: timeseries } = useQuery({
+    queryKey: ['testTimeseries', testResult.test_id, resolution],
+    queryFn: () => api.getTestTimeseries(testResult.test_id, resolution),
+    enabled: isFinished,
+    refetchOnWindowFocus: false,
+  });
+
   const renderCustomizedLabel = ({ cx, cy, midAngle, innerRadius, outerRadius, percent }: any) => {
     if (percent < 0.05) return null; // Don't show labels for slices < 5%
     
@@ -157,6 +171,34 @@ export function Charts({ testResult }: ChartsProps) {
           </div>
         )}
       </div>
+
+      {/* Throughput and Latency Over Time */}
+      {timeseries && timeseries.buckets.length > 0 && (
+        <div style={{ 
+          gridColumn: '1 / -1',
+          backgroundColor: 'white', 
+          padding: '20px', 
+          borderRadius: '8px', 
+          boxShadow: '0 1px 3px rgba(0,0,0,0.1)' 
+        }}>
+          <h3 style={{ marginBottom: '16px', fontSize: '18px', fontWeight: '600', textAlign: 'center' }}>
+            Throughput and Latency Over Time
+          </h3>
+          <ResponsiveContainer width="100%" height={300}>
+            <LineChart data={timeseries.buckets}>
+              <CartesianGrid strokeDasharray="3 3" />
+              <XAxis dataKey="bucket_offset_sec" tickFormatter={(value) => `${value}s`} />
+              <YAxis yAxisId="rps" tickFormatter={(value) => `${value}/s`} />
+              <YAxis yAxisId="latency" orientation="right" tickFormatter={(value) => `${value}ms`} />
+              <Tooltip labelFormatter={(value) => `${value}s`} />
+              <Legend />
+              <Line yAxisId="rps" type="monotone" dataKey="achieved_rps" name="Throughput (req/s)" stroke={COLORS.succeeded} dot={false} />
+              <Line yAxisId="latency" type="monotone" dataKey="p99_latency_ms" name="P99 (ms)" stroke={COLORS.failed} dot={false} />
+              <Line yAxisId="latency" type="monotone" dataKey="p50_latency_ms" name="P50 (ms)" stroke="#3b82f6" dot={false} />
+            </LineChart>
+          </ResponsiveContainer>
+        </div>
+      )}
     </div>
   );
 }
\ No newline at end of file
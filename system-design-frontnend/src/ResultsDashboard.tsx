@@ -9,6 +9,8 @@ interface ResultsDashboardProps {
   autoRefresh: boolean;
   onToggleAutoRefresh: () => void;
   onReset: () => void;
+  onStop: () => void;
+  isStopping: boolean;
 }
 
 export function ResultsDashboard({ 
@@ -18,7 +20,9 @@ export function ResultsDashboard({
   onFetchResults, 
   autoRefresh, 
   onToggleAutoRefresh,
-  onReset 
+  onReset,
+  onStop,
+  isStopping
 }: ResultsDashboardProps) {
   const formatDuration = (seconds?: number) => {
     if (!seconds) return 'N/A';
@@ -39,6 +43,7 @@ export function ResultsDashboard({
       case 'running': return '#3b82f6';
       case 'pending': return '#f59e0b';
       case 'failed': return '#ef4444';
+      case 'stopped': return '#f97316';
       default: return '#6b7280';
     }
   };
@@ -49,6 +54,7 @@ export function ResultsDashboard({
       case 'running': return 'Running';
       case 'pending': return 'Pending';
       case 'failed': return 'Failed';
+      case 'stopped': return 'Stopped';
       default: return 'Unknown';
     }
   };
@@ -172,6 +178,23 @@ export function ResultsDashboard({
           >
             {isLoading ? 'Loading...' : 'Refresh'}
           </button>
+          {(testResult.status === 'running' || testResult.status === 'pending') && (
+            <button
+              onClick={onStop}
+              disabled={isStopping}
+              style={{
+                padding: '8px 16px',
+                backgroundColor: isStopping ? '#9ca3af' : '#ef4444',
+                color: 'white',
+                border: 'none',
+                borderRadius: '4px',
+                cursor: isStopping ? 'not-allowed' : 'pointer',
+                fontSize: '14px'
+              }}
+            >
+              {isStopping ? 'Stopping...' : 'Stop Test'}
+            </button>
+          )}
           <button
             onClick={onReset}
             style={{
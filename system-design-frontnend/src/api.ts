@@ -1,4 +1,4 @@
-import { type LoadTestConfig, type StartTestRequest, type StartTestResponse, type TestResult, type TestStatus } from './types';
+import { type LoadTestConfig, type StartTestRequest, type StartTestResponse, type TestResult, type TestStatus, type TestTimeSeries } from './types';
 
 const API_BASE_URL = 'https://system-design-playground.onrender.com';
 
@@ -11,6 +11,9 @@ class ApiError extends Error {
   }
 }
 
+// WebSocket endpoint used for live load test progress frames
+export const PROGRESS_SOCKET_URL = `${API_BASE_URL.replace(/^http/, 'ws')}/ws`;
+
 async function apiRequest<T>(endpoint: string, options?: RequestInit): Promise<T> {
   const response = await fetch(`${API_BASE_URL}${endpoint}`, {
     headers: {
@@ -71,4 +74,15 @@ export const api = {
   async getTestStatus(testId: string): Promise<TestStatus> {
     return apiRequest<TestStatus>(`/v1/tests/${testId}/status`);
   },
+
+  async getTestTimeseries(testId: string, resolution: TestTimeSeries['resolution_sec']): Promise<TestTimeSeries> {
+    return apiRequest<TestTimeSeries>(`/v1/tests/${testId}/timeseries?resolution=${resolution}`);
+  },
+
+  async stopTest(testId: string): Promise<TestStatus> {
+    return apiRequest<TestStatus>(`/v1/tests/${testId}/stop`, {
+      method: 'POST',
+      body: JSON.stringify({ drain_timeout_sec: 5 }),
+    });
+  },
 };
\ No newline at end of file
@@ -44,7 +44,7 @@ export interface StartTestRequest {
 
 export interface StartTestResponse {
   test_id: string;
-  status: 'pending' | 'running' | 'completed' | 'failed';
+  status: 'pending' | 'running' | 'completed' | 'failed' | 'stopped';
   progress?: {
     message: string;
   };
@@ -52,7 +52,7 @@ export interface StartTestResponse {
 
 export interface TestResult {
   test_id: string;
-  status: 'pending' | 'running' | 'completed' | 'failed';
+  status: 'pending' | 'running' | 'completed' | 'failed' | 'stopped';
   total_requests: number;
   succeeded: number;
   failed: number;
@@ -65,14 +65,54 @@ export interface TestResult {
   start_time?: string;
   end_time?: string;
   duration_sec?: number;
+  stop_reason?: string;
+  abandoned_requests?: number;
+}
+
+export interface TimeSeriesBucket {
+  bucket_offset_sec: number;
+  total: number;
+  succeeded: number;
+  failed: number;
+  rate_limited: number;
+  duplicates: number;
+  achieved_rps: number;
+  error_rate?: number;
+  avg_latency_ms?: number;
+  p50_latency_ms?: number;
+  p95_latency_ms?: number;
+  p99_latency_ms?: number;
+  max_latency_ms?: number;
+}
+
+export interface TestTimeSeries {
+  test_id: string;
+  status: TestResult['status'];
+  resolution_sec: 1 | 10 | 60;
+  buckets: TimeSeriesBucket[];
+}
+
+export interface TestProgress {
+  elapsed_sec?: number;
+  completed?: number;
+  succeeded?: number;
+  failed?: number;
+  rate_limited?: number;
+  duplicates?: number;
+  current_rps?: number;
+  rolling_p95_ms?: number | null;
+  rolling_p99_ms?: number | null;
 }
 
 export interface TestStatus {
   test_id: string;
-  status: 'pending' | 'running' | 'completed' | 'failed';
-  progress?: {
+  status: 'pending' | 'running' | 'completed' | 'failed' | 'stopped';
+  progress?: TestProgress & {
     message: string;
-    succeeded?: number;
-    failed?: number;
   };
-}
\ No newline at end of file
+}
+
+export type TestProgressMessage =
+  | { type: 'subscribed'; test_id: string; progress: TestProgress | null }
+  | { type: 'test_progress'; test_id: string; delta: TestProgress }
+  | { type: 'test_status'; test_id: string; status: TestStatus['status'] };
\ No newline at end of file
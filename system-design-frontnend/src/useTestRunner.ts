@@ -1,22 +1,31 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { useMutation, useQuery } from '@tanstack/react-query';
-import { api } from './api';
-import { type LoadTestConfig } from './types';
+import { api, PROGRESS_SOCKET_URL } from './api';
+import { type LoadTestConfig, type TestProgress, type TestProgressMessage, type TestStatus } from './types';
 
 export function useTestRunner() {
   const [testId, setTestId] = useState<string | null>(null);
   const [autoRefresh, setAutoRefresh] = useState(false);
+  const [liveProgress, setLiveProgress] = useState<TestProgress | null>(null);
+  const [socketConnected, setSocketConnected] = useState(false);
+  const [pushedStatus, setPushedStatus] = useState<TestStatus['status'] | null>(null);
 
   const startTestMutation = useMutation({
     mutationFn: (config: LoadTestConfig) => api.startTest(config),
     onSuccess: (response) => {
       setTestId(response.test_id);
+      setLiveProgress(null);
+      setPushedStatus(null);
       if (response.status === 'running' || response.status === 'pending') {
         setAutoRefresh(true);
       }
     },
   });
 
+  const stopTestMutation = useMutation({
+    mutationFn: (id: string) => api.stopTest(id),
+  });
+
   const {
     data: testResult,
     isLoading: isLoadingResult,
@@ -26,23 +35,76 @@ export function useTestRunner() {
     queryKey: ['testResult', testId],
     queryFn: () => api.getTestResult(testId!),
     enabled: !!testId,
-    refetchInterval: autoRefresh ? 2000 : false,
+    // Live progress arrives over the WebSocket; only poll if it is unavailable
+    refetchInterval: autoRefresh && !socketConnected ? 2000 : false,
     refetchOnWindowFocus: false,
   });
 
   const {
-    data: testStatus,
+    data: polledStatus,
     isLoading: isLoadingStatus,
   } = useQuery({
     queryKey: ['testStatus', testId],
     queryFn: () => api.getTestStatus(testId!),
-    enabled: !!testId && autoRefresh,
-    refetchInterval: autoRefresh ? 1000 : false,
+    enabled: !!testId && autoRefresh && !socketConnected,
+    refetchInterval: autoRefresh && !socketConnected ? 1000 : false,
     refetchOnWindowFocus: false,
   });
 
+  // Subscribe to pushed progress frames for the running test
+  useEffect(() => {
+    if (!testId || !autoRefresh) {
+      return;
+    }
+
+    const socket = new WebSocket(PROGRESS_SOCKET_URL);
+    socket.onopen = () => {
+      socket.send(JSON.stringify({ type: 'subscribe', test_id: testId }));
+    };
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data) as TestProgressMessage;
+      if (message.test_id !== testId) {
+        return;
+      }
+      if (message.type === 'subscribed') {
+        if (message.progress) {
+          setSocketConnected(true);
+          setLiveProgress(message.progress);
+        } else {
+          // No live progress: the run may already have finished (its test_status frame
+          // went out before we subscribed) or is multi-process, so keep polling
+          refetchResult();
+        }
+      } else if (message.type === 'test_progress') {
+        setSocketConnected(true);
+        setLiveProgress((previous) => ({ ...previous, ...message.delta }));
+      } else if (message.type === 'test_status') {
+        setPushedStatus(message.status);
+        setAutoRefresh(false);
+        refetchResult();
+      }
+    };
+    socket.onclose = () => setSocketConnected(false);
+
+    return () => {
+      socket.close();
+      setSocketConnected(false);
+    };
+  }, [testId, autoRefresh, refetchResult]);
+
+  const testStatus: TestStatus | undefined = liveProgress && testId
+    ? {
+        test_id: testId,
+        status: pushedStatus ?? 'running',
+        progress: {
+          message: `${liveProgress.completed ?? 0} completed, ${liveProgress.current_rps ?? 0} req/s`,
+          ...liveProgress,
+        },
+      }
+    : polledStatus;
+
   // Stop auto-refresh when test is completed
-  if (testResult?.status === 'completed' || testResult?.status === 'failed') {
+  if (testResult?.status === 'completed' || testResult?.status === 'failed' || testResult?.status === 'stopped') {
     if (autoRefresh) {
       setAutoRefresh(false);
     }
@@ -52,6 +114,12 @@ export function useTestRunner() {
     startTestMutation.mutate(config);
   };
 
+  const stopTest = () => {
+    if (testId) {
+      stopTestMutation.mutate(testId);
+    }
+  };
+
   const fetchResults = () => {
     if (testId) {
       refetchResult();
@@ -65,6 +133,8 @@ export function useTestRunner() {
   const resetTest = () => {
     setTestId(null);
     setAutoRefresh(false);
+    setLiveProgress(null);
+    setPushedStatus(null);
   };
 
   return {
@@ -78,6 +148,8 @@ export function useTestRunner() {
     resultError,
     autoRefresh,
     startTest,
+    stopTest,
+    isStopping: stopTestMutation.isPending,
     fetchResults,
     toggleAutoRefresh,
     resetTest,